@@ -0,0 +1,257 @@
+import json
+import multiprocessing
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Tuple
+
+PENDING, RUNNING, DONE, FAILED = "pending", "running", "done", "failed"
+
+
+class JobStore:
+    """
+    The JobStore class declares the durable queue of a campaign. Every (case, mutator set, algorithm, repetition)
+    is a job in a SQLite file, so several worker processes can pull jobs from it and an interrupted campaign
+    continues with the jobs it has not finished yet. A running job holds a lease its worker renews with heartbeat,
+    only the jobs whose lease expired are taken back from their workers.
+
+    Args:
+        path (str): location of the SQLite file.
+        lease (float): number of seconds a running job is kept by its worker without a heartbeat.
+    """
+
+    def __init__(self, path: str, lease: float = 600):
+        self.path = path
+        self.lease = lease
+        self.connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # The connection is opened lazily, once per process
+        if self.connection is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS jobs "
+                                    "(id INTEGER PRIMARY KEY AUTOINCREMENT, case_name TEXT, path TEXT, "
+                                    "mutator_set TEXT, algorithm TEXT, repetition INTEGER, status TEXT, "
+                                    "worker TEXT, started REAL, finished REAL, heartbeat REAL, "
+                                    "UNIQUE (case_name, mutator_set, algorithm, repetition))")
+            # Stores created before the leases
+            columns = [c[1] for c in self.connection.execute("PRAGMA table_info(jobs)").fetchall()]
+            if "heartbeat" not in columns:
+                self.connection.execute("ALTER TABLE jobs ADD COLUMN heartbeat REAL")
+        return self.connection
+
+    def add(self, case_name: str, path: str, mutator_set: str, algorithm: str, repetition: int):
+        # A job already in the store keeps its status, so completed jobs are never queued again
+        self._connect().execute("INSERT OR IGNORE INTO jobs (case_name, path, mutator_set, algorithm, repetition, "
+                                "status) VALUES (?, ?, ?, ?, ?, ?)",
+                                (case_name, path, mutator_set, algorithm, repetition, PENDING))
+
+    def claim(self, worker: str):
+        """
+        Mark the next pending job as running for the worker, with a new lease, and return it. Return None when the
+        queue is empty.
+        """
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT id, case_name, path, mutator_set, algorithm, repetition FROM jobs "
+                             "WHERE status = ? ORDER BY id LIMIT 1", (PENDING,)).fetchone()
+            if row is not None:
+                now = time.time()
+                db.execute("UPDATE jobs SET status = ?, worker = ?, started = ?, heartbeat = ? WHERE id = ?",
+                           (RUNNING, worker, now, now, row[0]))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        if row is None:
+            return None
+        return dict(zip(["id", "case_name", "path", "mutator_set", "algorithm", "repetition"], row))
+
+    def heartbeat(self, job_id: int):
+        # Renew the lease of a running job
+        self._connect().execute("UPDATE jobs SET heartbeat = ? WHERE id = ? AND status = ?",
+                                (time.time(), job_id, RUNNING))
+
+    def finish(self, job_id: int, status: str = DONE):
+        self._connect().execute("UPDATE jobs SET status = ?, finished = ? WHERE id = ?", (status, time.time(), job_id))
+
+    def release(self) -> int:
+        """
+        Put the failed jobs, and the running jobs whose lease expired, back in the queue. The jobs of live workers
+        keep running. The experiments resume from their checkpoints when checkpoints are enabled.
+        """
+        expired = time.time() - self.lease
+        return self._connect().execute("UPDATE jobs SET status = ?, worker = NULL WHERE status = ? OR "
+                                       "(status = ? AND COALESCE(heartbeat, started, 0) < ?)",
+                                       (PENDING, FAILED, RUNNING, expired)).rowcount
+
+    def count(self, status: str = None) -> int:
+        if status is None:
+            return self._connect().execute("SELECT COUNT(*) FROM jobs").fetchone()[0]
+        return self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = ?", (status,)).fetchone()[0]
+
+    def get_progress(self, since: float) -> dict:
+        """
+        Return the progress of the campaign, with the throughput and the ETA of the jobs finished after since.
+        """
+        total, done, pending, running = self.count(), self.count(DONE), self.count(PENDING), self.count(RUNNING)
+        finished = self._connect().execute("SELECT COUNT(*) FROM jobs WHERE status = ? AND finished >= ?",
+                                           (DONE, since)).fetchone()[0]
+        elapsed = time.time() - since
+        throughput = finished / elapsed * 3600 if elapsed > 0 else 0
+        return {
+            "total": total,
+            "done": done,
+            "failed": self.count(FAILED),
+            "pending": pending,
+            "running": running,
+            "jobs_per_hour": throughput,
+            "eta_hours": (pending + running) / throughput if throughput > 0 else None
+        }
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
+
+
+def _keep_alive(campaign: 'Campaign', job_id: int, stop: threading.Event):
+    # The connection of the worker belongs to its own thread
+    store = JobStore(campaign.store, campaign.lease)
+    while not stop.wait(campaign.lease / 4):
+        store.heartbeat(job_id)
+    store.close()
+
+
+def _run_worker(campaign: 'Campaign', endpoint: Tuple[str, int], since: float):
+    # Each worker drives its own simulator instance and pulls jobs until the queue is empty
+    from experiment import Experiment
+    from src.models import Simulation
+    from evolution import FitnessCache
+    Simulation.host, Simulation.port = endpoint
+    worker = f'{endpoint[0]}:{endpoint[1]}'
+    fitness_cache = None if campaign.fitness_cache is None else FitnessCache(campaign.fitness_cache)
+    store = JobStore(campaign.store, campaign.lease)
+    job = store.claim(worker)
+    while job is not None:
+        stop = threading.Event()
+        threading.Thread(target=_keep_alive, args=(campaign, job["id"], stop), daemon=True).start()
+        sim_name = f'{job["mutator_set"].title()}_{campaign.algorithms[job["algorithm"]]}_{job["repetition"]}'
+        print(f'[{worker}] Case {job["case_name"]}: Level {sim_name}...')
+        try:
+            exp: Experiment = Experiment(file_path=job["path"],
+                                         case_name=job["case_name"],
+                                         simulation_name=sim_name,
+                                         mutators=campaign.mutators[job["mutator_set"]],
+                                         method_name=job["algorithm"],
+                                         epochs=campaign.epochs,
+                                         fitness_cache=fitness_cache,
+                                         checkpoint_frequency=campaign.checkpoint_frequency,
+                                         seed=None if campaign.seed is None else [campaign.seed, job["id"]])
+            if exp.run() is False:
+                print(f'[{worker}] Exception: Job {job["id"]} failed (scenario {job["path"]} is not found)!')
+                store.finish(job["id"], FAILED)
+            else:
+                store.finish(job["id"])
+        except Exception as ex:
+            print(f'[{worker}] Exception: Job {job["id"]} failed ({ex})!')
+            store.finish(job["id"], FAILED)
+        finally:
+            stop.set()
+
+        progress = store.get_progress(since)
+        eta = "unknown" if progress["eta_hours"] is None else f'{progress["eta_hours"]:.2f}h'
+        print(f'[{worker}] Campaign {campaign.name}: {progress["done"]}/{progress["total"]} jobs done, '
+              f'{progress["failed"]} failed, {progress["jobs_per_hour"]:.2f} jobs/h, ETA {eta}')
+        job = store.claim(worker)
+    store.close()
+
+
+class Campaign:
+    """
+    The Campaign class declares a declarative experiment campaign, read from a JSON file. The cross product of
+    its scenarios, mutator sets, algorithms and repetitions is queued as jobs in a JobStore and executed by one
+    worker process per simulator endpoint.
+
+    Args:
+        name (str): name of the campaign.
+        scenarios (List[dict]): {"name": case name, "path": path of the data.json file} of every case.
+        mutators (dict): mutator set name to the list of mutator definitions.
+        algorithms (dict): method name (CONST.RANDOM, CONST.OPO) to its label in the simulation names.
+        repetitions (int): number of runs of every (case, mutator set, algorithm).
+        epochs (int): number of epochs of every run.
+        endpoints (List[Tuple[str, int]]): (host, port) of the simulator instances, one worker per endpoint.
+        store (str): location of the SQLite job store.
+        fitness_cache (str): location of the shared fitness cache, no cache when None.
+        checkpoint_frequency (int): number of epochs between two checkpoints of a run.
+        seed (int): seed of the campaign, every job is seeded with it and its id. Unseeded when None.
+        lease (float): number of seconds without a heartbeat after which a running job is queued again.
+    """
+
+    @staticmethod
+    def from_file(path: str) -> 'Campaign':
+        with open(path) as file:
+            data = json.load(file)
+        if "endpoints" in data:
+            data["endpoints"] = [tuple(e) for e in data["endpoints"]]
+        return Campaign(**data)
+
+    def __init__(self, name: str, scenarios: List[dict], mutators: dict, algorithms: dict, repetitions: int = 10,
+                 epochs: int = 30, endpoints: List[Tuple[str, int]] = None, store: str = None,
+                 fitness_cache: str = None, checkpoint_frequency: int = 1, seed: int = None,
+                 lease: float = 600):
+        self.name = name
+        self.scenarios = scenarios
+        self.mutators = mutators
+        self.algorithms = algorithms
+        self.repetitions = repetitions
+        self.epochs = epochs
+        self.endpoints = [('127.0.0.1', 64257)] if endpoints is None else endpoints
+        self.store = f'outputs/campaigns/{name}.db' if store is None else store
+        self.fitness_cache = fitness_cache
+        self.checkpoint_frequency = checkpoint_frequency
+        self.seed = seed
+        self.lease = lease
+
+    def enqueue(self, store: JobStore):
+        # Same order as the former nested loops of main.execute_searching_from
+        for mutator_set in self.mutators:
+            for scenario in self.scenarios:
+                for algorithm in self.algorithms:
+                    for repetition in range(1, self.repetitions + 1):
+                        store.add(scenario["name"], scenario["path"], mutator_set, algorithm, repetition)
+
+    def run(self):
+        store = JobStore(self.store, self.lease)
+        self.enqueue(store)
+        released = store.release()
+        if released > 0:
+            print(f'Campaign {self.name}: {released} expired or failed job(s) are queued again')
+        print(f'Campaign {self.name}: {store.count(PENDING)} of {store.count()} jobs to run '
+              f'on {len(self.endpoints)} worker(s)')
+        store.close()
+
+        since = time.time()
+        if len(self.endpoints) == 1:
+            _run_worker(self, self.endpoints[0], since)
+        else:
+            workers = [multiprocessing.Process(target=_run_worker, args=(self, endpoint, since))
+                       for endpoint in self.endpoints]
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+
+        store = JobStore(self.store)
+        print(f'Campaign {self.name}: {store.get_progress(since)}')
+        store.close()
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -5,3 +5,8 @@ from .generator import Generator
 from .fitness import Fitness
 from .mutator import Mutator
 from .logbook import LogBook
+from .executor import ParallelExecutor
+from .fitness_cache import FitnessCache
+from .surrogate import Surrogate
+from .checkpoint import Checkpoint
+from .racing import Racing
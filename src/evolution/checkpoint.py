@@ -0,0 +1,110 @@
+import os
+import pickle
+import random
+import numpy as np
+from deap import creator
+from src.models.ac3rp import Genotype
+
+
+def _pack(ind) -> dict:
+    individual = ind[0]
+    # The registry key of a genotype does not survive the process, so only its genes are kept
+    return {
+        "individual": individual.genes.copy() if isinstance(individual, Genotype) else individual,
+        "scores": list(individual.scores),
+        "fitness": ind.fitness.values
+    }
+
+
+def _unpack(data: dict, orig_ind):
+    if isinstance(orig_ind, Genotype):
+        individual = Genotype(orig_ind.base, data["individual"], orig_ind.key)
+    else:
+        individual = data["individual"]
+    individual.scores = data["scores"]
+    ind = creator.Individual([individual])
+    ind.fitness.values = data["fitness"]
+    return ind
+
+
+def _truncate(path: str, size: int):
+    if path is None or not os.path.exists(path):
+        return
+    if size == 0:
+        os.remove(path)
+    else:
+        os.truncate(path, size)
+
+
+class Checkpoint:
+    """
+    The Checkpoint class declares the periodic snapshot of an evolution run: the best individual and its fitness,
+    the last completed epoch, the DEAP logbook, the RNG states and the sizes of the log files. An interrupted run
+    resumes from its last completed epoch, the rows logged after the snapshot are discarded.
+
+    Args:
+        path (str): location of the checkpoint file.
+        frequency (int): number of epochs between two snapshots.
+    """
+
+    def __init__(self, path: str, frequency: int = 1):
+        self.path = path
+        self.frequency = frequency
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def save(self, epoch: int, best_ind, logbook, logfile, log_data_file: str, rng: np.random.Generator = None,
+             force: bool = False, **extra):
+        """
+        Write the snapshot taken after the given epoch, with the state of the random stream rng of the engine.
+        Extra keyword values of the engine are stored as they are.
+        """
+        if not force and epoch % self.frequency != 0:
+            return
+        logfile.flush()
+        state = {
+            "epoch": epoch,
+            "best_ind": _pack(best_ind),
+            "logbook": logbook,
+            "random_state": random.getstate(),
+            "np_random_state": np.random.get_state(),
+            "rng_state": None if rng is None else rng.bit_generator.state,
+            "logfile_offset": logfile.tell(),
+            "log_data_offset": os.path.getsize(log_data_file) if log_data_file and os.path.exists(log_data_file) else 0,
+            **extra
+        }
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        # Write aside then rename, so a crash while saving keeps the previous snapshot
+        with open(self.path + ".tmp", "wb") as file:
+            pickle.dump(state, file)
+        os.replace(self.path + ".tmp", self.path)
+
+    def resume(self, orig_ind, logfile, log_data_file: str, rng: np.random.Generator = None):
+        """
+        Return the saved state with its best individual rebuilt over orig_ind, or None when there is no snapshot.
+        The RNG states are restored and the log files are cut back to their size at the time of the snapshot.
+        """
+        if not self.exists():
+            return None
+        with open(self.path, "rb") as file:
+            state = pickle.load(file)
+
+        state["best_ind"] = _unpack(state["best_ind"], orig_ind)
+        random.setstate(state["random_state"])
+        np.random.set_state(state["np_random_state"])
+        if rng is not None and state["rng_state"] is not None:
+            rng.bit_generator.state = state["rng_state"]
+        logfile.flush()
+        logfile.truncate(state["logfile_offset"])
+        _truncate(log_data_file, state["log_data_offset"])
+        print(f'Resume from epoch {state["epoch"]} (Fitness Value-{state["best_ind"].fitness.values[0]})')
+        return state
+
+    def remove(self):
+        if self.exists():
+            os.remove(self.path)
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -0,0 +1,158 @@
+import math
+import multiprocessing
+import traceback
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+import numpy as np
+from typing import List, Tuple
+from src.models.ac3rp.genotype import SHARED_BASES
+from src.libraries import rng as rngs
+from .fitness import Fitness
+
+DEFAULT_ENDPOINT = ('127.0.0.1', 64257)
+
+
+def _init_worker(endpoints, bases):
+    # Bind this worker process to its own simulator instance and its own random stream
+    from src.models import Simulation
+    from src.models.ac3rp.genotype import SHARED_BASES
+    from src.libraries import rng as rngs
+    (Simulation.host, Simulation.port), seed = endpoints.get()
+    rngs.seed(seed)
+    # Genotypes are shipped without their base scenario, so every worker receives the bases once
+    SHARED_BASES.update(bases)
+
+
+def _evaluate(func, deap_inds):
+    # Only a plain list holding the crash scenario is shipped to the worker, so
+    # the DEAP creator classes do not need to exist on the other side.
+    # The log entries come back with the fitness, the parent writes them in order
+    log = []
+    try:
+        fitness = func(deap_inds, log=log)
+    except Exception as ex:
+        traceback.print_exception(type(ex), ex, ex.__traceback__)
+        return None
+    return fitness, deap_inds[0].scores, log
+
+
+class ParallelExecutor:
+    """
+    The ParallelExecutor class declares the evaluation executor that fans individuals out to a pool of worker
+    processes. Each worker is bound to its own simulator endpoint. It is registered as the DEAP toolbox map, so
+    results come back in the same order as the given population. The evaluation function takes a log keyword, the
+    list the workers append their log entries to, see Fitness.evaluate: the log rows and bbox files are written by
+    this process, in population order. The base scenarios of genotypes have to be registered before the first
+    submission, the pool is started with them.
+
+    Args:
+        endpoints (List[Tuple[str, int]]): (host, port) of the simulator instances, one worker per endpoint.
+        retries (int): number of times a failed evaluation is submitted again before giving up.
+        failure_fitness (tuple): fitness assigned to an individual whose evaluation keeps failing.
+        seed (np.random.SeedSequence): root of the independent random streams spawned for the workers.
+    """
+
+    def __init__(self, endpoints: List[Tuple[str, int]] = None, retries: int = 1,
+                 failure_fitness: tuple = (-math.inf,), seed: np.random.SeedSequence = None):
+        self.endpoints = [DEFAULT_ENDPOINT] if endpoints is None else endpoints
+        self.retries = retries
+        self.failure_fitness = failure_fitness
+        self.seed = seed
+        self.pool = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self.pool is None:
+            endpoints = multiprocessing.Queue()
+            # A restarted pool spawns new streams, so they stay independent from the ones of the broken pool
+            for endpoint, seed in zip(self.endpoints, rngs.spawn(len(self.endpoints), self.seed)):
+                endpoints.put((endpoint, seed))
+            self.pool = ProcessPoolExecutor(max_workers=len(self.endpoints),
+                                            initializer=_init_worker,
+                                            initargs=(endpoints, dict(SHARED_BASES)))
+        return self.pool
+
+    def submit(self, func, deap_inds):
+        """
+        Submit one individual and return a future of (fitness, scores, log entries), or of None when the evaluation
+        failed.
+        """
+        return self._get_pool().submit(_evaluate, func, [deap_inds[0]])
+
+    def result(self, future):
+        """
+        Wait for a submitted evaluation. A crashed worker breaks the whole pool, so it is
+        restarted on the next submission instead of taking the remaining evaluations down.
+        """
+        try:
+            return future.result()
+        except BrokenProcessPool as ex:
+            print(f'Exception: A worker process died during evaluation ({ex})!')
+            self.shutdown(wait=False)
+            return None
+
+    def _collect(self, pop, results) -> list:
+        fitnesses = []
+        for ind, result in zip(pop, results):
+            if result is None:
+                print(f'Exception: Evaluation failed after {self.retries + 1} attempt(s)! '
+                      f'Fitness is set to {self.failure_fitness}.')
+                ind[0].scores = []
+                fitnesses.append(self.failure_fitness)
+            else:
+                fitness, ind[0].scores, log = result
+                Fitness.write_log(ind[0], log)
+                fitnesses.append(fitness)
+        return fitnesses
+
+    def map(self, func, pop) -> list:
+        results = [None] * len(pop)
+        pending = list(range(len(pop)))
+        for _ in range(self.retries + 1):
+            futures = [(i, self.submit(func, pop[i])) for i in pending]
+            pending = []
+            for i, future in futures:
+                results[i] = self.result(future)
+                if results[i] is None:
+                    pending.append(i)
+            if len(pending) == 0:
+                break
+        return self._collect(pop, results)
+
+    def map_until(self, func, pop, stop) -> list:
+        """
+        Evaluate the population concurrently like map, but stop at the first individual, in population order,
+        whose fitness satisfies stop. Evaluations behind it are cancelled and the returned list ends with it.
+        An evaluation already running in a worker cannot be interrupted, its result is simply discarded: its log
+        entries are never written, only the ones of the returned individuals are.
+        """
+        futures = {self.submit(func, ind): i for i, ind in enumerate(pop)}
+        attempts = [1] * len(pop)
+        results = [None] * len(pop)
+        last = len(pop) - 1
+        while len(futures) > 0:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future not in futures:
+                    continue
+                i = futures.pop(future)
+                results[i] = self.result(future)
+                if results[i] is None and attempts[i] <= self.retries:
+                    attempts[i] += 1
+                    futures[self.submit(func, pop[i])] = i
+                    continue
+
+                fitness = self.failure_fitness if results[i] is None else results[i][0]
+                if i < last and stop(fitness):
+                    last = i
+                    for f in [f for f, j in futures.items() if j > last]:
+                        f.cancel()
+                        futures.pop(f)
+        return self._collect(pop[:last + 1], results[:last + 1])
+
+    def shutdown(self, wait: bool = True):
+        if self.pool is not None:
+            self.pool.shutdown(wait=wait)
+            self.pool = None
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -1,83 +1,153 @@
 import json
 import numpy
-from src.models import SimulationFactory, SimulationScore, SimulationExec
+from typing import Union
+from src.models import SimulationFactory, SimulationScore, SimulationExec, KinematicExec, EarlyExit
 from src.models.simulation import Simulation
-from src.models.ac3rp import CrashScenario
+from src.models.ac3rp import CrashScenario, Genotype
 from src.visualization import VizSimFactory
+from .fitness_cache import FitnessCache
 
 
-def _write_log_file(simulation: Simulation, simulation_score: SimulationScore, fn,
-                    scenario: CrashScenario, ex_mes=None, score=0, exp_score=0):
-    toCSV = []
+def _collect_outputs(simulation: Simulation, simulation_score: SimulationScore) -> dict:
+    # Everything a log row needs, in a JSON friendly form so that it can be cached
+    return {
+        "status": simulation.status,
+        "vehicles_damage": {player.vehicle.vid: player.get_damage() for player in simulation.players},
+        "sim_damage": simulation.get_data_outputs(),
+        "expected_score": simulation_score.expected_score,
+        # The raw damage and the final positions replay the evaluation when it is rescored
+        "part_damage": {player.vehicle.vid: player.damage[0] if len(player.damage) > 0 else {}
+                        for player in simulation.players},
+        "final_positions": {player.vehicle.vid: list(player.positions[-1] if len(player.positions) > 0
+                                                     else player.pos[:2]) for player in simulation.players}
+    }
+
+
+def _log_row(scenario: CrashScenario, outputs: dict, score=0, ex_mes=None, cached: bool = False) -> dict:
     s = dict.fromkeys(["speeds", "initial_position", "vehicles_dam", "sim_dam",
                        "crashed_happened", "sim_score", "expected_score", "exception",
-                       "vehicles_damage_full", "sim_damage_full"])
+                       "vehicles_damage_full", "sim_damage_full", "part_damage_full", "final_positions", "cached"])
     s["speeds"], s["vehicles_damage_full"], s["vehicles_dam"], s["sim_dam"], s["initial_position"] = [], [], [], [], []
-    for player in simulation.players:
-        s["speeds"].append({player.vehicle.vid: player.speed})
-        s["vehicles_damage_full"].append({player.vehicle.vid: player.get_damage()})
-        s["vehicles_dam"].append({player.vehicle.vid: [part["name"] for part in player.get_damage()]})
-    s["sim_damage_full"] = simulation.get_data_outputs()
+    for vehicle in scenario.vehicles:
+        damage = outputs["vehicles_damage"][str(vehicle.name)]
+        s["speeds"].append({str(vehicle.name): vehicle.speed})
+        s["vehicles_damage_full"].append({str(vehicle.name): damage})
+        s["vehicles_dam"].append({str(vehicle.name): [part["name"] for part in damage]})
+    s["sim_damage_full"] = outputs["sim_damage"]
     for vehicle in scenario.vehicles:
         s["initial_position"].append({vehicle.name: vehicle.movement.get_driving_points()[0]})
-    for key, value in simulation.get_data_outputs().items():
+    for key, value in outputs["sim_damage"].items():
         s["sim_dam"].append({key: [part["name"] for part in value]})
-    s["crashed_happened"] = simulation.status
-    s["sim_score"] = simulation_score.simulation_score
-    s["expected_score"] = simulation_score.expected_score
+    # Outputs cached before the replay data was collected have none
+    s["part_damage_full"] = outputs.get("part_damage")
+    s["final_positions"] = outputs.get("final_positions")
+    s["crashed_happened"] = outputs["status"]
+    s["sim_score"] = score
+    s["expected_score"] = outputs["expected_score"]
     s['exception'] = None if ex_mes == "" else ex_mes
-    toCSV.append(s)
-    keys = toCSV[0].keys()
+    # Rows of the evaluations answered by the fitness cache instead of a simulation
+    s["cached"] = cached
+    return s
 
+
+def _write_log_row(fn, row: dict):
     import csv
     import os
     isFileExist = os.path.exists(fn)
     with open(fn, 'a' if isFileExist else 'w', newline='') as f:
-        if isFileExist:
-            dict_writer = csv.DictWriter(f, keys)
-            dict_writer.writerows(toCSV)
-        else:
-            dict_writer = csv.DictWriter(f, keys)
+        dict_writer = csv.DictWriter(f, row.keys())
+        if not isFileExist:
             dict_writer.writeheader()
-            dict_writer.writerows(toCSV)
+        dict_writer.writerows([row])
 
-    epoch = sum(1 for line in open(fn)) - 2
-    log_bbox_file = fn
-    log_bbox_file = log_bbox_file.replace("log", "bbox").replace(".csv", f'_{epoch}.png')
-    viz = VizSimFactory(simulation.sim_factory)
-    viz.plot_vehicle_road_bbox(url=log_bbox_file, score=score, exp_score=exp_score)
 
-    bbox_data = {}
-    for p in simulation.players:
-        bbox_data[p.vehicle.vid] = p.bbox
-    # Using a JSON string
-    json_string = json.dumps({"vehicles": bbox_data})
-    with open(log_bbox_file.replace(".png", ".json"), 'w') as outfile:
-        outfile.write(json_string)
+def _log_entry(fn, scenario: CrashScenario, outputs: dict, score=0, ex_mes=None, cached: bool = False,
+               simulation: Simulation = None, plot_score=0, exp_score=0) -> dict:
+    # A log row, and the bounding boxes of a simulated evaluation for its bbox files
+    entry = {"file": fn, "row": _log_row(scenario, outputs, score=score, ex_mes=ex_mes, cached=cached), "bbox": None}
+    if simulation is not None:
+        entry["bbox"] = {p.vehicle.vid: p.bbox.to_list() for p in simulation.players}
+        entry["score"], entry["exp_score"] = plot_score, exp_score
+    return entry
 
 
 class Fitness:
     @staticmethod
-    def evaluate(repetitions: int, log_data_file, deap_inds):
-        individual: CrashScenario = deap_inds[0]
+    def evaluate(repetitions: int, log_data_file, deap_inds, cache: FitnessCache = None, extend: bool = False,
+                 warm_scenario: bool = False, offline: bool = False, early_exit: EarlyExit = None,
+                 log: list = None):
+        individual: Union[CrashScenario, Genotype] = deap_inds[0]
+        # Extending runs further repetitions on top of the existing scores, e.g. for the racing selector
+        previous = list(individual.scores) if extend else []
+        # A compact genotype is only materialised into a crash scenario to be simulated
+        scenario = individual.to_scenario() if isinstance(individual, Genotype) else individual
+
+        # Identical configurations are not simulated again
+        entries = []
+        entry = None if cache is None else cache.get(scenario, len(previous) + repetitions)
+        if entry is not None:
+            for score in entry["scores"][len(previous):]:
+                entries.append(_log_entry(log_data_file, scenario, entry["outputs"], score=score, cached=True))
+            individual.scores = previous + entry["scores"][len(previous):]
+            print(f'Scores (cached): {individual.scores}')
+            Fitness.write_log(individual, entries, log)
+            return numpy.mean(individual.scores),
+
         scores = []
+        outputs = None
         for _ in range(repetitions):
-            sim_factory = SimulationFactory(individual)
-            simulation = Simulation(sim_factory=sim_factory, name=individual.name, need_teleport=True)
-            simulation_score = SimulationScore(simulation)
+            sim_factory = SimulationFactory(scenario)
+            simulation = Simulation(sim_factory=sim_factory, name=scenario.name, need_teleport=True)
+            # A run the early exit may stop at any time is scored by the closest approach of its vehicles
+            simulation_score = SimulationScore(simulation, closest_approach=early_exit is not None and not offline)
 
             # Execute scenario
-            SimulationExec(simulation).execute(timeout=30)
+            if offline:
+                # Kinematic approximation of the simulation, without BeamNG
+                KinematicExec(simulation).execute(timeout=30)
+            else:
+                SimulationExec(simulation, warm_scenario=warm_scenario, early_exit=early_exit).execute(timeout=30)
             scores.append(simulation_score.calculate())  # get the score
 
             # Logging
             simulation_score.get_expected_score()
-            _write_log_file(fn=log_data_file,
-                            simulation=simulation,
-                            simulation_score=simulation_score,
-                            scenario=individual,
-                            score=scores[0],
-                            exp_score=simulation_score.get_expected_score())
-        individual.scores = scores
-        print(f'Scores: {scores}')
-        return numpy.mean(scores),
+            outputs = _collect_outputs(simulation, simulation_score)
+            entries.append(_log_entry(log_data_file, scenario, outputs, score=simulation_score.simulation_score,
+                                      simulation=simulation, plot_score=scores[0],
+                                      exp_score=simulation_score.get_expected_score()))
+        individual.scores = previous + scores
+        if cache is not None:
+            cache.put(scenario, individual.scores, outputs)
+        print(f'Scores: {individual.scores}')
+        Fitness.write_log(individual, entries, log)
+        return numpy.mean(individual.scores),
+
+    @staticmethod
+    def write_log(individual: Union[CrashScenario, Genotype], entries: list, log: list = None):
+        """
+        Append the log entries of the evaluations of an individual to their log file, in order, or to log when it is
+        given, e.g. by a worker process returning them to the one driving the search. The bbox files of an
+        evaluation are numbered by its row in the log file, so only one process writes the entries of a log file.
+        """
+        if log is not None:
+            log.extend(entries)
+            return
+        scenario = None
+        for entry in entries:
+            fn = entry["file"]
+            _write_log_row(fn, entry["row"])
+            if entry["bbox"] is None:
+                continue
+
+            with open(fn) as f:
+                epoch = sum(1 for line in f) - 2
+            log_bbox_file = fn.replace("log", "bbox").replace(".csv", f'_{epoch}.png')
+            if scenario is None:
+                scenario = individual.to_scenario() if isinstance(individual, Genotype) else individual
+            viz = VizSimFactory(SimulationFactory(scenario))
+            viz.plot_vehicle_road_bbox(url=log_bbox_file, score=entry["score"], exp_score=entry["exp_score"],
+                                       bboxes=list(entry["bbox"].values()))
+            # Using a JSON string
+            json_string = json.dumps({"vehicles": entry["bbox"]})
+            with open(log_bbox_file.replace(".png", ".json"), 'w') as outfile:
+                outfile.write(json_string)
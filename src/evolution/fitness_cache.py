@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import sqlite3
+from src.models.ac3rp import CrashScenario
+
+PRECISION = 6  # Decimals kept when floats enter the fingerprint
+# Recency of an entry is a counter shared by all processes, wall-clock time is too coarse to order them
+NEXT_USE = "SELECT COALESCE(MAX(last_used), 0) + 1 FROM entries"
+
+
+def _round(values):
+    return [round(float(v), PRECISION) for v in values]
+
+
+def fingerprint(scenario: CrashScenario) -> str:
+    """
+    Compute a canonical fingerprint of a crash scenario. Two scenarios with the same vehicle speeds, trajectory
+    origins, roads, police reports and weather are simulated identically, so they share the same fingerprint.
+    """
+    content = {
+        "vehicles": [{
+            "name": v.name,
+            "speed": round(float(v.speed), PRECISION),
+            "speeds": _round(v.movement.get_speeds()),
+            "origin": _round(v.movement.get_driving_points()[0]),
+            "rotation": v.initial_rotation,
+            "delay": v.delay,
+            "distance_to_trigger": v.distance_to_trigger
+        } for v in scenario.vehicles],
+        "roads": [{
+            "name": r.name,
+            "width": r.road_width,
+            "nodes": [_round(n) for n in r.road_nodes]
+        } for r in scenario.roads],
+        "reports": [{
+            "name": r.name,
+            "parts": sorted(p["name"] for p in r.parts)
+        } for r in scenario.reports],
+        "weather": scenario.weather
+    }
+    return hashlib.sha256(json.dumps(content, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class FitnessCache:
+    """
+    The FitnessCache class declares a content-addressed on-disk cache from the fingerprint of a crash scenario
+    to its simulation scores and damage outputs. The cache is a SQLite file, so it can be shared by concurrent
+    worker processes, and it keeps at most max_entries scenarios by evicting the least recently used ones.
+
+    Args:
+        path (str): location of the SQLite file.
+        max_entries (int): maximum number of cached scenarios.
+    """
+
+    def __init__(self, path: str = "outputs/fitness_cache.db", max_entries: int = 10000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.connection = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # The connection is opened lazily, once per process
+        if self.connection is None:
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self.connection = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+            self.connection.execute("CREATE TABLE IF NOT EXISTS entries "
+                                    "(key TEXT PRIMARY KEY, scores TEXT, outputs TEXT, last_used INTEGER)")
+            self.connection.execute("CREATE TABLE IF NOT EXISTS stats (name TEXT PRIMARY KEY, value INTEGER)")
+            self.connection.execute("INSERT OR IGNORE INTO stats VALUES ('hits', 0), ('misses', 0)")
+        return self.connection
+
+    def get(self, scenario: CrashScenario, repetitions: int = 1):
+        """
+        Return the cached entry {"scores": [...], "outputs": {...}} of the scenario, or None when it has not been
+        simulated at least repetitions times.
+        """
+        key = fingerprint(scenario)
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT scores, outputs FROM entries WHERE key = ?", (key,)).fetchone()
+            entry = None
+            if row is not None and len(json.loads(row[0])) >= repetitions:
+                entry = {"scores": json.loads(row[0])[:repetitions], "outputs": json.loads(row[1])}
+                db.execute("UPDATE entries SET last_used = (%s) WHERE key = ?" % NEXT_USE, (key,))
+            db.execute("UPDATE stats SET value = value + 1 WHERE name = ?", ("misses" if entry is None else "hits",))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, scenario: CrashScenario, scores: list, outputs: dict):
+        """
+        Store the scores and the damage outputs of a simulated scenario, then evict the least recently used
+        entries beyond max_entries.
+        """
+        key = fingerprint(scenario)
+        db = self._connect()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, (%s))" % NEXT_USE,
+                       (key, json.dumps([float(s) for s in scores]), json.dumps(outputs)))
+            db.execute("DELETE FROM entries WHERE key NOT IN "
+                       "(SELECT key FROM entries ORDER BY last_used DESC LIMIT ?)", (self.max_entries,))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def __len__(self):
+        return self._connect().execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def get_stats(self) -> dict:
+        """
+        Return the hit/miss counters of this process and of every process sharing the cache file.
+        """
+        totals = dict(self._connect().execute("SELECT name, value FROM stats").fetchall())
+        return {"hits": self.hits, "misses": self.misses,
+                "total_hits": totals["hits"], "total_misses": totals["misses"], "entries": len(self)}
+
+    def close(self):
+        if self.connection is not None:
+            self.connection.close()
+            self.connection = None
+
+    def __getstate__(self):
+        # A SQLite connection cannot be shipped to worker processes
+        state = self.__dict__.copy()
+        state["connection"] = None
+        return state
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -1,10 +1,10 @@
-import copy
-from src.models.ac3rp import CrashScenario
+from typing import Union
+from src.models.ac3rp import CrashScenario, Genotype
 from src.models.mutator import Transformer
 
 
 class Generator:
     @staticmethod
-    def generate_random_from(scenario: CrashScenario, transformer: Transformer):
-        # Create a new crash scenario
-        return transformer.mutate_random_from(copy.deepcopy(scenario))
+    def generate_random_from(scenario: Union[CrashScenario, Genotype], transformer: Transformer):
+        # Create a new crash scenario, the transformer works on its own copy
+        return transformer.mutate_random_from(scenario)
@@ -1,15 +1,9 @@
-import copy
-from src.models.ac3rp import CrashScenario
 from src.models.mutator import Transformer
 
 
 class Mutator:
     @staticmethod
     def mutate_from(transformer: Transformer, deap_inds):
-        mutant = copy.deepcopy(deap_inds)
-        individual: CrashScenario = mutant[0]  # deap_individual is a list
-        score = deap_inds.fitness.values[0]
-
-        # Mutate the individual
-        mutant[0] = transformer.mutate_from(individual)
-        return mutant  # return deap_individual
+        # Mutate the individual, the transformer works on its own copy so the deap_individual
+        # (a list) is only rebuilt around the mutated scenario, with a fresh fitness
+        return type(deap_inds)([transformer.mutate_from(deap_inds[0])])  # return deap_individual
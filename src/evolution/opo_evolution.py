@@ -1,14 +1,18 @@
 import time
+import functools
 import numpy as np
 from deap import tools, creator, base
 from src.models.ac3rp import CrashScenario
+from .racing import Racing
+from src.libraries import rng as rngs
 
 FIRST = 0
 
 
 class OpoEvolution:
     def __init__(self, scenario, fitness, generate, generate_params, select, mutate, mutate_params,
-                 logfile, threshold=None, epochs=1, fitness_repetitions=1, select_aggregate=None, log_data_file=None):
+                 logfile, threshold=None, epochs=1, fitness_repetitions=1, select_aggregate=None, log_data_file=None,
+                 executor=None, fitness_cache=None, offspring_size=1, surrogate=None, checkpoint=None, rng=None):
         creator.create("FitnessMax", base.Fitness, weights=(1.0,))
         creator.create("Individual", list, fitness=creator.FitnessMax)
 
@@ -19,8 +23,15 @@ class OpoEvolution:
         self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.random_ind, 1)
         self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
         self.toolbox.register("mutate", mutate, mutate_params)
-        self.toolbox.register("evaluate", fitness, fitness_repetitions, log_data_file)
+        self.toolbox.register("evaluate", fitness, fitness_repetitions, log_data_file, cache=fitness_cache)
         self.toolbox.register("select", select, select_aggregate)
+        # A racing selector runs the further repetitions of the individuals it compares
+        self.racing = select_aggregate if isinstance(select_aggregate, Racing) else None
+        if self.racing is not None:
+            self.racing.bind(functools.partial(fitness, 1, log_data_file, cache=fitness_cache, extend=True))
+        # Evaluate individuals concurrently, otherwise the builtin map is kept
+        if executor is not None:
+            self.toolbox.register("map", executor.map)
 
         stats_fit = tools.Statistics(key=lambda ind: ind.fitness.values)
         stats_size = tools.Statistics(key=len)
@@ -34,18 +45,33 @@ class OpoEvolution:
         self.epochs = epochs
         self.orig_ind = scenario
         self.logfile = logfile
+        self.log_data_file = log_data_file
         self.threshold = threshold
-
-    def run(self):
+        # (1+lambda) mode: the number of mutants of the best individual evaluated per epoch
+        self.offspring_size = offspring_size
+        # Optional model of the fitness function that pre-screens the mutants before they are simulated
+        self.surrogate = surrogate
+        # Periodic snapshot of the run, an interrupted run resumes from it
+        self.checkpoint = checkpoint
+        # Random stream of the generator and mutator of this run, it is saved with the checkpoints
+        self.rng = rngs.default_rng() if rng is None else rng
+
+    def save_checkpoint(self, epoch, best_ind, evals, is_exceed_threshold, force=False):
+        if self.checkpoint is not None:
+            self.checkpoint.save(epoch, best_ind, self.logbook, self.logfile, self.log_data_file, self.rng, force,
+                                 evals=evals, is_exceed_threshold=is_exceed_threshold, surrogate=self.surrogate)
+
+    def evaluate_original(self, start_time):
         # Random generate first individual and 
         # replace it by the original crash scenario        
         pop = self.toolbox.population(n=1)
         pop[FIRST][FIRST] = self.orig_ind
 
-        start_time = time.time()
-        fitnesses = list(map(self.toolbox.evaluate, pop))
+        fitnesses = list(self.toolbox.map(self.toolbox.evaluate, pop))
         for ind, fit in zip(pop, fitnesses):
             ind.fitness.values = fit
+        if self.surrogate is not None:
+            self.surrogate.update(pop, fitnesses)
 
         # Write original scenario
         self.logfile.write(f'{pop[FIRST][FIRST].vehicles[0].get_speed()},'
@@ -60,42 +86,69 @@ class OpoEvolution:
         best_ind = tools.selBest(pop, 1)[FIRST]
         record = self.mstats.compile(pop)
         self.logbook.record(gen=0, evals=0, **record)
+        return best_ind
+
+    def run(self):
+        start_time = time.time()
+        state = None
+        if self.checkpoint is not None:
+            state = self.checkpoint.resume(self.orig_ind, self.logfile, self.log_data_file, self.rng)
+        if state is None:
+            best_ind = self.evaluate_original(start_time)
+            epoch, evals, is_exceed_threshold = 1, 0, False
+            self.save_checkpoint(0, best_ind, evals, is_exceed_threshold, force=True)
+        else:
+            # Continue after the last completed epoch
+            best_ind, self.logbook, self.surrogate = state["best_ind"], state["logbook"], state["surrogate"]
+            epoch, evals, is_exceed_threshold = state["epoch"] + 1, state["evals"], state["is_exceed_threshold"]
+        pop = [best_ind]
 
         # Begin the evolution
         print("Start of evolution")
 
-        epoch = 1
-        is_exceed_threshold = False
         while epoch <= self.epochs and is_exceed_threshold is False:
             # A new generation - by mutate the best individual
-            mutant = self.toolbox.mutate(best_ind)
-            pop[:] = [mutant]
-
-            # Calculate the fitness score for the new individual
-            fitnesses = list(map(self.toolbox.evaluate, pop))
+            if self.surrogate is None:
+                pop[:] = [self.toolbox.mutate(best_ind) for _ in range(self.offspring_size)]
+            else:
+                # Mutants are cheap, only the best predicted ones are simulated
+                candidates = [self.toolbox.mutate(best_ind)
+                              for _ in range(self.offspring_size * self.surrogate.candidates)]
+                pop[:] = self.surrogate.screen(candidates, best_ind.fitness.values[0], self.offspring_size)
+
+            # Calculate the fitness score for the new individuals
+            fitnesses = list(self.toolbox.map(self.toolbox.evaluate, pop))
             for ind, fit in zip(pop, fitnesses):
                 ind.fitness.values = fit
+            if self.surrogate is not None:
+                self.surrogate.update(pop, fitnesses)
+            evals = evals + len(pop)
 
-            # DEBUG - Compare 2 scenarios
+            # DEBUG - Compare scenarios
             print("-----------------------------------------------------------------------------------------------")
             print("Epoch: ", str(epoch))
-            print("We have 2 scenarios: ")
+            print(f'We have {len(pop) + 1} scenarios: ')
             s1: CrashScenario = best_ind[0]
-            s2: CrashScenario = pop[0][0]
             print(f'Last Ind: '
                   f'(Speed v1-{s1.vehicles[0].get_speed()}) '
                   f'(Speed v2-{s1.vehicles[1].get_speed()}) '
                   f'(Fitness Value-{best_ind.fitness.values[0]})')
-            print(f'New Ind: '
-                  f'(Speed v1-{s2.vehicles[0].get_speed()}) '
-                  f'(Speed v2-{s2.vehicles[1].get_speed()}) '
-                  f'(Fitness Value-{pop[0].fitness.values[0]})')
+            for mutant in pop:
+                s2: CrashScenario = mutant[0]
+                print(f'New Ind: '
+                      f'(Speed v1-{s2.vehicles[0].get_speed()}) '
+                      f'(Speed v2-{s2.vehicles[1].get_speed()}) '
+                      f'(Fitness Value-{mutant.fitness.values[0]})')
+                if hasattr(mutant, "prediction"):
+                    print(f'        (Predicted Fitness Value-{mutant.prediction})')
             ##############################################################################
 
-            best_ind = self.toolbox.select(best_ind, pop)
+            # Each mutant challenges the current best in turn, so the OpO acceptance of the selector is kept
+            for mutant in pop:
+                best_ind = self.toolbox.select(best_ind, [mutant])
             pop[:] = [best_ind]
             record = self.mstats.compile(pop)
-            self.logbook.record(gen=epoch, evals=epoch, **record)
+            self.logbook.record(gen=epoch, evals=evals, **record)
             epoch = epoch + 1
 
             # Check if the best individual exceeds given threshold
@@ -118,6 +171,12 @@ class OpoEvolution:
             self.logfile.write(f'{s.vehicles[0].get_speed()},'
                                f'{s.vehicles[1].get_speed()},'
                                f'{best_ind.fitness.values[0]}\n')
+            self.save_checkpoint(epoch - 1, best_ind, evals, is_exceed_threshold,
+                                 force=is_exceed_threshold or epoch > self.epochs)
 
         print("Evolution time: ", time.time() - start_time)
+        if self.racing is not None:
+            print(f'Racing: {self.racing.get_stats()}')
+        if self.surrogate is not None:
+            print(f'Surrogate: {self.surrogate.get_stats()}')
         print("End of evolution")
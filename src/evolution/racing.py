@@ -0,0 +1,101 @@
+import scipy.stats as stats
+
+
+class Racing:
+    """
+    The Racing class declares a sequential selector between the incumbent and a challenger. Instead of spending
+    max_repetitions simulations on every challenger, repetitions are run one at a time and the race stops as soon
+    as the comparison is decided: both samples have min_repetitions scores and are apart by more than margin times
+    the score scale, or the Mann-Whitney test is significant. Otherwise the race ends after max_repetitions with
+    the same decision as Selector.by_vda_f.
+
+    Args:
+        max_repetitions (int): maximum number of repetitions of an individual.
+        alpha (float): significance level of the Mann-Whitney test.
+        margin (float): gap between two samples, relative to the largest absolute score, below which they are
+            considered overlapping.
+        min_repetitions (int): sample size of both individuals before the race may stop.
+        min_test_repetitions (int): sample size from which the Mann-Whitney test may stop the race.
+    """
+
+    def __init__(self, max_repetitions: int = 5, alpha: float = 0.05, margin: float = 0.1,
+                 min_repetitions: int = 2, min_test_repetitions: int = 3):
+        if min_repetitions > max_repetitions:
+            raise Exception("Exception: Racing needs min_repetitions <= max_repetitions!")
+        self.max_repetitions = max_repetitions
+        self.alpha = alpha
+        self.margin = margin
+        self.min_repetitions = min_repetitions
+        self.min_test_repetitions = min_test_repetitions
+        self.evaluate = None
+        self.races = 0
+        self.repetitions = 0
+
+    def bind(self, evaluate):
+        """
+        Set the function running one more repetition of an individual, appended to its scores.
+        """
+        self.evaluate = evaluate
+
+    @staticmethod
+    def effect_size(f1, f2) -> float:
+        # Vargha and Delaney A of f1 over f2, the samples may have different sizes
+        return stats.mannwhitneyu(f1, f2, alternative="two-sided")[0] / (len(f1) * len(f2))
+
+    def decide(self, f1, f2, final: bool = False):
+        """
+        Return True when the incumbent scores f1 win, False when the challenger scores f2 win, and None
+        while the race is undecided.
+        """
+        if min(len(f1), len(f2)) < self.min_repetitions and not final:
+            return None
+        # A single noisy repetition must not decide, nor a gap small for the scores at hand
+        margin = self.margin * max(abs(f) for f in f1 + f2)
+        if max(f2) + margin < min(f1):
+            return True
+        if min(f2) > max(f1) + margin:
+            return False
+        if len(f2) >= self.min_test_repetitions or final:
+            p = stats.mannwhitneyu(f1, f2, alternative="two-sided")[1] if len(set(f1 + f2)) > 1 else 1
+            if p <= self.alpha:
+                return self.effect_size(f1, f2) > 0.5
+            if final:
+                # H0: the two populations are equal, the incumbent is kept
+                return True
+        return None
+
+    def _extend(self, deap_inds):
+        deap_inds.fitness.values = self.evaluate(deap_inds)
+        self.repetitions += 1
+
+    def select(self, orig_inds, deap_inds):
+        if self.evaluate is None:
+            raise Exception("Exception: Racing selector is not bound to a fitness function!")
+        self.races += 1
+        self.repetitions += len(deap_inds[0].scores)
+
+        is_orig_better = self.decide(orig_inds[0].scores, deap_inds[0].scores)
+        while is_orig_better is None:
+            if len(deap_inds[0].scores) >= self.max_repetitions:
+                is_orig_better = self.decide(orig_inds[0].scores, deap_inds[0].scores, final=True)
+                break
+            # The incumbent sample is kept across races, it only grows to the size of the challenger
+            if len(orig_inds[0].scores) <= len(deap_inds[0].scores):
+                self._extend(orig_inds)
+            self._extend(deap_inds)
+            is_orig_better = self.decide(orig_inds[0].scores, deap_inds[0].scores)
+
+        print(f'Race decided after {len(deap_inds[0].scores)} repetition(s): '
+              f'{orig_inds[0].scores} vs {deap_inds[0].scores}')
+        return orig_inds if is_orig_better else deap_inds
+
+    def get_stats(self) -> dict:
+        """
+        Return the number of races and of repetitions, and the repetitions saved over a full evaluation.
+        """
+        return {"races": self.races, "repetitions": self.repetitions,
+                "saved": self.races * self.max_repetitions - self.repetitions,
+                "mean_repetitions": self.repetitions / self.races if self.races > 0 else None}
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.get_stats())
@@ -1,14 +1,18 @@
 import time
+import functools
 import numpy as np
 from deap import tools, creator, base
 from src.models.ac3rp import CrashScenario
+from .racing import Racing
+from src.libraries import rng as rngs
 
 FIRST = 0
 
 
 class RandomEvolution:
     def __init__(self, scenario, fitness, generate, generate_params, select, logfile,
-                 epochs=1, fitness_repetitions=1, threshold=None, select_aggregate=None, log_data_file=None):
+                 epochs=1, fitness_repetitions=1, threshold=None, select_aggregate=None, log_data_file=None,
+                 executor=None, fitness_cache=None, batch=False, checkpoint=None, rng=None):
         creator.create("FitnessMax", base.Fitness, weights=(1.0,))
         creator.create("Individual", list, fitness=creator.FitnessMax)
 
@@ -19,8 +23,15 @@ class RandomEvolution:
         self.toolbox.register("individual", tools.initRepeat, creator.Individual, self.toolbox.random_ind, 1)
         self.toolbox.register("population", tools.initRepeat, list, self.toolbox.individual)
 
-        self.toolbox.register("evaluate", fitness, fitness_repetitions, log_data_file)
+        self.toolbox.register("evaluate", fitness, fitness_repetitions, log_data_file, cache=fitness_cache)
         self.toolbox.register("select", select, select_aggregate)
+        # A racing selector runs the further repetitions of the individuals it compares
+        self.racing = select_aggregate if isinstance(select_aggregate, Racing) else None
+        if self.racing is not None:
+            self.racing.bind(functools.partial(fitness, 1, log_data_file, cache=fitness_cache, extend=True))
+        # Evaluate individuals concurrently, otherwise the builtin map is kept
+        if executor is not None:
+            self.toolbox.register("map", executor.map)
 
         stats_fit = tools.Statistics(key=lambda ind: ind.fitness.values)
         stats_size = tools.Statistics(key=len)
@@ -35,16 +46,42 @@ class RandomEvolution:
         self.orig_ind = scenario
         self.fitness_repetitions = fitness_repetitions
         self.logfile = logfile
+        self.log_data_file = log_data_file
         self.threshold = threshold
+        # Batch mode generates the whole epoch budget up front and evaluates it concurrently
+        self.executor = executor
+        self.batch = batch
+        if self.batch and self.executor is None:
+            raise Exception("Exception: Batch mode requires an executor!")
+        # Periodic snapshot of the run, an interrupted run resumes from it
+        self.checkpoint = checkpoint
+        # Random stream of the generator and mutator of this run, it is saved with the checkpoints
+        self.rng = rngs.default_rng() if rng is None else rng
+
+    def is_exceed_threshold(self, fitness) -> bool:
+        return self.threshold is not None and self.threshold <= fitness[0]
+
+    def evaluate_batch(self, best_ind, epochs):
+        # The sequential search always runs the 1st epoch, then stops if the original already exceeds the threshold
+        pop = self.toolbox.population(n=1 if self.is_exceed_threshold(best_ind.fitness.values) else epochs)
+        fitnesses = self.executor.map_until(self.toolbox.evaluate, pop, stop=self.is_exceed_threshold)
+        for ind, fit in zip(pop, fitnesses):
+            ind.fitness.values = fit
+        # Individuals behind the one exceeding the threshold are cancelled
+        return pop[:len(fitnesses)]
 
-    def run(self):
+    def save_checkpoint(self, epoch, best_ind, is_exceed_threshold, force=False):
+        if self.checkpoint is not None:
+            self.checkpoint.save(epoch, best_ind, self.logbook, self.logfile, self.log_data_file, self.rng, force,
+                                 is_exceed_threshold=is_exceed_threshold)
+
+    def evaluate_original(self, start_time):
         # Random generate first individual and 
         # replace it by the original crash scenario
         pop = self.toolbox.population(n=1)
         pop[FIRST][FIRST] = self.orig_ind
 
-        start_time = time.time()
-        fitnesses = list(map(self.toolbox.evaluate, pop))
+        fitnesses = list(self.toolbox.map(self.toolbox.evaluate, pop))
         for ind, fit in zip(pop, fitnesses):
             ind.fitness.values = fit
 
@@ -61,20 +98,41 @@ class RandomEvolution:
         best_ind = tools.selBest(pop, 1)[FIRST]
         record = self.mstats.compile(pop)
         self.logbook.record(gen=0, evals=0, **record)
+        return best_ind
+
+    def run(self):
+        start_time = time.time()
+        state = None
+        if self.checkpoint is not None:
+            state = self.checkpoint.resume(self.orig_ind, self.logfile, self.log_data_file, self.rng)
+        if state is None:
+            best_ind = self.evaluate_original(start_time)
+            epoch, is_exceed_threshold = 1, False
+            self.save_checkpoint(0, best_ind, is_exceed_threshold, force=True)
+        else:
+            # Continue after the last completed epoch
+            best_ind, self.logbook = state["best_ind"], state["logbook"]
+            epoch, is_exceed_threshold = state["epoch"] + 1, state["is_exceed_threshold"]
 
         # Begin the evolution
         print("Start of evolution")
+        first_epoch = epoch
+        offsprings = None
+        if self.batch and epoch <= self.epochs and is_exceed_threshold is False:
+            offsprings = self.evaluate_batch(best_ind, self.epochs - first_epoch + 1)
 
-        epoch = 1
-        is_exceed_threshold = False
         while epoch <= self.epochs and is_exceed_threshold is False:
-            # A new generation - by random generation
-            pop = self.toolbox.population(n=1)
-
-            # Calculate the fitness score for the new individual
-            fitnesses = list(map(self.toolbox.evaluate, pop))
-            for ind, fit in zip(pop, fitnesses):
-                ind.fitness.values = fit
+            if self.batch:
+                # A new generation - already evaluated in the batch
+                pop = [offsprings[epoch - first_epoch]]
+            else:
+                # A new generation - by random generation
+                pop = self.toolbox.population(n=1)
+
+                # Calculate the fitness score for the new individual
+                fitnesses = list(self.toolbox.map(self.toolbox.evaluate, pop))
+                for ind, fit in zip(pop, fitnesses):
+                    ind.fitness.values = fit
 
             # DEBUG - Compare 2 scenarios
             print("-----------------------------------------------------------------------------------------------")
@@ -92,6 +150,7 @@ class RandomEvolution:
                   f'(Fitness Value-{pop[0].fitness.values[0]})')
             ##############################################################################
 
+            new_fitness = pop[0].fitness.values
             best_ind = self.toolbox.select(best_ind, pop)
             pop[:] = [best_ind]
             record = self.mstats.compile(pop)
@@ -99,7 +158,11 @@ class RandomEvolution:
             epoch = epoch + 1
 
             # Check if the best individual exceeds given threshold
-            if self.threshold is not None and self.threshold <= best_ind.fitness.values[0]:
+            if self.is_exceed_threshold(best_ind.fitness.values):
+                is_exceed_threshold = True
+            # The batch is cut after the individual exceeding the threshold, the search ends with it even when the
+            # selector keeps the incumbent, e.g. a challenger losing its race
+            if self.batch and self.is_exceed_threshold(new_fitness):
                 is_exceed_threshold = True
 
             # DEBUG - Compare 2 scenarios
@@ -118,6 +181,10 @@ class RandomEvolution:
             self.logfile.write(f'{s.vehicles[0].get_speed()},'
                                f'{s.vehicles[1].get_speed()},'
                                f'{best_ind.fitness.values[0]}\n')
+            self.save_checkpoint(epoch - 1, best_ind, is_exceed_threshold,
+                                 force=is_exceed_threshold or epoch > self.epochs)
 
         print("Evolution time: ", time.time() - start_time)
+        if self.racing is not None:
+            print(f'Racing: {self.racing.get_stats()}')
         print("End of evolution")
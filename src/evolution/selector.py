@@ -1,6 +1,7 @@
 import numpy as np
 import scipy.stats as stats
 from src.models.ac3rp import CrashScenario
+from .racing import Racing
 
 
 class Selector:
@@ -58,3 +59,9 @@ class Selector:
                 return orig_inds
             print(f'deap_inds wins: {f2}')
             return deap_inds
+
+    @staticmethod
+    def by_racing(racing: Racing, orig_inds, pop_ind):
+        deap_inds = pop_ind[0]
+        # Repetitions are run by the racing selector until the comparison is decided
+        return racing.select(orig_inds, deap_inds)
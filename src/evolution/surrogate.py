@@ -0,0 +1,107 @@
+import math
+import numpy as np
+from typing import Union
+from src.models.ac3rp import CrashScenario, Genotype
+
+
+def features(individual: Union[CrashScenario, Genotype]) -> np.ndarray:
+    """
+    Return the feature vector of an individual: the speed and absolute trajectory origin of every vehicle.
+    The origin offsets of a genotype are added to the origins of its base scenario, so a genotype and the
+    scenario it stands for have the same features.
+    """
+    if isinstance(individual, Genotype):
+        individual.commit()
+        origins = np.array([v.movement.get_driving_points()[0][:2] for v in individual.base.vehicles], dtype=float)
+        return np.column_stack([individual.genes[:, 0], individual.genes[:, 1:3] + origins]).ravel()
+    return np.array([[v.get_speed(), *v.movement.get_driving_points()[0][:2]] for v in individual.vehicles],
+                    dtype=float).ravel()
+
+
+class Surrogate:
+    """
+    The Surrogate class declares an online regression model of the fitness function. It is trained on every
+    simulated (individual, fitness) pair and ranks the candidate mutants before any simulation is spent on them.
+    The error between the predicted and the simulated fitness is recorded, so the saving can be judged.
+
+    Args:
+        candidates (int): number of mutants generated per simulated mutant, the best predicted ones are kept.
+        min_samples (int): number of simulated individuals needed before the model is used.
+        margin (float): when not None, mutants predicted below the best fitness minus margin are not simulated.
+        n_estimators (int): number of trees of the random forest.
+    """
+
+    def __init__(self, candidates: int = 5, min_samples: int = 10, margin: float = None, n_estimators: int = 50):
+        self.candidates = candidates
+        self.min_samples = min_samples
+        self.margin = margin
+        self.n_estimators = n_estimators
+        self.model = None
+        self.X = []
+        self.y = []
+        # (predicted, actual) fitness of the simulated mutants that were ranked by the model
+        self.errors = []
+        self.screened = 0
+        self.rejected = 0
+
+    def is_trained(self) -> bool:
+        return self.model is not None
+
+    def fit(self):
+        from sklearn.ensemble import RandomForestRegressor
+        if len(self.y) < self.min_samples:
+            return
+        self.model = RandomForestRegressor(n_estimators=self.n_estimators, random_state=0)
+        self.model.fit(np.array(self.X), np.array(self.y))
+
+    def predict(self, pop) -> np.ndarray:
+        return self.model.predict(np.array([features(ind[0]) for ind in pop]))
+
+    def screen(self, pop, best_fitness: float, size: int) -> list:
+        """
+        Keep the size best predicted individuals of the population, and drop the ones predicted below
+        best_fitness - margin. The population is cut to size while the model is not trained.
+        """
+        if not self.is_trained():
+            return pop[:size]
+
+        predictions = self.predict(pop)
+        ranking = np.argsort(-predictions, kind="stable")[:size]
+        kept = []
+        for i in ranking:
+            if self.margin is not None and predictions[i] < best_fitness - self.margin:
+                self.rejected += 1
+                continue
+            pop[i].prediction = float(predictions[i])
+            kept.append(pop[i])
+        self.screened += len(pop)
+        return kept
+
+    def update(self, pop, fitnesses):
+        """
+        Add the simulated individuals to the training data, record the prediction errors and refit the model.
+        """
+        for ind, fit in zip(pop, fitnesses):
+            # A failed evaluation says nothing about the scenario
+            if not math.isfinite(fit[0]):
+                continue
+            prediction = getattr(ind, "prediction", None)
+            if prediction is not None:
+                self.errors.append((prediction, fit[0]))
+            self.X.append(features(ind[0]))
+            self.y.append(fit[0])
+        self.fit()
+
+    def get_stats(self) -> dict:
+        errors = np.array([p - a for p, a in self.errors])
+        return {
+            "samples": len(self.y),
+            "screened": self.screened,
+            "rejected": self.rejected,
+            "predictions": len(errors),
+            "mae": float(np.mean(np.abs(errors))) if len(errors) > 0 else None,
+            "rmse": float(np.sqrt(np.mean(errors ** 2))) if len(errors) > 0 else None
+        }
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.get_stats())
@@ -1,28 +1,68 @@
+import functools
 import json
 import time
 import pathlib
-from evolution import RandomEvolution, OpoEvolution, Mutator, Fitness, Generator, Selector
-from src.models import categorize_mutator, CONST
-from src.models.ac3rp import CrashScenario
+import numpy as np
+from evolution import RandomEvolution, OpoEvolution, Mutator, Fitness, Generator, Selector, ParallelExecutor, \
+    FitnessCache, Surrogate, Checkpoint, Racing
+from src.models import categorize_mutator, CONST, EarlyExit
+from src.models.ac3rp import CrashScenario, Genotype
+from src.models.ac3rp.genotype import release_base
 from src.models.mutator import Transformer
-from typing import List, Dict
-from src.models import SimulationFactory, Simulation, SimulationScore
+from src.libraries import rng as rngs
+from typing import List, Dict, Tuple
+from src.models import SimulationScore, SimulationSession
 
 
 class Experiment:
     def __init__(self, file_path: str, method_name: str, mutators: List[Dict], case_name: str,
-                 simulation_name: str = None, epochs: int = 30):
+                 simulation_name: str = None, epochs: int = 30, endpoints: List[Tuple[str, int]] = None,
+                 batch: bool = False, offspring_size: int = 1, fitness_cache: FitnessCache = None,
+                 use_genotype: bool = False, surrogate_candidates: int = None, checkpoint_frequency: int = None,
+                 racing_repetitions: int = None, seed=None, warm_scenario: bool = False, offline: bool = False,
+                 early_exit: EarlyExit = None):
 
         self.method_name = method_name
         self.case_name = case_name
         self.epochs = epochs
         # Generate mutators
         self.mutators = [categorize_mutator(m) for m in mutators]
+        # Evaluate on a pool of simulator instances when endpoints are given,
+        # the batch mode of Random Search needs the pool as well
+        self.batch = batch
+        # Number of mutants evaluated per epoch by OpO, (1+lambda)
+        self.offspring_size = offspring_size
+        # Scores of already simulated configurations, shared between experiments
+        self.fitness_cache = fitness_cache
+        # Individuals are compact genotypes over the original scenario instead of full scenario copies, on opt-in
+        self.use_genotype = use_genotype
+        # OpO simulates only the best predicted of surrogate_candidates mutants per offspring when it is given
+        self.surrogate_candidates = surrogate_candidates
+        # Compare individuals by racing up to racing_repetitions simulations instead of a single one
+        self.racing_repetitions = racing_repetitions
+        # The scenario of the case stays loaded in the simulator, the evaluations only reset its vehicles.
+        # Offline, the evaluations run on the kinematic executor instead of BeamNG.
+        # The simulations end as soon as their outcome is decided by the early exit rules, when they are given
+        self.early_exit = early_exit
+        self.fitness = Fitness.evaluate
+        if warm_scenario or offline or early_exit is not None:
+            self.fitness = functools.partial(Fitness.evaluate, warm_scenario=warm_scenario, offline=offline,
+                                             early_exit=early_exit)
+        # Every random stream of the run is spawned from one seed, so the run is replayed from its printed seed
+        self.seed = np.random.SeedSequence(seed)
+        generator_seed, worker_seed = self.seed.spawn(2)
+        self.rng = np.random.default_rng(generator_seed)
+        self.executor = ParallelExecutor(endpoints, seed=worker_seed) if endpoints is not None or batch else None
 
         try:
             tmp_simulation_name = 'beamng_executor/sim_$(id)'.replace('$(id)', time.strftime('%Y-%m-%d--%H-%M-%S',
                                                                                              time.localtime()))
             self.simulation_name = tmp_simulation_name if simulation_name is None else simulation_name
+            # Snapshot the run every checkpoint_frequency epochs, so that it can be resumed
+            self.checkpoint = None
+            if checkpoint_frequency is not None:
+                self.checkpoint = Checkpoint(f'outputs/{self.case_name}/checkpoint/{self.simulation_name}.pkl',
+                                             checkpoint_frequency)
             with open(file_path) as file:
                 self.scenario = json.load(file)
             try:
@@ -31,9 +71,9 @@ class Experiment:
             except Exception as e:
                 self.ac3r_data = None
 
-            sim_factory = SimulationFactory(CrashScenario.from_json(self.scenario, self.ac3r_data))
-            simulation = Simulation(sim_factory=sim_factory, name=self.case_name, need_teleport=True)
-            self.threshold = SimulationScore(simulation).get_expected_score()
+            # The threshold only depends on the police reports, no simulation is built for it
+            crash_scenario = CrashScenario.from_json(self.scenario, self.ac3r_data)
+            self.threshold = SimulationScore.from_reports(crash_scenario.reports)
         except Exception as ex:
             print(f'Scenario is not found. Exception: {ex}!')
 
@@ -42,11 +82,36 @@ class Experiment:
             print(f'Scenario is not found')
             return False
 
+        # Resume an interrupted run from its last completed epoch
+        if self.checkpoint is not None and self.checkpoint.exists():
+            print(f'Resume {self.method_name} from checkpoint {self.checkpoint.path}')
+
+        # Libraries drawing from the global random states are seeded as well
+        rngs.seed(self.seed)
+        print(f'Seed: {self.seed.entropy}')
+
         # Run the experiment
-        if self.method_name == CONST.RANDOM:
-            self._run_rev()
-        elif self.method_name == CONST.OPO:
-            self._run_opo()
+        try:
+            if self.method_name == CONST.RANDOM:
+                self._run_rev()
+            elif self.method_name == CONST.OPO:
+                self._run_opo()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+            # The simulator of this process is kept running for the whole experiment only
+            if SimulationSession.get().launches > 0:
+                print(f'Simulator session: {SimulationSession.get().get_stats()}')
+            SimulationSession.close_current()
+            if self.fitness_cache is not None:
+                print(f'Fitness cache: {self.fitness_cache.get_stats()}')
+            # Only the simulations of this process are counted, not the ones of the executor
+            if self.early_exit is not None and self.early_exit.get_stats()["runs"] > 0:
+                print(f'Early exit: {self.early_exit.get_stats()}')
+
+    def _create_individual(self):
+        scenario = CrashScenario.from_json(self.scenario, self.ac3r_data)
+        return Genotype.from_scenario(scenario) if self.use_genotype else scenario
 
     def _run_rev(self):
         # Write data file
@@ -58,47 +123,68 @@ class Experiment:
         rev_log_data_file = f'outputs/{self.case_name}/log/{self.simulation_name}.csv'
 
         # Experiment run
+        individual = self._create_individual()
         rev = RandomEvolution(
-            scenario=CrashScenario.from_json(self.scenario, self.ac3r_data),
-            fitness=Fitness.evaluate,
+            scenario=individual,
+            fitness=self.fitness,
             # fitness_repetitions=5,
             generate=Generator.generate_random_from,
-            generate_params=Transformer(self.mutators),
-            select=Selector.by_fitness_value,
+            generate_params=Transformer(self.mutators, self.rng),
+            select=Selector.by_fitness_value if self.racing_repetitions is None else Selector.by_racing,
             # select_aggregate=numpy.mean,
+            select_aggregate=None if self.racing_repetitions is None else Racing(self.racing_repetitions),
             epochs=self.epochs,
             logfile=rev_logfile,
             log_data_file=rev_log_data_file,
-            threshold=self.threshold
+            threshold=self.threshold,
+            executor=self.executor,
+            fitness_cache=self.fitness_cache,
+            batch=self.batch,
+            checkpoint=self.checkpoint,
+            rng=self.rng
         )
         rev.run()
+        if self.use_genotype:
+            release_base(individual.key)
 
         # Close logfiles
         rev_logfile.close()
 
     def _run_opo(self):
         # Write data file
+        pathlib.Path(f'outputs/{self.case_name}/log').mkdir(parents=True, exist_ok=True)
+        pathlib.Path(f'outputs/{self.case_name}/bbox').mkdir(parents=True, exist_ok=True)
         opo_logfile = open(f'outputs/{self.case_name}/{self.simulation_name}.csv', "a")
         opo_logfile.write("v1,v2,score\n")
         opo_log_data_file = f'outputs/{self.case_name}/log/{self.simulation_name}.csv'
 
         # Experiment run
+        individual = self._create_individual()
         oev = OpoEvolution(
-            scenario=CrashScenario.from_json(self.scenario, self.ac3r_data),
-            fitness=Fitness.evaluate,
+            scenario=individual,
+            fitness=self.fitness,
             # fitness_repetitions=5,
             generate=Generator.generate_random_from,
-            generate_params=Transformer(self.mutators),
+            generate_params=Transformer(self.mutators, self.rng),
             mutate=Mutator.mutate_from,
-            mutate_params=Transformer(self.mutators),
-            select=Selector.by_fitness_value,
+            mutate_params=Transformer(self.mutators, self.rng),
+            select=Selector.by_fitness_value if self.racing_repetitions is None else Selector.by_racing,
             # select_aggregate=libs._VD_A,
+            select_aggregate=None if self.racing_repetitions is None else Racing(self.racing_repetitions),
             epochs=self.epochs,
             logfile=opo_logfile,
             log_data_file=opo_log_data_file,
-            threshold=self.threshold
+            threshold=self.threshold,
+            executor=self.executor,
+            fitness_cache=self.fitness_cache,
+            offspring_size=self.offspring_size,
+            surrogate=None if self.surrogate_candidates is None else Surrogate(self.surrogate_candidates),
+            checkpoint=self.checkpoint,
+            rng=self.rng
         )
         oev.run()
+        if self.use_genotype:
+            release_base(individual.key)
 
         # Close logfiles
         opo_logfile.close()
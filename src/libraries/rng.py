@@ -0,0 +1,33 @@
+import random
+import numpy as np
+
+# Stream used by the code which is not given a generator explicitly, see seed()
+_ROOT = np.random.SeedSequence()
+_RNG = np.random.default_rng(_ROOT)
+
+
+def default_rng() -> np.random.Generator:
+    return _RNG
+
+
+def seed(entropy=None) -> np.random.SeedSequence:
+    """
+    Reset the default stream of this process from a seed, or from a SeedSequence spawned for a worker. The global
+    random and numpy.random states are seeded from it as well, for the libraries drawing from them.
+
+    Returns:
+        SeedSequence: the root of the stream, its entropy replays the run.
+    """
+    global _ROOT, _RNG
+    _ROOT = entropy if isinstance(entropy, np.random.SeedSequence) else np.random.SeedSequence(entropy)
+    _RNG = np.random.default_rng(_ROOT)
+    random.seed(int(_ROOT.generate_state(1)[0]))
+    np.random.seed(_ROOT.generate_state(1))
+    return _ROOT
+
+
+def spawn(n: int, root: np.random.SeedSequence = None):
+    """
+    Return n independent child SeedSequences of root, or of the default stream, e.g. one per worker process.
+    """
+    return (_ROOT if root is None else root).spawn(n)
@@ -1,11 +1,18 @@
 import click
 import json
+import os
 import platform
+import time
 import numpy as np
-from src.models import SimulationFactory, Simulation, SimulationScore, SimulationExec
-from src.models.ac3rp import CrashScenario
+from src.models import SimulationFactory, Simulation, SimulationScore, SimulationExec, SimulationSession, \
+    KinematicExec
+from src.models.ac3rp import CrashScenario, ScenarioCache
+from src.models.accelerator import Accelerator
+from src.models.simulation_factory import ACCELERATOR_OFFSETS, ACCELERATOR_DISTANCE
 from src.models.constant import CONST
 from experiment import Experiment
+from campaign import Campaign
+from rescore import Rescorer
 from visualization import Scenario as VehicleTrajectoryVisualizer, ExperimentVisualizer, Preprocessing, Report
 
 import warnings
@@ -15,7 +22,8 @@ warnings.filterwarnings('ignore')
 
 @click.group()
 def cli():
-    pass
+    # The compiled roads of the cases are kept across the runs
+    ScenarioCache.configure("outputs/scenario_cache")
 
 
 @cli.command()
@@ -45,8 +53,9 @@ def plot_ac3rp(ctx, scenario):
 @cli.command()
 @click.option('--scenario', required=True, type=click.Path(exists=True), multiple=False,
               help="Input accident sketch for generating the simulation")
+@click.option('--offline', is_flag=True, help="Run the kinematic simulation instead of BeamNG")
 @click.pass_context
-def run_from(ctx, scenario):
+def run_from(ctx, scenario, offline):
     # Pass the context of the command down the line
     ctx.ensure_object(dict)
 
@@ -62,10 +71,16 @@ def run_from(ctx, scenario):
         ac3r_data = None
 
     sim_factory = SimulationFactory(CrashScenario.from_json(crisce_data, ac3r_data))
-    simulation = Simulation(sim_factory=sim_factory, name=scenario.split('\\')[1], need_teleport=True, debug=False)
+    # Name of the case folder, for Windows and POSIX paths
+    case_name = scenario.replace('\\', '/').split('/')[1]
+    simulation = Simulation(sim_factory=sim_factory, name=case_name, need_teleport=True, debug=False)
 
-    # Running on Windows only
-    if platform.system() == CONST.WINDOWS:
+    # Running on Windows only, or offline on any platform
+    if offline:
+        KinematicExec(simulation=simulation).execute(timeout=20)
+        print(f'Simulation Score: {SimulationScore(simulation).calculate(debug=True)}')
+        print(f'Expected Score: {SimulationScore(simulation).get_expected_score(debug=False)}')
+    elif platform.system() == CONST.WINDOWS:
         SimulationExec(simulation=simulation, is_birdview=False).execute(timeout=20)
         print(f'Simulation Score: {SimulationScore(simulation).calculate(debug=True)}')
         print(f'Expected Score: {SimulationScore(simulation).get_expected_score(debug=False)}')
@@ -81,7 +96,128 @@ def search_from(ctx, scenario):
     experiment.run()
 
 
-def execute_searching_from(scenario_files):
+@cli.command()
+@click.option('--campaign', required=True, type=click.Path(exists=True), multiple=False,
+              help="Campaign file declaring the scenarios, mutators and algorithms to run")
+@click.pass_context
+def run_campaign(ctx, campaign):
+    # Pass the context of the command down the line
+    ctx.ensure_object(dict)
+
+    """Take a JSON campaign file and run its pending jobs."""
+    Campaign.from_file(campaign).run()
+
+
+@cli.command()
+@click.option('--campaign', required=True, type=click.Path(exists=True), multiple=False,
+              help="Campaign file declaring the scenarios, mutators and algorithms whose logs are rescored")
+@click.option('--label', default="rescored", help="Suffix of the new score columns")
+@click.option('--alpha', default=0.2, type=float, help="Weight of the matching crashed parts")
+@click.option('--beta', default=0.1, type=float, help="Weight of the matching non-crashed parts")
+@click.option('--processes', default=None, type=int, help="Number of processes, one per CPU by default")
+@click.pass_context
+def rescore_campaign(ctx, campaign, label, alpha, beta, processes):
+    # Pass the context of the command down the line
+    ctx.ensure_object(dict)
+
+    """Replay the recorded evaluations of a campaign and write their new scores beside the recorded ones."""
+    Rescorer(label=label, alpha=alpha, beta=beta, processes=processes).rescore_campaign(Campaign.from_file(campaign))
+
+
+@cli.command()
+@click.option('--scenario', required=True, type=click.Path(exists=True), multiple=False,
+              help="Input accident sketch for generating the simulation")
+@click.option('--runs', default=5, type=int, help="Number of evaluations per setup mode")
+@click.pass_context
+def benchmark_setup(ctx, scenario, runs):
+    # Pass the context of the command down the line
+    ctx.ensure_object(dict)
+
+    """Compare the per-evaluation setup time of a cold scenario (made and loaded) and a warm one (reset)."""
+    with open(scenario) as file:
+        crisce_data = json.load(file)
+    crash_scenario = CrashScenario.from_json(crisce_data, None)
+
+    setup_times = {}
+    for warm_scenario in [False, True]:
+        setup_times[warm_scenario] = []
+        for _ in range(runs):
+            simulation = Simulation(sim_factory=SimulationFactory(crash_scenario), name=crash_scenario.name,
+                                    need_teleport=True)
+            executor = SimulationExec(simulation=simulation, warm_scenario=warm_scenario)
+            executor.execute(timeout=1)
+            if executor.setup_time is not None:
+                setup_times[warm_scenario].append(executor.setup_time)
+        SimulationSession.get().release()
+    SimulationSession.close_current()
+
+    for warm_scenario, times in setup_times.items():
+        label = "Warm" if warm_scenario else "Cold"
+        # The first warm evaluation still makes and loads the scenario
+        times = times[1:] if warm_scenario and len(times) > 1 else times
+        print(f'{label} setup time: {np.mean(times):.3f}s over {len(times)} run(s)')
+
+
+def _place_accelerators_by_trial(sim_factory: SimulationFactory):
+    # The former placer: set up both accelerators at every offset until they do not cross and end 50 meters apart
+    from src.libraries.common import intersect
+    orig = sim_factory.get_center_scenario()
+    for eps in ACCELERATOR_OFFSETS:
+        for i, player in enumerate(sim_factory.players):
+            player.accelerator = Accelerator(side=i, eps=eps, speed=player.speed, rotation=player.rot, orig=orig)
+            player.accelerator.setup()
+        lines = [p.accelerator.get_lst() for p in sim_factory.players]
+        if intersect(lines, True) > ACCELERATOR_DISTANCE and len(intersect(lines)) == 0:
+            return eps
+    return None
+
+
+@cli.command()
+@click.option('--folder', default="input", type=click.Path(exists=True), multiple=False,
+              help="Folder of the cases, one data.json per case folder")
+@click.option('--runs', default=3, type=int, help="Number of placements per case and placer")
+@click.pass_context
+def benchmark_accelerator(ctx, folder, runs):
+    # Pass the context of the command down the line
+    ctx.ensure_object(dict)
+
+    """Compare the closed-form placement of the accelerators with the former trial-and-error placer."""
+    totals = {"trial": 0, "search": 0, "generate": 0}
+    for case in sorted(os.listdir(folder)):
+        path = os.path.join(folder, case, "data.json")
+        if not os.path.exists(path):
+            continue
+        with open(path) as file:
+            crash_scenario = CrashScenario.from_json(json.load(file), None)
+        sim_factory = SimulationFactory(crash_scenario)
+        sim_factory.generate_players()
+        if len(sim_factory.players) != 2:
+            continue
+
+        times = {"trial": [], "search": [], "generate": []}
+        for _ in range(runs):
+            start = time.perf_counter()
+            expected = _place_accelerators_by_trial(sim_factory)
+            times["trial"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            directions = [Accelerator.get_direction(p.speed, p.rot[2] + 180) for p in sim_factory.players]
+            valid = np.flatnonzero(sim_factory.get_valid_offsets(directions))
+            times["search"].append(time.perf_counter() - start)
+
+            start = time.perf_counter()
+            sim_factory.generate_accelerator(debug=False)
+            times["generate"].append(time.perf_counter() - start)
+        eps = ACCELERATOR_OFFSETS[valid[0]] if len(valid) > 0 else None
+        for name in times:
+            totals[name] += np.mean(times[name])
+        print(f'Case {case}: eps {eps} (former {expected}{"" if eps == expected else ", different"}), '
+              f'trial {np.mean(times["trial"]) * 1000:.1f}ms, search {np.mean(times["search"]) * 1000:.3f}ms, '
+              f'generate_accelerator {np.mean(times["generate"]) * 1000:.1f}ms')
+    print(f'Total: trial {totals["trial"]:.3f}s, search {totals["search"] * 1000:.3f}ms, '
+          f'generate_accelerator {totals["generate"]:.3f}s')
+
+def execute_searching_from(scenario_files, endpoints=None, fitness_cache=None, checkpoint_frequency=None):
     single_mutator = [
         {
             "type": CONST.MUTATE_SPEED_CLASS,
@@ -117,7 +253,10 @@ def execute_searching_from(scenario_files):
                                              simulation_name=sim_name,
                                              mutators=mutator_dict["mutators"],
                                              method_name=CONST.RANDOM,
-                                             epochs=30)
+                                             epochs=30,
+                                             endpoints=endpoints,
+                                             fitness_cache=fitness_cache,
+                                             checkpoint_frequency=checkpoint_frequency)
                 exp.run()
 
             # OpO Search
@@ -129,7 +268,10 @@ def execute_searching_from(scenario_files):
                                              simulation_name=sim_name,
                                              mutators=mutator_dict["mutators"],
                                              method_name=CONST.OPO,
-                                             epochs=30)
+                                             epochs=30,
+                                             endpoints=endpoints,
+                                             fitness_cache=fitness_cache,
+                                             checkpoint_frequency=checkpoint_frequency)
                 exp.run()
             print("=========")
 
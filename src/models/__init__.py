@@ -6,9 +6,16 @@ from .police_report import categorize_report
 from .mutator import categorize_mutator
 from .ac3r import CrashScenario
 from .simulation_factory import SimulationFactory
+from .simulator_backend import SimulatorBackend
 from .simulation import Simulation
+from .simulation_session import SimulationSession
+from .beamng_backend import BeamNGBackend
+from .replay_backend import RecordingBackend, ReplayBackend
 from .simulation_score import SimulationScore
+from .early_exit import EarlyExit
+from .adaptive_step import AdaptiveStep
 from .simulation_execution import SimulationExec
+from .kinematic_execution import KinematicExec
 from .kmeans import KMeans
 from .constant import CONST
 from .accelerator import Accelerator
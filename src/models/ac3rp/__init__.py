@@ -1,5 +1,7 @@
 from .road import Road
 from .vehicle import Vehicle
+from .scenario_cache import ScenarioCache
 from .scenario import CrashScenario
 from .report import Report
 from .movement import Movement
+from .genotype import Genotype
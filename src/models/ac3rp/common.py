@@ -1,4 +1,5 @@
 from scipy.interpolate import splev, splprep
+import numpy as np
 from numpy import repeat, array, sqrt, inf, cross, dot
 from numpy.ma import arange
 from shapely.geometry import LineString
@@ -237,18 +238,19 @@ def is_inside_polygon(point: Point, polygon: Polygon):
     return polygon.contains(point)
 
 
-def generate_random_point_within_circle(center: Point, minR: int, maxR: int):
+def generate_random_point_within_circle(center: Point, minR: int, maxR: int, rng: np.random.Generator = None):
     """
     Generate a random point whose radius is less than maxR
-    and larger than minR.
+    and larger than minR, drawn from the given random stream.
 
     Returns:
         Tuple (x, y)
     """
     import math
-    import random
-    r = math.sqrt(random.random() * (maxR ** 2 - minR ** 2) + minR ** 2)
-    theta = random.random() * 2 * math.pi
+    from src.libraries import rng as rngs
+    rng = rngs.default_rng() if rng is None else rng
+    r = math.sqrt(rng.random() * (maxR ** 2 - minR ** 2) + minR ** 2)
+    theta = rng.random() * 2 * math.pi
     x = center.x + r * math.cos(theta)
     y = center.y + r * math.sin(theta)
     return x, y
@@ -257,7 +259,7 @@ def generate_random_point_within_circle(center: Point, minR: int, maxR: int):
 def generate_random_point_within_line(center: Point, delta: Tuple,
                                       distance: int = None,
                                       minR: int = None, maxR: int = None,
-                                      mode: int = 0):
+                                      mode: int = 0, rng: np.random.Generator = None):
     """
     Generate a random point by given a line equation,
     central point, min and max distance.
@@ -271,12 +273,14 @@ def generate_random_point_within_line(center: Point, delta: Tuple,
         mode (int): How to compute a new initial point.
             0: A random point belongs to delta with given distance
             1: A random point belongs to delta with min and max distance
+        rng (np.random.Generator): Random stream to draw from, the default stream when None
 
     Returns:
         Tuple (x, y)
     """
     import math
-    import random
+    from src.libraries import rng as rngs
+    rng = rngs.default_rng() if rng is None else rng
     # Reference:
     # https://math.stackexchange.com/questions/426807/how-does-this-vector-addition-work-in-geometry
 
@@ -284,16 +288,16 @@ def generate_random_point_within_line(center: Point, delta: Tuple,
         distance = distance
         random_direction = 1
     else:
-        distance = random.randint(minR, maxR)
-        random_direction = 1 if random.random() < 0.5 else -1
+        distance = rng.integers(minR, maxR, endpoint=True)
+        random_direction = 1 if rng.random() < 0.5 else -1
 
     if delta[0] is None:  # any x, y unchanged
-        point2 = Point(center.x + random.random(), delta[1])
+        point2 = Point(center.x + rng.random(), delta[1])
     elif delta[1] is None:  # any y, x unchanged
-        point2 = Point(delta[0], center.y + random.random())
+        point2 = Point(delta[0], center.y + rng.random())
     else:
         a, b = delta
-        x = center.x + random.random()
+        x = center.x + rng.random()
         point2 = Point(x, a * x + b)
 
     v = (point2.x - center.x, point2.y - center.y)
@@ -342,7 +346,7 @@ def mutate_initial_point(lst: LineString,
                          distance: int = None,
                          minR: int = None, maxR: int = None,
                          num_points: int = 1,
-                         mode: int = 0):
+                         mode: int = 0, rng: np.random.Generator = None):
     """
     Mutate an initial point of vehicle trajectory by generated a new initial point
 
@@ -358,20 +362,20 @@ def mutate_initial_point(lst: LineString,
             0: A random point belongs to delta with given distance
             1: A random point belongs to delta with min and max distance
             2: A random point belongs to circle with min and max radius
-
+        rng (np.random.Generator): Random stream to draw from, the default stream when None
 
     Returns:
         random_points (List): A list of new initial points on the circle or on the same line of an old initial point
     """
     first, last = lst.boundary
     if mode == 0:
-        return [generate_random_point_within_line(center=first, delta=delta, distance=distance, mode=mode) for i in
-                range(num_points)]
+        return [generate_random_point_within_line(center=first, delta=delta, distance=distance, mode=mode, rng=rng)
+                for i in range(num_points)]
     elif mode == 1:
-        return [generate_random_point_within_line(center=first, delta=delta, minR=minR, maxR=maxR, mode=mode) for i in
-                range(num_points)]
+        return [generate_random_point_within_line(center=first, delta=delta, minR=minR, maxR=maxR, mode=mode,
+                                                  rng=rng) for i in range(num_points)]
 
-    random_points = [generate_random_point_within_circle(first, minR, maxR) for i in range(num_points)]
+    random_points = [generate_random_point_within_circle(first, minR, maxR, rng) for i in range(num_points)]
     return random_points
 
 
@@ -0,0 +1,107 @@
+import copy
+import uuid
+import numpy as np
+from typing import List
+from src.models.ac3rp.vehicle import Vehicle
+from src.models.ac3rp.movement import Movement
+from src.models.ac3rp.scenario import CrashScenario
+
+SPEED, DX, DY = 0, 1, 2  # Columns of the genes array
+
+# Base scenarios of the current process, genotypes only carry the key of their base
+# when they are pickled, e.g. to be evaluated by a worker process
+SHARED_BASES = {}
+
+
+def register_base(scenario: CrashScenario) -> str:
+    key = str(uuid.uuid4())
+    SHARED_BASES[key] = scenario
+    return key
+
+
+def release_base(key: str):
+    SHARED_BASES.pop(key, None)
+
+
+def _restore(key: str, genes: np.ndarray, scores: list):
+    if key not in SHARED_BASES:
+        raise Exception(f'Exception: Base scenario {key} is not registered in this process!')
+    genotype = Genotype(SHARED_BASES[key], genes, key)
+    genotype.scores = scores
+    return genotype
+
+
+class Genotype:
+    """
+    The Genotype class declares a compact representation of a crash scenario: one row per vehicle with its speed
+    and the offset of its trajectory origin from the base scenario. Roads, reports and vehicle data are shared
+    with the base scenario and are never copied. The vehicles are only materialised when they are read.
+
+    Args:
+        base (CrashScenario): the original crash scenario provided by AC3RPlus.
+        genes (np.array): array of shape (number of vehicles, 3) with [speed, dx, dy] rows.
+        key (str): key of the base scenario in SHARED_BASES.
+    """
+
+    @staticmethod
+    def from_scenario(scenario: CrashScenario) -> 'Genotype':
+        genes = np.array([[v.get_speed(), 0, 0] for v in scenario.vehicles], dtype=float)
+        return Genotype(scenario, genes, register_base(scenario))
+
+    def __init__(self, base: CrashScenario, genes: np.ndarray, key: str = None):
+        self.base = base
+        self.genes = genes
+        self.key = key
+        self.scores = []
+        self._vehicles = None
+
+    @property
+    def name(self):
+        return self.base.name
+
+    @property
+    def vehicles(self) -> List[Vehicle]:
+        """
+        Materialise the vehicles of this genotype, they can be mutated and written back with commit().
+        """
+        if self._vehicles is None:
+            self._vehicles = []
+            for base_vehicle, (speed, dx, dy) in zip(self.base.vehicles, self.genes):
+                vehicle = copy.copy(base_vehicle)  # road_data and the other attributes stay shared
+                vehicle.movement = Movement([(p[0] + dx, p[1] + dy, speed) for p in base_vehicle.movement.trajectory])
+                self._vehicles.append(vehicle)
+        return self._vehicles
+
+    def commit(self):
+        """
+        Write the speeds and trajectory origins of the materialised vehicles back to the genes.
+        """
+        if self._vehicles is None:
+            return
+        for i, (base_vehicle, vehicle) in enumerate(zip(self.base.vehicles, self._vehicles)):
+            base_origin = base_vehicle.movement.get_driving_points()[0]
+            origin = vehicle.movement.get_driving_points()[0]
+            self.genes[i] = [vehicle.get_speed(), origin[0] - base_origin[0], origin[1] - base_origin[1]]
+
+    def to_scenario(self) -> CrashScenario:
+        """
+        Build the crash scenario to simulate, over the roads and reports of the base scenario.
+        """
+        scenario = CrashScenario(self.base.name, self.base.roads, self.vehicles, self.base.reports, self.base.weather)
+        scenario.scores = self.scores
+        return scenario
+
+    def __deepcopy__(self, memo):
+        self.commit()
+        genotype = Genotype(self.base, self.genes.copy(), self.key)
+        genotype.scores = list(self.scores)
+        return genotype
+
+    def __reduce__(self):
+        self.commit()
+        if self.key is None:
+            raise Exception("Exception: Genotype without a registered base scenario cannot be pickled!")
+        return _restore, (self.key, self.genes, self.scores)
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.genes.tolist())
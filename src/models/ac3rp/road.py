@@ -1,3 +1,5 @@
+import numpy as np
+from shapely import wkb
 from shapely.geometry import LineString
 from src.models.ac3rp import common
 from typing import List
@@ -11,6 +13,14 @@ THICKNESS = {
 class Road:
     @staticmethod
     def from_dict(key, road_dict):
+        return Road.from_compiled(key, Road.compile(road_dict))
+
+    @staticmethod
+    def compile(road_dict) -> dict:
+        """
+        Compute the geometry of a road: its interpolated nodes, width, polygon, line equation and the nodes of its
+        lane markings. The compiled geometry is a dict of NumPy arrays and JSON values, see ScenarioCache.
+        """
         center = road_dict["center"]
         #     {
         #       "name" : "road1",
@@ -26,38 +36,33 @@ class Road:
         road_nodes = common.interpolate(center["points"])
         road_lst = LineString([(t[0] + dist_x, t[1] + dist_y) for t in road_nodes])
         first, last = road_lst.boundary
+        # A None coefficient of a vertical or horizontal line is NaN
+        equation = [np.nan if c is None else c for c in common.cal_equation_line_two_points(first, last)]
 
-        left_line = RoadLine(
-            name=f'{key}_left',
-            nodes=road_dict["left"]["points"],
-            pattern=road_dict["left"]["pattern"],
-            thickness=road_dict["left"]["num"],
-        )
-        right_line = RoadLine(
-            name=f'{key}_right',
-            nodes=road_dict["right"]["points"],
-            pattern=road_dict["right"]["pattern"],
-            thickness=road_dict["right"]["num"],
-        )
-        middle_lines = []
-        for i, line in enumerate(road_dict["marks"]):
-            line = RoadLine(
-                name=f'{key}_middle_{i}',
-                nodes=line["points"],
-                pattern=line["pattern"],
-                thickness=line["num"],
-            )
-            middle_lines.append(line)
+        lines = [("left", road_dict["left"]), ("right", road_dict["right"])]
+        lines.extend([(f'middle_{i}', line) for i, line in enumerate(road_dict["marks"])])
+        return {
+            "road_nodes": np.array(road_nodes, dtype=float),
+            "road_width": road_width,
+            "road_poly": road_lst.buffer(road_width, cap_style=2, join_style=2).wkb,
+            "road_line_equation": np.array(equation, dtype=float),
+            "lines": [{"name": name, "nodes": np.array([p[:2] for p in line["points"]], dtype=float).reshape(-1, 2),
+                       "pattern": line["pattern"], "thickness": line["num"]} for name, line in lines]
+        }
 
+    @staticmethod
+    def from_compiled(key, compiled: dict):
+        lines = [RoadLine(name=f'{key}_{line["name"]}', nodes=line["nodes"].tolist(), pattern=line["pattern"],
+                          thickness=line["thickness"]) for line in compiled["lines"]]
         return Road(
             name=key,
-            road_nodes=road_nodes,
-            road_width=road_width,
-            road_poly=road_lst.buffer(road_width, cap_style=2, join_style=2),
-            road_line_equation=common.cal_equation_line_two_points(first, last),
-            left_line=left_line,
-            right_line=right_line,
-            middle_lines=middle_lines
+            road_nodes=[tuple(n) for n in compiled["road_nodes"].tolist()],
+            road_width=compiled["road_width"],
+            road_poly=wkb.loads(compiled["road_poly"]),
+            road_line_equation=tuple(None if np.isnan(c) else c for c in compiled["road_line_equation"].tolist()),
+            left_line=lines[0],
+            right_line=lines[1],
+            middle_lines=lines[2:]
 
         )
 
@@ -1,6 +1,7 @@
 from src.models.ac3rp.vehicle import Vehicle
 from src.models.ac3rp.road import Road
 from src.models.ac3rp.report import Report
+from src.models.ac3rp.scenario_cache import ScenarioCache
 from typing import List
 
 WEATHER_DICT = {
@@ -14,9 +15,10 @@ WEATHER_DICT = {
 
 class CrashScenario:
     @staticmethod
-    def from_json(crisce_json_data, ac3r_json_data=None):
+    def from_json(crisce_json_data, ac3r_json_data=None, cache: ScenarioCache = None):
         """
-        Take the JSON file generated by AC3R and instantiate a proper CrashScenario object.
+        Take the JSON file generated by AC3R and instantiate a proper CrashScenario object. The road geometry is
+        compiled once per input content, the compiled one is read from the cache, the one of the process when None.
         """
         # Define the car trajectories by interpolating the given points according to the following heuristic
         # if only one point is given, that's a location (crash location, parked position, etc)
@@ -28,10 +30,11 @@ class CrashScenario:
         else:
             weather = WEATHER_DICT[ac3r_json_data["environment"]["weather"]]
 
-        roads = []
-        for i, road_dict in enumerate(crisce_json_data["roads"]):
-            key = f'road_{i}'
-            roads.append(Road.from_dict(key, road_dict))
+        cache = ScenarioCache.get() if cache is None else cache
+        cache_key = cache.get_key(crisce_json_data)
+        roads = cache.get_roads(cache_key)
+        if roads is None:
+            roads = cache.put_roads(cache_key, [Road.compile(road_dict) for road_dict in crisce_json_data["roads"]])
 
         vehicles = []
         for i, vehicle_dict in enumerate(crisce_json_data["vehicles"]):
@@ -0,0 +1,116 @@
+import hashlib
+import json
+import os
+import numpy as np
+from typing import List
+from src.models.ac3rp.road import Road
+
+# Part of the keys, compiled scenarios of a former version of the compilation are compiled again
+COMPILED_VERSION = 1
+
+
+class ScenarioCache:
+    """
+    The ScenarioCache class declares the cache of the compiled road geometry of the crash scenarios, keyed by the
+    hash of the content of the roads of their input JSON: the interpolated road nodes, polygons, line equations and
+    lane marking nodes, see Road.compile. When a folder is given, the compiled roads are persisted in a .npz file
+    per input, so that loading the same case again skips the spline fits. The roads built from them are kept in
+    memory for the process and shared by the scenarios of the same input, as the roads of a Genotype are shared
+    with its base scenario.
+
+    Args:
+        folder (str): location of the compiled scenarios, in memory only when None.
+    """
+    current: 'ScenarioCache' = None
+
+    @staticmethod
+    def get() -> 'ScenarioCache':
+        # One cache per process, in memory only until it is configured
+        if ScenarioCache.current is None:
+            ScenarioCache.current = ScenarioCache()
+        return ScenarioCache.current
+
+    @staticmethod
+    def configure(folder: str = None) -> 'ScenarioCache':
+        ScenarioCache.current = ScenarioCache(folder)
+        return ScenarioCache.current
+
+    def __init__(self, folder: str = None):
+        self.folder = folder
+        self.roads = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get_key(self, crisce_json_data: dict) -> str:
+        # Canonical JSON, the key does not depend on the order of the keys of the input
+        content = json.dumps([COMPILED_VERSION, crisce_json_data["roads"]], sort_keys=True)
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.folder, f'{key}.npz')
+
+    @staticmethod
+    def _build(compiled: List[dict]) -> List[Road]:
+        return [Road.from_compiled(f'road_{i}', road) for i, road in enumerate(compiled)]
+
+    def get_roads(self, key: str) -> List[Road]:
+        """
+        Return the roads of the input with the given key, None when they are not cached.
+        """
+        roads = self.roads.get(key)
+        if roads is None and self.folder is not None and os.path.exists(self._path(key)):
+            roads = self._build(self.load(self._path(key)))
+            self.roads[key] = roads
+        if roads is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return None if roads is None else list(roads)
+
+    def put_roads(self, key: str, compiled: List[dict]) -> List[Road]:
+        """
+        Cache the compiled roads of the input with the given key and return the roads built from them.
+        """
+        self.roads[key] = self._build(compiled)
+        if self.folder is not None:
+            os.makedirs(self.folder, exist_ok=True)
+            self.save(self._path(key), compiled)
+        return list(self.roads[key])
+
+    @staticmethod
+    def save(path: str, roads: List[dict]):
+        # Arrays in the archive, everything else in its JSON header
+        arrays, header = {}, []
+        for i, road in enumerate(roads):
+            arrays[f'road_{i}_nodes'] = road["road_nodes"]
+            arrays[f'road_{i}_poly'] = np.frombuffer(road["road_poly"], dtype=np.uint8)
+            arrays[f'road_{i}_equation'] = road["road_line_equation"]
+            for j, line in enumerate(road["lines"]):
+                arrays[f'road_{i}_line_{j}'] = line["nodes"]
+            header.append({"road_width": road["road_width"],
+                           "lines": [{k: v for k, v in line.items() if k != "nodes"} for line in road["lines"]]})
+        arrays["header"] = np.array(json.dumps(header))
+        # Written aside first, so that a concurrent load never reads a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp.npz'
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @staticmethod
+    def load(path: str) -> List[dict]:
+        roads = []
+        with np.load(path) as data:
+            for i, road in enumerate(json.loads(str(data["header"]))):
+                roads.append({
+                    "road_nodes": data[f'road_{i}_nodes'],
+                    "road_width": road["road_width"],
+                    "road_poly": data[f'road_{i}_poly'].tobytes(),
+                    "road_line_equation": data[f'road_{i}_equation'],
+                    "lines": [{**line, "nodes": data[f'road_{i}_line_{j}']} for j, line in enumerate(road["lines"])]
+                })
+        return roads
+
+    def get_stats(self) -> dict:
+        return {"entries": len(self.roads), "hits": self.hits, "misses": self.misses}
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -24,21 +24,34 @@ class Accelerator:
         self.orig = (x, y, 0)
         self.rotation = rotation[2] + 180
 
+    @staticmethod
+    def get_trajectory(orig, speed: float, rotation: float) -> np.ndarray:
+        """
+        Return the (n, 3) trajectory of x, y and speed of an accelerator: a straight line from orig along the rotation,
+        400 points one meter apart, or 2 points for a parked vehicle.
+        """
+        num_points = 400 if speed > 0 else 2
+        direction = np.around([np.sin(math.radians(rotation)), np.cos(math.radians(rotation))], decimals=5)
+        i = np.arange(num_points)[:, None]
+        trajectory = np.empty((num_points, 3))
+        trajectory[:, :2] = np.array(orig[:2]) + i * direction
+        trajectory[:, 2] = speed
+        return trajectory
+
+    @staticmethod
+    def get_direction(speed: float, rotation: float) -> np.ndarray:
+        """
+        Return the vector from the first to the last point of the trajectory of an accelerator.
+        """
+        trajectory = Accelerator.get_trajectory((0, 0, 0), speed, rotation)
+        return trajectory[-1, :2] - trajectory[0, :2]
+
     def setup(self, is_debug: bool = False):
         # Using an initial rotation of the car
         # Generate a trajectory
-        num_points = 400 if self.speed > 0 else 2
-        orig = self.orig
-        trajectory = list()
+        trajectory = self.get_trajectory(self.orig, self.speed, self.rotation)
         color = [1.0, 0.0, 0.0, 1]
 
-        for i in range(num_points):
-            trajectory.append([
-                orig[0] + i * np.around(np.sin(math.radians(self.rotation)), decimals=5),
-                orig[1] + i * np.around(np.cos(math.radians(self.rotation)), decimals=5),
-                self.speed
-            ])
-
         road_pf = RoadProfiler()
         road_pf.compute_ai_script(trajectory=trajectory, color=color)
 
@@ -0,0 +1,48 @@
+STEPS_PER_SECOND = 60
+
+
+class AdaptiveStep:
+    """
+    The AdaptiveStep class declares the number of simulator steps of every tick of an execution. The vehicles are
+    stepped coarsely while they cannot touch before the next tick, i.e. on their accelerators or far apart, and finely
+    once they are closer than fine_distance. A coarse tick never lasts longer than half the time the vehicles take to
+    close their distance down to fine_distance at their current closing speed, so that no contact happens in it.
+
+    Args:
+        fine_steps (int): the steps of a tick when the vehicles are close.
+        coarse_steps (int): the maximum steps of a tick.
+        fine_distance (float): the distance between the vehicles below which the ticks are fine, in meters.
+    """
+
+    def __init__(self, fine_steps: int = 10, coarse_steps: int = 60, fine_distance: float = 20):
+        self.fine_steps = fine_steps
+        self.coarse_steps = coarse_steps
+        self.fine_distance = fine_distance
+        self.distance = None
+        self.sim_time = None
+
+    def start(self):
+        self.distance = None
+        self.sim_time = None
+
+    def get_steps(self, distance: float, sim_time: float, seconds_per_step: float = 1 / STEPS_PER_SECOND,
+                  is_accelerating: bool = False, fine_distance: float = None) -> int:
+        """
+        Return the steps of the next tick from the distance between the vehicles at the simulated time of the current
+        tick. The ticks are fine below fine_distance, the one of the execution when None, e.g. a greater distance
+        to trigger a vehicle at.
+        """
+        fine_distance = self.fine_distance if fine_distance is None else max(fine_distance, self.fine_distance)
+        last_distance, last_time = self.distance, self.sim_time
+        self.distance, self.sim_time = distance, sim_time
+        # The vehicles drive on their accelerators, away from the scenario
+        if is_accelerating:
+            return self.coarse_steps
+        if distance is None or distance <= fine_distance or last_distance is None or sim_time <= last_time:
+            return self.fine_steps
+
+        closing_speed = (last_distance - distance) / (sim_time - last_time)
+        if closing_speed <= 0:
+            return self.coarse_steps
+        steps = int((distance - fine_distance) / (2 * closing_speed) / seconds_per_step)
+        return min(max(steps, self.fine_steps), self.coarse_steps)
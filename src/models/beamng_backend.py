@@ -0,0 +1,168 @@
+import hashlib
+from typing import List
+from beamngpy import BeamNGpy, Scenario
+from beamngpy.sensors import Electrics, Timer
+from src.models import SimulatorBackend, SimulationSession
+from src.models.simulation import IS_DEV
+
+
+class BeamNGBackend(SimulatorBackend):
+    """
+    The BeamNGBackend class declares the SimulatorBackend of BeamNG. The simulator is the running one of the
+    session, a scenario is made and loaded per execution, or kept loaded in the warm scenario mode. Every
+    beamngpy call of an execution, including the ones depending on the beamngpy version, is made here.
+
+    Args:
+        session (SimulationSession): the simulator session, the one of the process when None.
+        warm_scenario (bool): keep the scenario of a case loaded and only reset its vehicles between executions.
+    """
+
+    def __init__(self, session: SimulationSession = None, warm_scenario: bool = False):
+        # The simulator is kept running between executions, by default one per process
+        self.session = SimulationSession.get() if session is None else session
+        self.warm_scenario = warm_scenario
+        self.bng: BeamNGpy = None
+        self.scenario: Scenario = None
+        self.key = None
+        # The vehicles of a warm execution are the connected ones of the loaded scenario
+        self.is_warm = False
+        self.round_trips = 0
+
+    @staticmethod
+    def get_scenario_key(simulation) -> str:
+        # The roads and the vehicles of a case are the same across its executions, only their states differ
+        content = [simulation.name, simulation.weather]
+        for road in simulation.roads:
+            content.append([road.rid, road.nodes])
+        for player in simulation.players:
+            content.append([player.vehicle.vid, player.vehicle.options.get("model")])
+        return hashlib.sha1(str(content).encode()).hexdigest()
+
+    def prepare(self, simulation, positions: List[tuple]) -> bool:
+        # BeamNG scenario init, on the running simulator
+        self.bng = self.session.acquire()
+        self.key = self.get_scenario_key(simulation) if self.warm_scenario else None
+        self.is_warm = self.session.is_loaded(self.key)
+        if self.is_warm:
+            self.session.bind(simulation.players)
+            return True
+
+        self.scenario = Scenario("smallgrid", simulation.name)
+        # Import roads from scenario obj to beamNG instance
+        for road in simulation.roads:
+            self.scenario.add_road(road)
+        # Import vehicles from scenario obj to beamNG instance
+        for player, pos in zip(simulation.players, positions):
+            self.scenario.add_vehicle(player.vehicle, pos=pos, rot=player.rot, rot_quat=player.rot_quat)
+        self.scenario.make(self.bng)
+        self.bng.set_deterministic()
+        # self.bng.remove_step_limit()
+        return False
+
+    def start(self, simulation, positions: List[tuple], is_warm: bool = False):
+        if is_warm:
+            self.session.reset(simulation.players, positions)
+            return
+        self.bng.load_scenario(self.scenario)
+        self.bng.start_scenario()
+        self.bng.set_weather_preset(simulation.weather)
+        if self.warm_scenario:
+            self.session.keep(self.key, simulation.players)
+
+    def release(self, failed: bool = False):
+        if failed:
+            # The simulator may be in any state after a failure, so the next execution starts a new one
+            self.session.invalidate()
+        else:
+            # Only the scenario is unloaded, the simulator keeps running for the next execution
+            self.session.release(keep_scenario=self.warm_scenario)
+
+    def record_setup(self, is_warm: bool, setup_time: float):
+        self.session.record_setup(is_warm, setup_time)
+
+    def step(self, steps: int):
+        self.bng.step(steps)
+        self.round_trips += 1
+
+    def _poll_sensors(self, vehicle) -> dict:
+        sensors = self.bng.poll_sensors(vehicle)
+        self.round_trips += 1
+        # Check whether the imported vehicle existed in beamNG instance or not
+        if bool(sensors) is False:
+            raise Exception("Exception: Vehicle not found in bng_instance!")
+        return sensors
+
+    @staticmethod
+    def _to_state(vehicle, sensors: dict) -> dict:
+        # The state is a sensor from beamngpy 1.23, it is synchronised by the poll before
+        state = sensors["state"] if IS_DEV else vehicle.state
+        return {
+            "pos": tuple(state["pos"]),
+            "dir": tuple(state["dir"]),
+            "vel": tuple(state["vel"]),
+            "timer": sensors["timer"]["time"] if "timer" in sensors else None,
+            "electrics": sensors.get("electrics", {})
+        }
+
+    def poll_state(self, vehicle) -> dict:
+        return self._to_state(vehicle, self._poll_sensors(vehicle))
+
+    def poll_damage(self, vehicle) -> dict:
+        return self._poll_sensors(vehicle)["damage"]
+
+    def poll(self, vehicle) -> dict:
+        # The sensors and the state of the vehicle come with a single request
+        sensors = self._poll_sensors(vehicle)
+        return {"state": self._to_state(vehicle, sensors), "damage": sensors["damage"]}
+
+    def set_script(self, vehicle, script: List[dict], cling: bool = True):
+        vehicle.ai_set_mode("manual")
+        vehicle.ai_set_script(script, cling=cling)
+        self.round_trips += 2
+
+    def stop(self, vehicle):
+        vehicle.ai_set_mode('disable')
+        if IS_DEV:
+            vehicle.set_velocity(0)
+        else:
+            vehicle.ai_set_speed(0, 'set')
+        vehicle.control(throttle=0, steering=0, brake=0, parkingbrake=0)
+        vehicle.update_vehicle()
+        self.round_trips += 4
+
+    def teleport(self, vehicle, pos: tuple):
+        cmd = f'scenetree.findObject(\'{vehicle.vid}\'):setPositionNoPhysicsReset(vec3{tuple(pos)})'
+        self.bng.queue_lua_command(cmd)
+        self.round_trips += 1
+
+    def get_bbox(self, vehicle) -> dict:
+        self.round_trips += 1
+        return vehicle.get_bbox()
+
+    def attach_sensors(self, vehicle, sensors: list = None):
+        # The sensors attached on the cold start stay attached to the vehicles of the loaded scenario
+        if self.is_warm:
+            return
+        vehicle.attach_sensor('electrics', Electrics())
+        vehicle.attach_sensor('timer', Timer())
+        if sensors:
+            for (name, sensor) in sensors:
+                vehicle.attach_sensor(name, sensor)
+
+    def render_debug_line(self, road_pf):
+        if IS_DEV:
+            ids = self.bng.add_debug_spheres(coordinates=road_pf.points,
+                                             radii=road_pf.radii,
+                                             rgba_colors=road_pf.sphere_colors)
+            self.session.add_debug("remove_debug_spheres", ids)
+        else:
+            line_id = self.bng.add_debug_line(road_pf.points, road_pf.sphere_colors,
+                                              spheres=road_pf.spheres, sphere_colors=road_pf.sphere_colors,
+                                              cling=True, offset=0.1)
+            self.session.add_debug("remove_debug_line", line_id)
+
+    def enable_free_cam(self, pos: tuple, direction: tuple):
+        self.bng.set_free_camera(pos, direction)
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -0,0 +1,69 @@
+class EarlyExit:
+    """
+    The EarlyExit class declares the rules ending the execution of a simulation as soon as its outcome is decided,
+    instead of stepping the simulator until the timeout. The crash rule ends it settle_time simulated seconds after
+    the first damage, so that the damage of the crash accumulates. The no-crash rule ends it when the vehicles are
+    past their closest approach: their distance keeps increasing during diverging_time simulated seconds, whatever
+    the length of the ticks, and they are at least min_distance meters apart. A rule is disabled when its parameter is None.
+
+    The simulated and wall time saved by the early exits are summed over the executions, see get_stats.
+
+    Args:
+        settle_time (float): the simulated seconds between the first damage and the end of the execution.
+        diverging_time (float): the simulated seconds the vehicles are moving away from each other.
+        min_distance (float): the minimum distance between the diverging vehicles, in meters.
+    """
+    CRASH = "crash"
+    NO_CRASH = "no-crash"
+
+    def __init__(self, settle_time: float = 1.0, diverging_time: float = 3.0, min_distance: float = 15):
+        self.settle_time = settle_time
+        self.diverging_time = diverging_time
+        self.min_distance = min_distance
+        self.crash_time = None
+        self.distance = None
+        # Simulated time of the closest approach, the last tick the distance did not increase
+        self.approach_time = None
+        self.stats = {"runs": 0, self.CRASH: 0, self.NO_CRASH: 0, "saved_sim_time": 0, "saved_wall_time": 0}
+
+    def start(self):
+        self.crash_time = None
+        self.distance = None
+        self.approach_time = None
+
+    def update(self, timer: float, is_crash: bool, distance: float, is_ready: bool = True):
+        """
+        Update the rules with the simulated time, the crash flag and the distance between the vehicles of the current
+        tick. The vehicles are ready once they are all driving their scripts, e.g. after the teleport.
+        Return the decided outcome, CRASH or NO_CRASH, None while the execution goes on.
+        """
+        if is_crash:
+            if self.crash_time is None:
+                self.crash_time = timer
+            if self.settle_time is not None and timer - self.crash_time >= self.settle_time:
+                return self.CRASH
+            return None
+
+        # Distances before the vehicles are ready, e.g. on their accelerators, tell nothing about the outcome
+        if not is_ready or distance is None:
+            self.distance = None
+            self.approach_time = None
+            return None
+        if self.distance is None or distance <= self.distance:
+            self.approach_time = timer
+        self.distance = distance
+        if self.diverging_time is not None and timer - self.approach_time >= self.diverging_time \
+                and distance >= self.min_distance:
+            return self.NO_CRASH
+        return None
+
+    def record(self, outcome: str, saved_sim_time: float, saved_wall_time: float):
+        self.stats["runs"] += 1
+        if outcome is not None:
+            self.stats[outcome] += 1
+            self.stats["saved_sim_time"] += saved_sim_time
+            self.stats["saved_wall_time"] += saved_wall_time
+
+    def get_stats(self) -> dict:
+        return dict(self.stats)
+
@@ -0,0 +1,179 @@
+import time
+import numpy as np
+from typing import List
+from src.models import Simulation, Player
+from .vehicle_parts_dict import VEHICLE_PARTS_DICT
+
+CRASHED = 1
+NO_CRASH = 0
+# Footprint of the etk800, the model of every generated vehicle
+VEHICLE_LENGTH = 4.6
+VEHICLE_WIDTH = 1.9
+# Closing speed (m/s) at which the parts of the hit zone are fully damaged, any contact damages them a little
+FULL_DAMAGE_SPEED = 20
+MIN_DAMAGE = 0.05
+
+
+def _corners(center: np.ndarray, heading: np.ndarray, length: float, width: float) -> np.ndarray:
+    """
+    Return the (n, 4, 2) corners of n oriented boxes, in the order front left, front right, rear right, rear left.
+    """
+    forward = heading * (length / 2)
+    left = np.stack([-heading[:, 1], heading[:, 0]], axis=1) * (width / 2)
+    return np.stack([center + forward + left, center + forward - left,
+                     center - forward - left, center - forward + left], axis=1)
+
+
+def _overlaps(corners_1: np.ndarray, corners_2: np.ndarray) -> np.ndarray:
+    """
+    Separating axis test of n pairs of oriented boxes, the axes are the edge directions of both boxes.
+    """
+    axes = np.concatenate([corners_1[:, 1:3] - corners_1[:, 0:2], corners_2[:, 1:3] - corners_2[:, 0:2]], axis=1)
+    proj_1 = np.einsum('nac,nkc->nak', axes, corners_1)
+    proj_2 = np.einsum('nac,nkc->nak', axes, corners_2)
+    separated = (proj_1.max(axis=2) < proj_2.min(axis=2)) | (proj_2.max(axis=2) < proj_1.min(axis=2))
+    return ~separated.any(axis=1)
+
+
+class KinematicExec:
+    """
+    The KinematicExec class declares an offline 2D executor of a Simulation, a drop-in for SimulationExec which
+    runs without BeamNG. Each vehicle follows the timestamped nodes of its road_pf.script, i.e. its trajectory at
+    its speed, as an oriented box. The first contact between two boxes is the crash: the vehicles stop and the
+    parts of the hit zone of each vehicle are damaged, named as in VEHICLE_PARTS_DICT like the BeamNG damage
+    sensor does. Whole trajectories are computed at once, so an execution takes milliseconds.
+
+    Args:
+        simulation (Simulation): the simulation to execute, its players and status are updated as by SimulationExec.
+        dt (float): simulated time between two recorded states, in seconds.
+        length (float): length of the vehicles, in meters.
+        width (float): width of the vehicles, in meters.
+    """
+
+    def __init__(self, simulation: Simulation, dt: float = 0.05, length: float = VEHICLE_LENGTH,
+                 width: float = VEHICLE_WIDTH):
+        self.simulation = simulation
+        self.dt = dt
+        self.length = length
+        self.width = width
+
+    @staticmethod
+    def _parked_heading(player: Player) -> np.ndarray:
+        # Same convention as the Accelerator: the rotation is measured against the opposite of NORTH
+        angle = np.radians(player.rot[2] + 180) if player.rot is not None else 0
+        return np.array([np.sin(angle), np.cos(angle)])
+
+    def get_track(self, player: Player, times: np.ndarray, start: float = 0):
+        """
+        Return the positions (n, 2), headings (n, 2) and speeds (n) of a player at the given times, when its
+        script starts at start. A player without script, or never started, stays at its initial position.
+        """
+        script = player.road_pf.script
+        if len(script) <= 2 or not np.isfinite(start):
+            return (np.tile(np.array(player.pos[:2], dtype=float), (len(times), 1)),
+                    np.tile(self._parked_heading(player), (len(times), 1)), np.zeros(len(times)))
+
+        nodes = np.array([[n['x'], n['y'], n['t']] for n in script], dtype=float)
+        # Repeated nodes have no direction
+        keep = np.concatenate([[True], np.any(np.diff(nodes[:, :2], axis=0) != 0, axis=1)])
+        nodes = nodes[keep]
+        xs, ys, ts = nodes[:, 0], nodes[:, 1], nodes[:, 2]
+        local = times - start
+        positions = np.stack([np.interp(local, ts, xs), np.interp(local, ts, ys)], axis=1)
+
+        idx = np.clip(np.searchsorted(ts, local, side='right') - 1, 0, len(ts) - 2)
+        vectors = nodes[idx + 1, :2] - nodes[idx, :2]
+        lengths = np.linalg.norm(vectors, axis=1)
+        headings = vectors / lengths[:, None]
+        durations = ts[idx + 1] - ts[idx]
+        is_moving = (local >= ts[0]) & (local < ts[-1]) & (durations > 0)
+        speeds = np.where(is_moving, lengths / np.where(durations > 0, durations, 1), 0)
+        return positions, headings, speeds
+
+    def get_damage(self, center: np.ndarray, heading: np.ndarray, contact: np.ndarray, severity: float) -> dict:
+        """
+        Return the damaged parts of a vehicle hit at the contact point, in the format of the BeamNG damage sensor.
+        The parts of the hit zone, e.g. FL, are fully damaged, the parts of its component, e.g. F, half.
+        """
+        left = np.array([-heading[1], heading[0]])
+        x = np.dot(contact - center, heading) / (self.length / 2)
+        y = np.dot(contact - center, left) / (self.width / 2)
+        component = 'F' if x > 1 / 3 else 'B' if x < -1 / 3 else 'M'
+        side = 'L' if y > 0.5 else 'R' if y < -0.5 else ''
+        if component == 'M' and side == '':
+            side = 'L' if y > 0 else 'R'
+
+        part_damage = {}
+        for name, code in VEHICLE_PARTS_DICT.items():
+            if code == component + side:
+                part_damage[name] = {"name": name, "damage": severity}
+            elif code == component:
+                part_damage[name] = {"name": name, "damage": severity / 2}
+        return part_damage
+
+    def get_contact(self, corners_1: np.ndarray, corners_2: np.ndarray) -> np.ndarray:
+        # Mean of the corners of each box inside the other one, or the middle of the boxes for crossing edges
+        inside = []
+        for corners, other in [(corners_1, corners_2), (corners_2, corners_1)]:
+            origin, u, v = other[3], other[0] - other[3], other[2] - other[3]
+            a, b = (corners - origin) @ u / np.dot(u, u), (corners - origin) @ v / np.dot(v, v)
+            inside.append(corners[(a >= 0) & (a <= 1) & (b >= 0) & (b <= 1)])
+        inside = np.concatenate(inside)
+        if len(inside) == 0:
+            return (corners_1.mean(axis=0) + corners_2.mean(axis=0)) / 2
+        return inside.mean(axis=0)
+
+    def execute(self, timeout: int = 60):
+        start_time = time.time()
+        players: List[Player] = self.simulation.players
+        times = np.arange(0, timeout + self.dt / 2, self.dt)
+
+        # Vehicles moving from the beginning, then the ones waiting for the distance to trigger them
+        starts = [0 if p.distance_to_trigger <= 0 else np.inf for p in players]
+        tracks = [self.get_track(p, times, s) for p, s in zip(players, starts)]
+        for i, player in enumerate(players):
+            if np.isfinite(starts[i]):
+                continue
+            distances = np.min([np.linalg.norm(tracks[j][0] - tracks[i][0], axis=1)
+                                for j in range(len(players)) if np.isfinite(starts[j])], axis=0)
+            triggered = np.flatnonzero(distances < player.distance_to_trigger)
+            if len(triggered) > 0:
+                starts[i] = times[triggered[0]]
+                tracks[i] = self.get_track(player, times, starts[i])
+
+        # First contact between two vehicles, boxes are only tested when their circumscribed circles meet
+        end, pair = len(times) - 1, None
+        corners = [_corners(t[0], t[1], self.length, self.width) for t in tracks]
+        for i in range(len(players)):
+            for j in range(i + 1, len(players)):
+                distances = np.linalg.norm(tracks[i][0][:end + 1] - tracks[j][0][:end + 1], axis=1)
+                candidates = np.flatnonzero(distances <= np.hypot(self.length, self.width))
+                if len(candidates) == 0:
+                    continue
+                hits = candidates[_overlaps(corners[i][candidates], corners[j][candidates])]
+                if len(hits) > 0 and hits[0] <= end:
+                    end, pair = hits[0], (i, j)
+
+        # Closest approach of the vehicles, as recorded by SimulationExec
+        self.simulation.closest_distance = None if len(players) < 2 else \
+            float(np.min(np.linalg.norm(tracks[0][0][:end + 1] - tracks[1][0][:end + 1], axis=1)))
+        for k, player in enumerate(players):
+            positions, boxes = tracks[k][0][:end + 1], corners[k][:end + 1]
+            player.positions.extend(positions)
+            player.times.extend(times[:end + 1])
+            # Closed (xs, ys) boxes
+            player.bbox.extend(np.concatenate([boxes, boxes[:, :1]], axis=1).transpose(0, 2, 1))
+
+        if pair is None:
+            print("Timed out!")
+        else:
+            i, j = pair
+            contact = self.get_contact(corners[i][end], corners[j][end])
+            velocities = [tracks[k][1][end] * tracks[k][2][end] for k in pair]
+            severity = float(np.linalg.norm(velocities[0] - velocities[1])) / FULL_DAMAGE_SPEED
+            severity = min(1.0, max(MIN_DAMAGE, severity))
+            for k in pair:
+                players[k].collect_damage(self.get_damage(tracks[k][0][end], tracks[k][1][end], contact, severity))
+            self.simulation.status = CRASHED
+            print("Crash detected!")
+        print("Simulation Time: ", time.time() - start_time)
@@ -1,4 +1,5 @@
 from .mutator import Mutator, MutatorCreator, categorize_mutator
 from .mutate_speed_class import MutateSpeedClass
+from .origin_sampler import OriginSampler
 from .mutate_initial_point_class import MutateInitialPointClass
 from .transformer import Transformer
@@ -1,6 +1,6 @@
-import numpy as np
 from shapely.geometry import LineString, Point
 from src.models.mutator import Mutator
+from src.models.mutator.origin_sampler import OriginSampler
 from src.models.ac3rp import Vehicle
 from src.models.ac3rp import common
 
@@ -51,43 +51,28 @@ class MutateInitialPointClass(Mutator):
         expected_distance = self.random_value() if is_random else self.mutate_value(0)
         vehicle_lst = LineString(vehicle.movement.get_driving_points())
 
-        # Looking for mutated point as a new origin with given expected_distance and vehicle_lst
+        # Looking for mutated point as a new origin with given expected_distance and vehicle_lst,
+        # drawn from the points of the circle around the current origin which stay on the vehicle road
+        sampler = OriginSampler.get(vehicle.road_data["road"])
         mutated_point = None
 
-        # A threshold to reset expected_distance, it can be any number e.g 10, 20, 50, 100, etc.
+        # A threshold to report the distances without origin, it can be any number e.g 10, 20, 50, 100, etc.
         threshold_reset_distance = 50
 
         # Run until point staying the road
         count_iteration = 0
         while mutated_point is None:
-            # Generate points within line
-            # points = common.mutate_initial_point(lst=vehicle_lst,
-            #                                      delta=vehicle.road_data["mutate_equation"],
-            #                                      distance=expected_distance, num_points=1)
-            # Generate point in circle
-            points = common.mutate_initial_point(lst=vehicle_lst,
-                                                 mode=2, num_points=50,
-                                                 minR=expected_distance, maxR=expected_distance)
-
-            filtered_points = list()
-            for p in points:
-                # Since we have one generated point, so convert a new point to Point object
-                point = Point(p[0], p[1])
-                # Check if the new point stays in the vehicle road
-                if common.is_inside_polygon(point, vehicle.road_data["road_poly"]):
-                    filtered_points.append(point)
-
-            if len(filtered_points) > 0:
-                # Select the first point
-                random_idx = np.random.choice(list(range(0, len(filtered_points))))
-                mutated_point = filtered_points[random_idx]
-
+            origins = sampler.sample(vehicle_lst.coords[0], expected_distance, rng=self.rng)
+            if origins is not None:
+                mutated_point = Point(origins[0])
                 # Debug
-                # self.visualization(vehicle, points, (mutated_point.x, mutated_point.y))
+                # self.visualization(vehicle, origins, (mutated_point.x, mutated_point.y))
+                continue
 
+            # No point of the circle stays on the road, reset expected_distance
+            expected_distance = self.random_value() if is_random else self.mutate_value(0)
             count_iteration += 1
             if count_iteration % threshold_reset_distance == 0:
-                expected_distance = self.random_value() if is_random else self.mutate_value(0)
                 print(f'MutateInitialPointClass object took {count_iteration} iterations to find the mutated point!')
 
         # With a new origin, we can compute a new mutated driving actions (LineString) for vehicle
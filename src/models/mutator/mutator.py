@@ -2,8 +2,8 @@ from __future__ import annotations
 from typing import Tuple
 from abc import ABC, abstractmethod
 import numpy
-import random
 from src.models.ac3rp import Vehicle
+from src.libraries import rng as rngs
 
 
 class MutatorCreator(ABC):
@@ -17,18 +17,18 @@ class MutatorCreator(ABC):
         self.params = params
 
     @abstractmethod
-    def create(self) -> Mutator:
+    def create(self, rng: numpy.random.Generator = None) -> Mutator:
         """
         Return the mutator with a probability and its appropriate type
         """
         pass
 
-    def mutate(self, vehicle: Vehicle, is_random: bool = False) -> Vehicle:
+    def mutate(self, vehicle: Vehicle, is_random: bool = False, rng: numpy.random.Generator = None) -> Vehicle:
         """
         Return the mutated vehicle after it is mutated
-        by a speed or an initial point mutator
+        by a speed or an initial point mutator, drawing from the given random stream
         """
-        mutator = self.create()
+        mutator = self.create(rng)
         return mutator.process(vehicle, is_random)
 
 
@@ -38,11 +38,12 @@ class Mutator(ABC):
     must implement.
     """
 
-    def __init__(self, params):
+    def __init__(self, params, rng: numpy.random.Generator = None):
         self.params = params
+        self.rng = rngs.default_rng() if rng is None else rng
 
     def mutate_value(self, value: float):
-        value += numpy.random.normal(self.params["mean"], self.params["std"], 1)[0]
+        value += self.rng.normal(self.params["mean"], self.params["std"])
         if value < self.params["min"]:
             value = self.params["min"]
         if value > self.params["max"]:
@@ -50,7 +51,7 @@ class Mutator(ABC):
         return value
 
     def random_value(self):
-        return numpy.random.choice(list(range(self.params["min"], self.params["max"])))
+        return self.rng.integers(self.params["min"], self.params["max"])
 
     @abstractmethod
     def process(self, vehicle: Vehicle, is_random: bool = False) -> Vehicle:
@@ -73,9 +74,9 @@ class SpeedCreator(MutatorCreator):
     mutate vehicle speed.
     """
 
-    def create(self) -> Mutator:
+    def create(self, rng: numpy.random.Generator = None) -> Mutator:
         from src.models.mutator import MutateSpeedClass
-        return MutateSpeedClass(self.params)
+        return MutateSpeedClass(self.params, rng)
 
 
 class InitialPointCreator(MutatorCreator):
@@ -84,9 +85,9 @@ class InitialPointCreator(MutatorCreator):
     mutate vehicle's initial point and its trajectory.
     """
 
-    def create(self) -> Mutator:
+    def create(self, rng: numpy.random.Generator = None) -> Mutator:
         from src.models.mutator import MutateInitialPointClass
-        return MutateInitialPointClass(self.params)
+        return MutateInitialPointClass(self.params, rng)
 
 
 def categorize_mutator(mutator_data: dict) -> MutatorCreator:
@@ -0,0 +1,124 @@
+import math
+import weakref
+import numpy as np
+from shapely import vectorized
+from shapely.geometry import Point, Polygon
+from shapely.prepared import prep
+from src.libraries import rng as rngs
+
+OUTSIDE = 0
+INSIDE = 1
+BOUNDARY = 2
+
+
+def _densify(coords: np.ndarray, step: float) -> np.ndarray:
+    # Points along a ring, at most step apart
+    starts, ends = coords[:-1], coords[1:]
+    counts = np.maximum(np.ceil(np.linalg.norm(ends - starts, axis=1) / step).astype(int), 1)
+    segments = np.repeat(np.arange(len(starts)), counts)
+    fractions = (np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)) / np.repeat(counts, counts)
+    return np.vstack([starts[segments] + fractions[:, None] * (ends - starts)[segments], coords[-1:]])
+
+
+def _dilate(mask: np.ndarray) -> np.ndarray:
+    # A cell and its 8 neighbours, the mask has an empty border
+    dilated = mask.copy()
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            dilated[1:-1, 1:-1] |= mask[1 + dx:mask.shape[0] - 1 + dx, 1 + dy:mask.shape[1] - 1 + dy]
+    return dilated
+
+
+class OriginSampler:
+    """
+    The OriginSampler class declares the sampler of the new origins of the vehicles on a road, at a given distance
+    from their current origin. The road polygon is rasterized once into cells fully inside it, fully outside it, or
+    crossed by its boundary. A drawn point is checked by a lookup of its cell, and against the polygon in the
+    boundary cells only, so that the accepted points are exactly the ones the polygon contains. The angles are drawn
+    from the arcs of the circle which may cross the road, the origins are uniform on the part of the circle on it.
+
+    Args:
+        road_poly (Polygon): the polygon of the road.
+        resolution (float): the size of the cells, in meters.
+    """
+    # One sampler per road, shared by the vehicles and the scenarios of a case
+    samplers = weakref.WeakKeyDictionary()
+
+    @staticmethod
+    def get(road) -> 'OriginSampler':
+        if road not in OriginSampler.samplers:
+            OriginSampler.samplers[road] = OriginSampler(road.road_poly)
+        return OriginSampler.samplers[road]
+
+    def __init__(self, road_poly: Polygon, resolution: float = 1.0):
+        self.road_poly = road_poly
+        self.prepared = prep(road_poly)
+        self.resolution = resolution
+        min_x, min_y, max_x, max_y = road_poly.bounds
+        # A border of empty cells around the road
+        self.origin = np.array([min_x, min_y]) - 2 * resolution
+        shape = (int(math.ceil((max_x - min_x) / resolution)) + 5, int(math.ceil((max_y - min_y) / resolution)) + 5)
+
+        # Cells by the side of their centers, then the ones the boundary crosses
+        centers = self.origin + (np.indices(shape).reshape(2, -1).T + 0.5) * resolution
+        self.cells = vectorized.contains(road_poly, centers[:, 0], centers[:, 1]).reshape(shape).astype(np.int8)
+        crossed = np.zeros(shape, dtype=bool)
+        for polygon in getattr(road_poly, "geoms", [road_poly]):
+            for ring in [polygon.exterior] + list(polygon.interiors):
+                ix, iy = self._index(_densify(np.array(ring.coords)[:, :2], resolution / 4)).T
+                crossed[ix, iy] = True
+        # Two points of the boundary a quarter of a cell apart lie in neighbouring cells
+        self.cells[_dilate(crossed)] = BOUNDARY
+        # Cells a point closer than a cell to the road may lie in
+        self.near = _dilate(self.cells != OUTSIDE)
+
+    def _index(self, points: np.ndarray) -> np.ndarray:
+        index = np.floor((points - self.origin) / self.resolution).astype(int)
+        return np.clip(index, 0, np.array(self.cells.shape) - 1)
+
+    def contains(self, points: np.ndarray) -> np.ndarray:
+        """
+        Return the mask of the (n, 2) points the road polygon contains.
+        """
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        ix, iy = self._index(points).T
+        cells = self.cells[ix, iy]
+        result = cells == INSIDE
+        for i in np.flatnonzero(cells == BOUNDARY):
+            result[i] = self.prepared.contains(Point(points[i]))
+        return result
+
+    def sample(self, center, distance: float, size: int = 1, rng: np.random.Generator = None,
+               max_draws: int = 1000) -> np.ndarray:
+        """
+        Return a (size, 2) array of origins on the road at distance from center, drawn from the given random stream.
+        Return None when the circle does not cross the road, or the origins are not found in max_draws draws each.
+        """
+        rng = rngs.default_rng() if rng is None else rng
+        center = np.asarray(center, dtype=float)[:2]
+        radius = abs(distance)
+        if radius == 0:
+            return np.repeat(center[None], size, axis=0) if self.contains(center)[0] else None
+
+        # Arcs shorter than half a cell, an arc only crosses the cells around the one of its start
+        n = max(int(math.ceil(4 * math.pi * radius / self.resolution)), 8)
+        starts = center + radius * np.column_stack([np.cos(2 * math.pi * np.arange(n) / n),
+                                                    np.sin(2 * math.pi * np.arange(n) / n)])
+        ix, iy = self._index(starts).T
+        arcs = np.flatnonzero(self.near[ix, iy])
+        if len(arcs) == 0:
+            return None
+
+        origins, draws = [], 0
+        while draws < max_draws * size:
+            count = min(2 * (size - len(origins)), max_draws * size - draws)
+            theta = 2 * math.pi * (arcs[rng.integers(0, len(arcs), count)] + rng.random(count)) / n
+            points = center + radius * np.column_stack([np.cos(theta), np.sin(theta)])
+            origins.extend(points[self.contains(points)])
+            draws += count
+            if len(origins) >= size:
+                return np.array(origins[:size])
+        return None
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
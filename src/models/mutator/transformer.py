@@ -1,8 +1,9 @@
 import copy
-import random
-from typing import List
+import numpy as np
+from typing import List, Union
 from src.models.mutator import MutatorCreator
-from src.models.ac3rp import CrashScenario
+from src.models.ac3rp import CrashScenario, Genotype
+from src.libraries import rng as rngs
 
 
 class Transformer:
@@ -11,18 +12,20 @@ class Transformer:
 
     Args:
         mutators (List[MutatorCreator]): a set of mutators to modify a crash scenario.
+        rng (np.random.Generator): the random stream of every mutation, the default stream when None.
     """
-    def __init__(self, mutators: List[MutatorCreator]):
+    def __init__(self, mutators: List[MutatorCreator], rng: np.random.Generator = None):
         self.mutators = mutators
+        self.rng = rngs.default_rng() if rng is None else rng
 
-    def mutate_random_from(self, scenario: CrashScenario) -> CrashScenario:
+    def mutate_random_from(self, scenario: Union[CrashScenario, Genotype]) -> Union[CrashScenario, Genotype]:
         """
         Implement method to generate a random scenario based on given crash scenario object.
 
         Args:
-            scenario (CrashScenario): a crash scenario is provided by AC3RPlus.
+            scenario (CrashScenario): a crash scenario is provided by AC3RPlus, or its Genotype.
         Return:
-            CrashScenario: a mutated crash scenario object generated randomly.
+            CrashScenario: a mutated crash scenario object generated randomly, or its Genotype.
         """
 
         # Initialize configuration
@@ -30,20 +33,23 @@ class Transformer:
 
         for vehicle in mutated_scenario.vehicles:
             for mutator in self.mutators:
-                mutator.mutate(vehicle, is_random=True)
+                mutator.mutate(vehicle, is_random=True, rng=self.rng)
 
+        if isinstance(mutated_scenario, Genotype):
+            mutated_scenario.commit()
         return mutated_scenario
 
-    def mutate_from(self, scenario: CrashScenario, is_unit_test: bool = False) -> CrashScenario:
+    def mutate_from(self, scenario: Union[CrashScenario, Genotype],
+                    is_unit_test: bool = False) -> Union[CrashScenario, Genotype]:
         """
         Implement method to modify a given crash scenario object.
 
         Args:
-            scenario (CrashScenario): a crash scenario is provided by AC3RPlus.
+            scenario (CrashScenario): a crash scenario is provided by AC3RPlus, or its Genotype.
             is_unit_test (Boolean): a parameter used for testing only.
 
         Return:
-            CrashScenario: a mutated crash scenario object.
+            CrashScenario: a mutated crash scenario object, or its Genotype.
         """
 
         # Initialize configuration
@@ -53,13 +59,15 @@ class Transformer:
         # Mutators Order in List: [Speed v1, Point v1, Speed v2, Point v2]
         for vehicle in mutated_scenario.vehicles:
             for mutator in self.mutators:
-                probability = random.uniform(0, 1)
+                probability = self.rng.uniform(0, 1)
                 if is_unit_test:  # Executing for unit test only
-                    mutator.mutate(vehicle)
+                    mutator.mutate(vehicle, rng=self.rng)
                 else:
                     if probability <= mutator.probability:
-                        mutator.mutate(vehicle)
+                        mutator.mutate(vehicle, rng=self.rng)
                         is_triggered_mutator = True if is_triggered_mutator is False else is_triggered_mutator
+        if isinstance(mutated_scenario, Genotype):
+            mutated_scenario.commit()
 
         # Define a function's response when one of mutators is triggered
         if is_triggered_mutator:
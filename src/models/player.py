@@ -1,6 +1,8 @@
 import beamngpy
 import time
+import numpy as np
 from src.models.road_profiler import RoadProfiler
+from src.models.ring_buffer import RingBuffer
 from .vehicle_parts_dict import VEHICLE_PARTS_DICT
 
 
@@ -29,12 +31,13 @@ class Player:
         self.rot_quat = rot_quat
         self.road_pf = road_pf
         self.distance_to_trigger = distance_to_trigger
-        self.positions = []
+        # Telemetry collected every tick, in preallocated buffers: (x, y) positions, timers and (xs, ys) boxes
+        self.positions = RingBuffer(shape=(2,))
         self.damage = []
-        self.times = []
+        self.times = RingBuffer()
         self.speed = speed
         self.accelerator = None
-        self.bbox = []
+        self.bbox = RingBuffer(shape=(2, 5))
 
     def collect_positions_only(self, position):
         self.positions.append(position)
@@ -74,5 +77,27 @@ class Player:
     def get_pos_and_timer_at(self, index) -> tuple:
         return self.positions[index][0], self.positions[index][1], self.times[index]
 
+    def get_speeds(self, window: int) -> np.ndarray:
+        """
+        Return the speeds between the last window + 1 timed positions. As libs.cal_speed, the speeds below 0.5 m/s
+        and the ones over no time are 0.
+        """
+        n = min(len(self.positions), len(self.times), window + 1)
+        if n < 2:
+            return np.zeros(0)
+        positions, times = self.positions.last(n), self.times.last(n)
+        distances = np.hypot(*np.diff(positions, axis=0).T)
+        durations = np.abs(np.diff(times))
+        speeds = np.divide(distances, durations, out=np.zeros(n - 1), where=durations > 0)
+        speeds[speeds < 0.5] = 0
+        return speeds
+
+    def is_speed_stable(self, min_speed: float, max_speed: float, window: int = 3) -> bool:
+        """
+        Return True when the average of the last window speeds is between min_speed and max_speed.
+        """
+        speeds = self.get_speeds(window)
+        return len(speeds) == window and min_speed < np.mean(speeds) < max_speed
+
     def __str__(self):
         return str(self.__class__) + ": " + str(self.__dict__)
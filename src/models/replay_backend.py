@@ -0,0 +1,146 @@
+import copy
+import pickle
+from typing import List
+from src.models import SimulatorBackend
+
+
+def _vid(vehicle):
+    return None if vehicle is None else vehicle.vid
+
+
+class RecordingBackend(SimulatorBackend):
+    """
+    The RecordingBackend class declares a SimulatorBackend recording every call made to another backend, with its
+    vehicle and its result. The records replay the execution without the simulator, see ReplayBackend.
+
+    Args:
+        backend (SimulatorBackend): the recorded backend.
+    """
+
+    def __init__(self, backend: SimulatorBackend):
+        self.backend = backend
+        self.records: List[dict] = []
+
+    @property
+    def round_trips(self) -> int:
+        return self.backend.round_trips
+
+    def _record(self, method: str, vehicle=None, result=None):
+        self.records.append({"method": method, "vid": _vid(vehicle), "result": copy.deepcopy(result)})
+        return result
+
+    def save(self, path: str):
+        with open(path, "wb") as file:
+            pickle.dump(self.records, file)
+
+    def prepare(self, simulation, positions: List[tuple]) -> bool:
+        return self._record("prepare", result=self.backend.prepare(simulation, positions))
+
+    def start(self, simulation, positions: List[tuple], is_warm: bool = False):
+        return self._record("start", result=self.backend.start(simulation, positions, is_warm))
+
+    def release(self, failed: bool = False):
+        return self._record("release", result=self.backend.release(failed))
+
+    def record_setup(self, is_warm: bool, setup_time: float):
+        self.backend.record_setup(is_warm, setup_time)
+
+    def step(self, steps: int):
+        return self._record("step", result=self.backend.step(steps))
+
+    def poll_state(self, vehicle) -> dict:
+        return self._record("poll_state", vehicle, self.backend.poll_state(vehicle))
+
+    def poll_damage(self, vehicle) -> dict:
+        return self._record("poll_damage", vehicle, self.backend.poll_damage(vehicle))
+
+    def poll(self, vehicle) -> dict:
+        return self._record("poll", vehicle, self.backend.poll(vehicle))
+
+    def set_script(self, vehicle, script: List[dict], cling: bool = True):
+        return self._record("set_script", vehicle, self.backend.set_script(vehicle, script, cling))
+
+    def stop(self, vehicle):
+        return self._record("stop", vehicle, self.backend.stop(vehicle))
+
+    def teleport(self, vehicle, pos: tuple):
+        return self._record("teleport", vehicle, self.backend.teleport(vehicle, pos))
+
+    def get_bbox(self, vehicle) -> dict:
+        return self._record("get_bbox", vehicle, self.backend.get_bbox(vehicle))
+
+    def attach_sensors(self, vehicle, sensors: list = None):
+        self.backend.attach_sensors(vehicle, sensors)
+
+    def render_debug_line(self, road_pf):
+        self.backend.render_debug_line(road_pf)
+
+    def enable_free_cam(self, pos: tuple, direction: tuple):
+        self.backend.enable_free_cam(pos, direction)
+
+
+class ReplayBackend(SimulatorBackend):
+    """
+    The ReplayBackend class declares a fake SimulatorBackend answering the calls of an execution with the results
+    recorded by a RecordingBackend. The calls must come in the recorded order, for the same vehicles.
+
+    Args:
+        records (List[dict]): the records of a RecordingBackend.
+    """
+
+    @staticmethod
+    def load(path: str) -> 'ReplayBackend':
+        with open(path, "rb") as file:
+            return ReplayBackend(pickle.load(file))
+
+    def __init__(self, records: List[dict]):
+        self.records = records
+        self.index = 0
+        self.round_trips = 0
+
+    def is_done(self) -> bool:
+        return self.index == len(self.records)
+
+    def _replay(self, method: str, vehicle=None):
+        if self.is_done():
+            raise Exception(f'Exception: Replay has no record left for {method}({_vid(vehicle)})!')
+        record = self.records[self.index]
+        if record["method"] != method or record["vid"] != _vid(vehicle):
+            raise Exception(f'Exception: Replay expected {record["method"]}({record["vid"]}) '
+                            f'at call {self.index}, got {method}({_vid(vehicle)})!')
+        self.index += 1
+        self.round_trips += 1
+        return copy.deepcopy(record["result"])
+
+    def prepare(self, simulation, positions: List[tuple]) -> bool:
+        return self._replay("prepare")
+
+    def start(self, simulation, positions: List[tuple], is_warm: bool = False):
+        return self._replay("start")
+
+    def release(self, failed: bool = False):
+        return self._replay("release")
+
+    def step(self, steps: int):
+        return self._replay("step")
+
+    def poll_state(self, vehicle) -> dict:
+        return self._replay("poll_state", vehicle)
+
+    def poll_damage(self, vehicle) -> dict:
+        return self._replay("poll_damage", vehicle)
+
+    def poll(self, vehicle) -> dict:
+        return self._replay("poll", vehicle)
+
+    def set_script(self, vehicle, script: List[dict], cling: bool = True):
+        return self._replay("set_script", vehicle)
+
+    def stop(self, vehicle):
+        return self._replay("stop", vehicle)
+
+    def teleport(self, vehicle, pos: tuple):
+        return self._replay("teleport", vehicle)
+
+    def get_bbox(self, vehicle) -> dict:
+        return self._replay("get_bbox", vehicle)
@@ -0,0 +1,104 @@
+import numpy as np
+
+
+def _to_item(row):
+    # Rows read as the tuples they were appended as, e.g. (x, y) positions or (xs, ys) boxes
+    item = row.tolist()
+    return tuple(item) if isinstance(item, list) else item
+
+
+class RingBuffer:
+    """
+    The RingBuffer class declares a preallocated NumPy buffer of rows of the same shape, e.g. the positions of a
+    vehicle collected every tick. Appending a row copies it into the buffer without allocating. The buffer doubles
+    its capacity when it is full, or overwrites its oldest rows when it has a maxlen. It reads as the list of its
+    rows, as tuples, and array gives them as a (n, *shape) array in chronological order.
+
+    Args:
+        shape (tuple): the shape of a row, () for numbers.
+        capacity (int): the initial number of rows.
+        maxlen (int): the maximum number of rows kept, all of them when None.
+    """
+
+    def __init__(self, shape: tuple = (), capacity: int = 256, maxlen: int = None):
+        self.shape = tuple(shape)
+        self.maxlen = maxlen
+        self.data = np.empty((capacity if maxlen is None else maxlen,) + self.shape, dtype=float)
+        self.start = 0
+        self.size = 0
+
+    def _grow(self, size: int):
+        capacity = len(self.data)
+        while capacity < size:
+            capacity *= 2
+        data = np.empty((capacity,) + self.shape, dtype=float)
+        data[:self.size] = self.data[:self.size]
+        self.data = data
+
+    def append(self, row):
+        if self.maxlen is None:
+            if self.size == len(self.data):
+                self._grow(self.size + 1)
+            self.data[self.size] = row
+            self.size += 1
+        else:
+            self.data[(self.start + self.size) % self.maxlen] = row
+            if self.size < self.maxlen:
+                self.size += 1
+            else:
+                self.start = (self.start + 1) % self.maxlen
+
+    def extend(self, rows):
+        rows = np.asarray(rows, dtype=float).reshape((-1,) + self.shape)
+        if self.maxlen is not None:
+            for row in rows:
+                self.append(row)
+            return
+        if self.size + len(rows) > len(self.data):
+            self._grow(self.size + len(rows))
+        self.data[self.size:self.size + len(rows)] = rows
+        self.size += len(rows)
+
+    def clear(self):
+        self.start = 0
+        self.size = 0
+
+    @property
+    def array(self) -> np.ndarray:
+        """
+        Return the rows in chronological order, a view of the buffer unless its rows wrap around.
+        """
+        end = self.start + self.size
+        if end <= len(self.data):
+            return self.data[self.start:end]
+        return np.concatenate([self.data[self.start:], self.data[:end - len(self.data)]])
+
+    def last(self, n: int) -> np.ndarray:
+        """
+        Return the last n rows, at most the ones in the buffer.
+        """
+        return self.array[max(self.size - n, 0):]
+
+    def to_list(self) -> list:
+        return [_to_item(row) for row in self.array]
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [_to_item(row) for row in self.array[index]]
+        if index < -self.size or index >= self.size:
+            raise IndexError("RingBuffer index out of range")
+        return _to_item(self.data[(self.start + index % self.size) % len(self.data)])
+
+    def __iter__(self):
+        return iter(self.to_list())
+
+    def __eq__(self, other):
+        if isinstance(other, (RingBuffer, list)):
+            return self.to_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self.to_list())
@@ -1,5 +1,5 @@
-from shapely.geometry import Point
-from src.libraries.common import pairs
+import numpy as np
+from typing import List
 
 
 class RoadProfiler:
@@ -9,32 +9,46 @@ class RoadProfiler:
         self.spheres = []
         self.sphere_colors = []
         self.radii = []
+        # The x, y and t of the script nodes, as a (n, 3) array
+        self.nodes = np.empty((0, 3))
 
-    def compute_ai_script(self, trajectory, delay=0, color=None):
-        segment_times = [0]
-        segment_x = [p[0] for p in trajectory]
-        segment_y = [p[1] for p in trajectory]
+    @staticmethod
+    def get_times(trajectory: np.ndarray) -> np.ndarray:
+        """
+        Return the cumulative times of a (n, 3) trajectory of x, y and speed: the time of a segment is its length
+        over the speed of its first point, 0 when it is not moving. The segments of length 0 are skipped.
+        """
+        delta = np.diff(trajectory[:, :2], axis=0)
+        lengths = np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1])
+        speeds = trajectory[:-1, 2][lengths != 0]
+        lengths = lengths[lengths != 0]
+        times = np.divide(lengths, speeds, out=np.zeros(len(lengths)), where=speeds > 0)
+        return np.concatenate([[0], np.cumsum(times)])
 
-        for segment in pairs(trajectory):
-            p1, p2 = segment[0], segment[1]
-            length = Point(p1[0], p1[1]).distance(Point(p2[0], p2[1]))
-            if length == 0:
-                continue
-            speed = p1[2]
-            time = length / speed if speed > 0 else 0
-            segment_times.append(time + segment_times[-1])
+    @staticmethod
+    def to_script(nodes: np.ndarray, offset: float = 0) -> List[dict]:
+        return [{'x': x, 'y': y, 'z': 0, 't': t + offset} for x, y, t in nodes.tolist()]
 
-        for x, y, t in zip(segment_x, segment_y, segment_times):
-            node = {
-                'x': x,
-                'y': y,
-                'z': 0,
-                't': t + int(delay)
-            }
-            self.script.append(node)
-            self.points.append([node['x'], node['y'], node['z']])
-            self.spheres.append([node['x'], node['y'], node['z'], 0.25])
-            self.sphere_colors.append(color)
+    def get_script(self, offset: float = 0) -> List[dict]:
+        """
+        Return the script with its times offset, e.g. by the timer of the simulator at a teleport.
+        """
+        return self.to_script(self.nodes, offset)
 
-        self.radii = [0.25 for _ in range(len(self.points))]
+    def compute_ai_script(self, trajectory, delay=0, color=None):
+        trajectory = np.asarray(trajectory, dtype=float)
+        times = self.get_times(trajectory) if len(trajectory) > 0 else np.empty(0)
+        # A node per time, the nodes after the skipped segments keep the times in order
+        n = len(times)
+        nodes = np.empty((n, 3))
+        if n > 0:
+            nodes[:, :2] = trajectory[:n, :2]
+        nodes[:, 2] = times + int(delay)
+        self.nodes = np.concatenate([self.nodes, nodes])
 
+        xy = nodes[:, :2].tolist()
+        self.script.extend(self.to_script(nodes))
+        self.points.extend([[x, y, 0] for x, y in xy])
+        self.spheres.extend([[x, y, 0, 0.25] for x, y in xy])
+        self.sphere_colors.extend([color] * n)
+        self.radii = [0.25] * len(self.points)
@@ -42,12 +42,18 @@ class ScriptFactory:
         return Point(p[0], p[1])
 
     def compute_scripts(self, distance=5, speeds=[30]):
-        idx = 1
-        points = [self.p1]
+        # Points every distance along the angle from p1, until the first one past p2 by 5 * distance
+        direction = np.array([_round(cos(radians(self.angle))), _round(sin(radians(self.angle)))])
+        limit = self.p1.distance(self.p2) + distance * 5
+        count = int(limit / (distance * np.linalg.norm(direction))) + 2
+        origin = np.array([self.p1.x, self.p1.y])
         while True:
-            points.append(self.compute_script_point(self.p1, distance * idx))
-            if points[0].distance(points[-1]) > self.p1.distance(self.p2) + distance*5:
+            points = origin + (distance * np.arange(1, count + 1))[:, None] * direction
+            delta = points - origin
+            past = np.flatnonzero(np.sqrt(delta[:, 0] * delta[:, 0] + delta[:, 1] * delta[:, 1]) > limit)
+            if len(past) > 0:
                 break
-            idx += 1
-        self.script = [(p.x, p.y, random.choice(speeds)) for p in points]
+            count *= 2
+        points = [(self.p1.x, self.p1.y)] + points[:past[0] + 1].tolist()
+        self.script = [(x, y, random.choice(speeds)) for x, y in points]
         return self.script
@@ -4,7 +4,7 @@ import numpy as np
 from shapely.geometry import Point
 from typing import List
 from beamngpy import BeamNGpy
-from src.models import SimulationFactory, Player, RoadProfiler
+from src.models import SimulationFactory, Player, RoadProfiler, SimulatorBackend
 
 CRASHED = 1
 NO_CRASH = 0
@@ -13,6 +13,10 @@ IS_DEV = True if beamngpy.__version__ == "1.23" else False
 
 
 class Simulation:
+    # Simulator endpoint, rebound per worker process by evolution.ParallelExecutor
+    host: str = '127.0.0.1'
+    port: int = 64257
+
     def __init__(self, sim_factory: SimulationFactory, name: str = "simulation",
                  need_teleport: bool = False, debug: bool = False):
         self.sim_factory = sim_factory
@@ -21,6 +25,8 @@ class Simulation:
         self.players: List[Player] = sim_factory.generate_players()
         self.targets: {} = sim_factory.generate_targets()
         self.status: int = NO_CRASH
+        # Closest approach of the vehicles during the execution, see record_distance
+        self.closest_distance: float = None
         self.debug: bool = debug
         self.center_point = sim_factory.get_center_scenario()
         self.need_teleport = sim_factory.generate_accelerator(debug=debug) if need_teleport and IS_DEV else False
@@ -34,38 +40,28 @@ class Simulation:
         else:
             bng_home = os.getenv('BNG_HOME')
             bng_research = os.getenv('BNG_RESEARCH')
-        host = '127.0.0.1'
-        port = 64257
-        return BeamNGpy(host, port, bng_home, bng_research)
+        return BeamNGpy(Simulation.host, Simulation.port, bng_home, bng_research)
 
     @staticmethod
-    def disable_vehicle_ai(vehicle: beamngpy.vehicle):
-        vehicle.ai_set_mode('disable')
-        if IS_DEV:
-            vehicle.set_velocity(0)
-        else:
-            vehicle.ai_set_speed(0, 'set')
-        vehicle.control(throttle=0, steering=0, brake=0, parkingbrake=0)
-        vehicle.update_vehicle()
+    def disable_vehicle_ai(backend: SimulatorBackend, vehicle: beamngpy.vehicle):
+        backend.stop(vehicle)
 
     @staticmethod
-    def collect_vehicle_position_and_timer(beamng: BeamNGpy, player: Player) -> Player:
-        vehicle = player.vehicle
-        if IS_DEV:
-            pos = beamng.poll_sensors(vehicle)["state"]["pos"]
-            current_position = (pos[0], pos[1])
-            current_timer = beamng.poll_sensors(vehicle)["timer"]["time"]
-            player.collect_positions(current_position)
-            player.collect_timers(current_timer)
-        else:
-            current_position = (vehicle.state['pos'][0], vehicle.state['pos'][1])
+    def collect_vehicle_position_and_timer(backend: SimulatorBackend, player: Player, state: dict = None) -> Player:
+        # The state polled in the current tick is reused when it is given
+        state = backend.poll_state(player.vehicle) if state is None else state
+        current_position = (state['pos'][0], state['pos'][1])
+        if state['timer'] is None:
             player.collect_positions_only(current_position)
+        else:
+            player.collect_positions(current_position)
+            player.collect_timers(state['timer'])
 
         return player
 
     def get_vehicles_distance(self, debug: bool = False) -> float:
-        v1, v2 = self.players[0].vehicle, self.players[1].vehicle
-        p1, p2 = Point(v1.state['pos'][0], v1.state['pos'][1]), Point(v2.state['pos'][0], v2.state['pos'][1])
+        # Last collected positions of the vehicles, their initial ones before the first collection
+        p1, p2 = [Point(p.positions[-1] if len(p.positions) > 0 else p.pos[:2]) for p in self.players[:2]]
         distance = p1.distance(p2)
 
         # Debug line
@@ -74,19 +70,18 @@ class Simulation:
 
         return distance
 
+    def record_distance(self, distance: float):
+        # The closest approach scores a run without crash, it does not depend on when the execution stopped
+        if distance is not None and (self.closest_distance is None or distance < self.closest_distance):
+            self.closest_distance = distance
+
     @staticmethod
-    def render_debug_line(bng_instance: BeamNGpy, road_pf: RoadProfiler):
-        if IS_DEV:
-            bng_instance.add_debug_spheres(coordinates=road_pf.points,
-                                           radii=road_pf.radii,
-                                           rgba_colors=road_pf.sphere_colors)
-        else:
-            bng_instance.add_debug_line(road_pf.points, road_pf.sphere_colors,
-                                        spheres=road_pf.spheres, sphere_colors=road_pf.sphere_colors,
-                                        cling=True, offset=0.1)
+    def render_debug_line(backend: SimulatorBackend, road_pf: RoadProfiler):
+        backend.render_debug_line(road_pf)
 
     @staticmethod
-    def trigger_vehicle(player: Player, distance_report: float = None, debug: bool = False) -> bool:
+    def trigger_vehicle(backend: SimulatorBackend, player: Player, distance_report: float = None,
+                        debug: bool = False) -> bool:
         is_trigger = False
         # The car stills wait until their current distance <= distance_to_trigger
         if distance_report is not None and player.distance_to_trigger > distance_report:
@@ -98,11 +93,9 @@ class Simulation:
 
         # Add vehicle to a scenario
         if is_trigger:
-            vehicle = player.vehicle
             road_pf = player.road_pf
             if len(road_pf.script) > 2:
-                vehicle.ai_set_mode("manual")
-                vehicle.ai_set_script(road_pf.script, cling=False)
+                backend.set_script(player.vehicle, road_pf.script, cling=False)
 
         # Debug line
         if debug is True:
@@ -111,10 +104,8 @@ class Simulation:
         return is_trigger
 
     @staticmethod
-    def trigger_vehicle_teleport(player: Player):
-        vehicle = player.vehicle
-        vehicle.ai_set_mode("manual")
-        vehicle.ai_set_script(script=player.accelerator.script)
+    def trigger_vehicle_teleport(backend: SimulatorBackend, player: Player):
+        backend.set_script(player.vehicle, player.accelerator.script)
 
     def get_data_outputs(self) -> {}:
         data_outputs = {}
@@ -141,40 +132,29 @@ class Simulation:
                 data_outputs[player.vehicle.vid] = player.get_damage()
         return data_outputs
 
-    def enable_free_cam(self, bng: BeamNGpy):
+    def enable_free_cam(self, backend: SimulatorBackend):
         cam_pos = self.center_point
         cam_dir = (0, 1, -60)
-        bng.set_free_camera(cam_pos, cam_dir)
+        backend.enable_free_cam(cam_pos, cam_dir)
 
-    def teleport(self, beamng: BeamNGpy, players: [Player]) -> bool:
+    def teleport(self, backend: SimulatorBackend, players: [Player], states: dict = None) -> bool:
         for player in players:
             vehicle = player.vehicle
             road_pf = player.road_pf
-            timer = beamng.poll_sensors(vehicle)["timer"]["time"]
-            if IS_DEV:
-                current_pos = beamng.poll_sensors(vehicle)["state"]["pos"]
-            else:
-                current_pos = (vehicle.state['pos'][0], vehicle.state['pos'][1], vehicle.state['pos'][2])
+            # The states polled in the current tick by vid are reused when they are given
+            state = backend.poll_state(vehicle) if states is None else states[vehicle.vid]
+            timer = state["timer"]
+            current_pos = state["pos"]
 
             target_pos = list(player.pos)
             target_pos[2] = current_pos[2]
             target_pos = tuple(target_pos)
 
-            n_script = []
-            for n in player.road_pf.script:
-                n_script.append(
-                    {
-                        'x': n['x'],
-                        'y': n['y'],
-                        'z': 0,
-                        't': n['t'] + timer
-                    }
-                )
+            # The script restarts from the current time of the simulator
+            n_script = road_pf.get_script(offset=timer)
 
             if player.speed > 0:
-                cmd = f'scenetree.findObject(\'{vehicle.vid}\'):setPositionNoPhysicsReset(vec3{target_pos})'
-                beamng.queue_lua_command(cmd)
-                vehicle.ai_set_mode("manual")
-                vehicle.ai_set_script(script=n_script, cling=False)
-                self.render_debug_line(beamng, road_pf)
+                backend.teleport(vehicle, target_pos)
+                backend.set_script(vehicle, n_script, cling=False)
+                self.render_debug_line(backend, road_pf)
         return True
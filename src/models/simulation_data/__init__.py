@@ -1,4 +1,5 @@
 from .vehicle_state_reader import VehicleStateReader
 from .simulation_state_reader import SimulationDataCollector
 from .simulation_data import SimulationParams, SimulationDataRecords, SimulationData, SimulationDataRecord
+from .columnar_records import ColumnarWriter, ColumnarRecords
 from .simulation_data_container import SimulationDataContainer
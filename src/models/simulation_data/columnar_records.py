@@ -0,0 +1,129 @@
+import math
+import numpy as np
+from pathlib import Path
+from typing import Dict, List
+
+# Shape of a row of every numeric column, the damage column is stored as the rows it changes at in the header
+COLUMNS: Dict[str, tuple] = {'timer': (), 'pos': (3,), 'dir': (3,), 'vel': (3,), 'steering': (),
+                             'steering_input': (), 'brake': (), 'brake_input': (), 'throttle': (),
+                             'throttle_input': (), 'wheelspeed': (), 'vel_kmh': ()}
+DTYPE = np.float64
+
+
+def _to_row(value, shape: tuple) -> np.ndarray:
+    # Missing values are NaN
+    if value is None:
+        return np.full(shape, np.nan, dtype=DTYPE)
+    return np.asarray(value, dtype=DTYPE).reshape(shape)
+
+
+def _to_value(row: np.ndarray, name: str):
+    if row.ndim > 0:
+        return tuple(row.tolist())
+    value = float(row)
+    if math.isnan(value):
+        return None
+    return int(value) if name == 'vel_kmh' else value
+
+
+class ColumnarWriter:
+    """
+    The ColumnarWriter class declares the incremental writer of the records of a simulation as columns: one raw
+    float64 file per property of the records, and the rows the damage changes at. The records are buffered and
+    appended to the files every flush_rows records, and by flush. The first flush truncates the files, so that the
+    columns never hold records of a former writer of the same folder.
+
+    Args:
+        path (Path): the folder of the column files.
+        flush_rows (int): the number of records buffered before they are written.
+    """
+
+    def __init__(self, path: Path, flush_rows: int = 256):
+        self.path = path
+        self.flush_rows = flush_rows
+        self.buffers = {name: np.empty((flush_rows,) + shape, dtype=DTYPE) for name, shape in COLUMNS.items()}
+        self.buffered = 0
+        self.n = 0
+        self.is_flushed = False
+        self.damage: List[list] = []
+        self.last_damage = None
+
+    def append(self, record):
+        values = record._asdict()
+        for name, shape in COLUMNS.items():
+            self.buffers[name][self.buffered] = _to_row(values[name], shape)
+        if values['damage'] != self.last_damage:
+            self.damage.append([self.n, values['damage']])
+            self.last_damage = values['damage']
+        self.buffered += 1
+        self.n += 1
+        if self.buffered == self.flush_rows:
+            self.flush()
+
+    def flush(self):
+        self.path.mkdir(parents=True, exist_ok=True)
+        for name, buffer in self.buffers.items():
+            with open(self.path.joinpath(f'{name}.f64'), 'ab' if self.is_flushed else 'wb') as f:
+                f.write(buffer[:self.buffered].tobytes())
+        self.buffered = 0
+        self.is_flushed = True
+
+    def get_header(self) -> dict:
+        return {"n": self.n, "dtype": np.dtype(DTYPE).name,
+                "columns": {name: list(shape) for name, shape in COLUMNS.items()}, "damage": self.damage}
+
+
+class ColumnarRecords:
+    """
+    The ColumnarRecords class declares the records of a saved simulation, read from the column files written by
+    ColumnarWriter. The columns are memory-mapped when they are first read, so that an analysis only touches the
+    columns it needs, see column. Reading a record by index builds it from every column.
+
+    Args:
+        path (Path): the folder of the column files.
+        header (dict): the header of the columns, see ColumnarWriter.get_header.
+        record_type (type): the namedtuple type of the records.
+    """
+
+    def __init__(self, path: Path, header: dict, record_type):
+        self.path = path
+        self.n = header["n"]
+        self.shapes = {name: tuple(shape) for name, shape in header["columns"].items()}
+        self.dtype = np.dtype(header["dtype"])
+        self.damage = header["damage"]
+        self.record_type = record_type
+        self.columns: Dict[str, np.ndarray] = {}
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Return the (n, *shape) read-only array of the column.
+        """
+        if name not in self.columns:
+            shape = (self.n,) + self.shapes[name]
+            if self.n == 0:
+                self.columns[name] = np.empty(shape, dtype=self.dtype)
+            else:
+                self.columns[name] = np.memmap(self.path.joinpath(f'{name}.f64'), dtype=self.dtype, mode='r',
+                                               shape=shape)
+        return self.columns[name]
+
+    def get_damage(self, index: int):
+        damage = None
+        for row, value in self.damage:
+            if row > index:
+                break
+            damage = value
+        return damage
+
+    def __len__(self):
+        return self.n
+
+    def __getitem__(self, index: int):
+        if index < -self.n or index >= self.n:
+            raise IndexError("ColumnarRecords index out of range")
+        index = index % self.n
+        values = {name: _to_value(self.column(name)[index], name) for name in self.shapes}
+        return self.record_type(**values, damage=self.get_damage(index))
+
+    def __iter__(self):
+        return (self[i] for i in range(self.n))
@@ -7,6 +7,7 @@ from collections import namedtuple
 from time import sleep
 from typing import List, Union
 from pathlib import Path
+from .columnar_records import ColumnarWriter, ColumnarRecords
 
 # from self_driving.beamng_road_imagery import BeamNGRoadImagery
 # from self_driving.decal_road import DecalRoad
@@ -60,6 +61,7 @@ class SimulationData:
     f_params = 'params'
     # f_road = 'road'
     f_records = 'records'
+    f_columns = 'columns'
 
     def __init__(self, simulation_name: str):
         self.name = simulation_name
@@ -67,7 +69,10 @@ class SimulationData:
         self.simulations: Path = root.joinpath('simulations')
         self.path_root: Path = self.simulations.joinpath(simulation_name)
         self.path_json: Path = self.path_root.joinpath('simulation.full.json')
-        self.path_partial: Path = self.path_root.joinpath('simulation.partial.tsv')
+        # Columnar format, the records are written column by column while they are collected
+        self.path_header: Path = self.path_root.joinpath('simulation.header.json')
+        self.path_columns: Path = self.path_root.joinpath('columns')
+        self.writer: ColumnarWriter = None
         self.path_road_img: Path = self.path_root.joinpath('road')
         self.id: str = None
         self.params: SimulationParams = None
@@ -97,44 +102,60 @@ class SimulationData:
 
     def clean(self):
         delete_folder_recursively(self.path_root)
+        self.writer = None
+
+    def append(self, record: SimulationDataRecord):
+        # The record is written to the columns while the simulation runs
+        self.states.append(record)
+        if self.writer is None:
+            self.writer = ColumnarWriter(self.path_columns)
+        self.writer.append(record)
 
     def save(self):
         self.path_root.mkdir(parents=True, exist_ok=True)
         print(self.path_root)
-        with open(self.path_json, 'w') as f:
+        # Records set without being appended are written now
+        if self.writer is None:
+            self.writer = ColumnarWriter(self.path_columns)
+        for record in self.states[self.writer.n:]:
+            self.writer.append(record)
+        self.writer.flush()
+        with open(self.path_header, 'w') as f:
             f.write(json.dumps({
                 self.f_params: self.params._asdict(),
                 self.f_info: self.info.__dict__,
                 # self.f_road: self.road.to_dict(),
-                self.f_records: [r._asdict() for r in self.states]
+                self.f_columns: self.writer.get_header()
             }))
 
-        with open(self.path_partial, 'w') as f:
-            sep = '\t'
-            f.write(sep.join(SimulationDataRecordProperties) + '\n')
-            gen = (r._asdict() for r in self.states)
-            gen2 = (sep.join([str(d[key]) for key in SimulationDataRecordProperties]) + '\n' for d in gen)
-            f.writelines(gen2)
-
         # road_imagery = BeamNGRoadImagery.from_sample_nodes(self.road.nodes)
         # road_imagery.save(self.path_road_img.with_suffix('.jpg'))
         # road_imagery.save(self.path_road_img.with_suffix('.svg'))
 
     def load(self) -> 'SimulationData':
-        with open(self.path_json, 'r') as f:
+        """
+        Load the saved simulation. The records of the columnar format are read lazily, from memory-mapped columns,
+        the ones of the former JSON format are parsed.
+        """
+        is_columnar = self.path_header.exists()
+        with open(self.path_header if is_columnar else self.path_json, 'r') as f:
             obj = json.loads(f.read())
         info = SimulationInfo()
 
         info.__dict__ = obj.get(self.f_info, {})
+        if is_columnar:
+            states = ColumnarRecords(self.path_columns, obj[self.f_columns], SimulationDataRecord)
+        else:
+            states = [SimulationDataRecord(**r) for r in obj[self.f_records]]
         self.set(
             SimulationParams(**obj[self.f_params]),
             # DecalRoad.from_dict(obj[self.f_road]),
-            [SimulationDataRecord(**r) for r in obj[self.f_records]],
+            states,
             info=info)
         return self
 
     def complete(self) -> bool:
-        return self.path_json.exists()
+        return self.path_header.exists() or self.path_json.exists()
 
     def min_oob_distance(self) -> float:
         return min(state.oob_distance for state in self.states)
@@ -22,7 +22,9 @@ class SimulationDataContainer:
         if self.debug is True:
             self.simulations.append(sim_data_collector)
 
-    def collect(self):
+    def collect(self, polls: dict = None):
+        # polls: the poll of every vehicle in the current tick by vid, the collectors poll them otherwise
         if self.debug is True:
             for sim_data_collector in self.simulations:
-                sim_data_collector.collect_current_data()
\ No newline at end of file
+                vid = sim_data_collector.vehicle_state_reader.vehicle.vid
+                sim_data_collector.collect_current_data(poll=None if polls is None else polls[vid])
\ No newline at end of file
@@ -1,19 +1,20 @@
-from beamngpy import Vehicle, BeamNGpy
+from beamngpy import Vehicle
+from src.models.simulator_backend import SimulatorBackend
 from .simulation_data import SimulationParams, SimulationDataRecords, SimulationData, SimulationDataRecord
 from src.models.simulation_data import VehicleStateReader
 
 
 class SimulationDataCollector:
 
-    def __init__(self, vehicle: Vehicle, beamng: BeamNGpy,
+    def __init__(self, vehicle: Vehicle, backend: SimulatorBackend,
                  # road: DecalRoad,
                  params: SimulationParams,
                  vehicle_state_reader: VehicleStateReader = None,
                  simulation_name: str = None):
         self.vehicle_state_reader = vehicle_state_reader if vehicle_state_reader \
-            else VehicleStateReader(vehicle, beamng)
+            else VehicleStateReader(vehicle, backend)
         # self.oob_monitor = OutOfBoundsMonitor(RoadPolygon.from_nodes(road.nodes), self.vehicle_state_reader)
-        self.beamng: BeamNGpy = beamng
+        self.backend: SimulatorBackend = backend
         # self.road: DecalRoad = road
         self.params: SimulationParams = params
         self.name = simulation_name
@@ -22,10 +23,10 @@ class SimulationDataCollector:
         self.simulation_data.set(self.params, self.states)
         self.simulation_data.clean()
 
-    def collect_current_data(self, oob_bb=True, wrt="right"):
+    def collect_current_data(self, oob_bb=True, wrt="right", poll: dict = None):
         """If oob_bb is True, then the out-of-bound (OOB) examples are calculated
-        using the bounding box of the car."""
-        self.vehicle_state_reader.update_state()
+        using the bounding box of the car. The poll of the vehicle in the current tick is reused when given."""
+        self.vehicle_state_reader.update_state(poll)
         car_state = self.vehicle_state_reader.get_state()
 
         # is_oob, oob_counter, max_oob_percentage, oob_distance, oob_percentage = self.oob_monitor.get_oob_info(oob_bb=oob_bb, wrt=wrt)
@@ -37,7 +38,7 @@ class SimulationDataCollector:
                                                # oob_distance=oob_distance,
                                                # oob_percentage=oob_percentage
                                                )
-        self.states.append(sim_data_record)
+        self.simulation_data.append(sim_data_record)
 
     def get_simulation_data(self) -> SimulationData:
         return self.simulation_data
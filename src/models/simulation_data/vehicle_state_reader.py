@@ -1,8 +1,9 @@
 from collections import namedtuple
 import numpy as np
-from beamngpy import Vehicle, BeamNGpy
-from beamngpy.sensors import Electrics, Timer, Sensor
+from beamngpy import Vehicle
+from beamngpy.sensors import Sensor
 from typing import List, Tuple
+from src.models.simulator_backend import SimulatorBackend
 
 VehicleStateProperties = ['timer', 'pos', 'dir', 'vel', 'steering', 'steering_input',
                           'brake', 'brake_input', 'throttle', 'throttle_input',
@@ -12,37 +13,30 @@ VehicleState = namedtuple('VehicleState', VehicleStateProperties)
 
 
 class VehicleStateReader:
-    def __init__(self, vehicle: Vehicle, beamng: BeamNGpy, additional_sensors: List[Tuple[str, Sensor]] = None):
+    def __init__(self, vehicle: Vehicle, backend: SimulatorBackend,
+                 additional_sensors: List[Tuple[str, Sensor]] = None):
         self.vehicle = vehicle
-        self.beamng = beamng
+        self.backend = backend
         self.state: VehicleState = None
         self.vehicle_state = {}
         self.sensors = None
 
-        electrics = Electrics()
-        timer = Timer()
-
-        self.vehicle.attach_sensor('electrics', electrics)
-        self.vehicle.attach_sensor('timer', timer)
-
-        if additional_sensors:
-            for (name, sensor) in additional_sensors:
-                self.vehicle.attach_sensor(name, sensor)
+        # Electrics and timer sensors, and the additional ones
+        self.backend.attach_sensors(self.vehicle, additional_sensors)
 
     def get_state(self) -> VehicleState:
         return self.state
 
-    def update_state(self):
-        sensors = self.beamng.poll_sensors(self.vehicle)
-        self.sensors = sensors
-
-        self.vehicle.update_vehicle()
-        st = self.vehicle.state
+    def update_state(self, poll: dict = None):
+        # The poll of the current tick is reused when it is given
+        poll = self.backend.poll(self.vehicle) if poll is None else poll
+        st, damage = poll["state"], poll["damage"]
+        self.sensors = {**st, "damage": damage}
 
-        ele = sensors['electrics']
+        ele = st['electrics']
 
         vel = tuple(st['vel'])
-        self.state = VehicleState(timer=sensors['timer']['time']
+        self.state = VehicleState(timer=st['timer']
                                   , pos=tuple(st['pos'])
                                   , dir=tuple(st['dir'])
                                   , vel=vel
@@ -54,5 +48,5 @@ class VehicleStateReader:
                                   , throttle_input=ele.get('throttle_input', None)
                                   , wheelspeed=ele.get('wheelspeed', None)
                                   , vel_kmh=int(round(np.linalg.norm(vel) * 3.6))
-                                  , damage=None if sensors["damage"] == 0 else sensors["damage"]['part_damage']
+                                  , damage=None if damage == 0 else damage['part_damage']
                                   )
@@ -1,77 +1,92 @@
+import os
 import time
 import traceback
-import numpy as np
-from beamngpy import Scenario
-from src.libraries.libs import cal_speed
-from src.models import Simulation
+import uuid
+from src.models import Simulation, SimulationSession, SimulatorBackend, BeamNGBackend, EarlyExit, AdaptiveStep
+from src.models.adaptive_step import STEPS_PER_SECOND
 from src.models.simulation_data import VehicleStateReader, SimulationDataCollector
 from src.models.simulation_data import SimulationParams, SimulationDataContainer
 
 CRASHED = 1
 NO_CRASH = 0
+# Simulated seconds driven on the accelerators before the speed of the vehicles is checked
+ACCELERATOR_WARMUP = 3.5
 
 
 class SimulationExec:
-    def __init__(self, simulation: Simulation, is_birdview: bool = False):
+    def __init__(self, simulation: Simulation, is_birdview: bool = False, session: SimulationSession = None,
+                 warm_scenario: bool = False, backend: SimulatorBackend = None, early_exit: EarlyExit = None,
+                 adaptive_step: AdaptiveStep = None):
         self.simulation = simulation
         self.is_birdview: bool = is_birdview
+        # BeamNG by default, on the simulator of the session. In the warm scenario mode, the scenario of a case
+        # is made and loaded once, the next executions only reset its vehicles
+        self.backend = BeamNGBackend(session, warm_scenario) if backend is None else backend
+        self.setup_time = None
+        self.ticks = 0
+        self.round_trips_per_tick = None
+        # The execution ends as soon as its outcome is decided by the early exit rules, when they are given
+        self.early_exit = early_exit
+        self.exit_reason = None
+        self.saved_sim_time = 0
+        self.saved_wall_time = 0
+        # The steps of a tick depend on the distance between the vehicles, fixed ones are a single size schedule
+        self.adaptive_step = AdaptiveStep() if adaptive_step is None else adaptive_step
+        self.sim_time = 0
 
-    def execute(self, timeout: int = 60):
+    def execute(self, timeout: float = 60, wall_timeout: float = None):
+        """
+        Execute the simulation for timeout simulated seconds, read from the timer sensor of the vehicles. The
+        execution is stopped after wall_timeout seconds of wall time as well, ten times the timeout when None,
+        in case the simulated time stands still.
+        """
+        wall_timeout = 10 * timeout if wall_timeout is None else wall_timeout
         is_teleported = False
         is_valid_to_teleport = []
-        speed_dict_by_vid = {0: [], 1: []}
         start_time = 0
         is_crash = False
         # Condition to start the 2nd vehicle after driving 1st for a while
         # -1: 1st and 2nd start at the same time
         distance_to_trigger = -1
         vehicleId_to_trigger = 0
-        # Init BeamNG simulation
-        bng_instance = self.simulation.init_simulation()
-        scenario = Scenario("smallgrid", self.simulation.name)
-
-        # Import roads from scenario obj to beamNG instance
-        for road in self.simulation.roads:
-            scenario.add_road(road)
-
-        # Import vehicles from scenario obj to beamNG instance
+        setup_start = time.time()
+        # Starting positions of the vehicles
+        positions = []
         for player in self.simulation.players:
             if self.simulation.need_teleport and player.speed > 0:
-                scenario.add_vehicle(player.vehicle, pos=player.accelerator.orig,
-                                     rot=player.rot, rot_quat=player.rot_quat)
+                positions.append(player.accelerator.orig)
                 is_valid_to_teleport.append(False)
             else:
-                scenario.add_vehicle(player.vehicle, pos=player.pos,
-                                     rot=player.rot, rot_quat=player.rot_quat)
-        # BeamNG scenario init
-        bng_instance.open(launch=True)
-        scenario.make(bng_instance)
-        bng_instance.set_deterministic()
-        # bng_instance.remove_step_limit()
+                positions.append(player.pos)
+
+        # Scenario init, or reuse of the loaded one
+        backend = self.backend
+        is_warm = backend.prepare(self.simulation, positions)
 
         # Prepare simulation data collection
+        # Executions started in the same second, e.g. by parallel workers, write to their own folders
         simulation_id = time.strftime('%Y-%m-%d--%H-%M-%S', time.localtime())
+        simulation_id = f'{simulation_id}--{os.getpid()}-{uuid.uuid4().hex[:8]}'
         simulation_name = 'beamng_executor/sim_$(id)'.replace('$(id)', simulation_id)
         sim_data_collectors = SimulationDataContainer(debug=self.simulation.debug)
         for i in range(len(self.simulation.players)):
             player = self.simulation.players[i]
-            vehicle_state = VehicleStateReader(player.vehicle, bng_instance)
+            vehicle_state = VehicleStateReader(player.vehicle, backend)
             sim_data_collectors.append(
                 SimulationDataCollector(player.vehicle,
-                                        bng_instance,
+                                        backend,
                                         SimulationParams(beamng_steps=50,
                                                          delay_msec=int(25 * 0.05 * 1000)),
                                         vehicle_state_reader=vehicle_state,
                                         simulation_name=simulation_name + "_v" + str(i + 1))
             )
+        is_failed = False
         try:
-            bng_instance.load_scenario(scenario)
-            bng_instance.start_scenario()
-            bng_instance.set_weather_preset(self.simulation.weather)
+            backend.start(self.simulation, positions, is_warm)
 
             # Enable bird view
             if self.is_birdview:
-                self.simulation.enable_free_cam(bng_instance)
+                self.simulation.enable_free_cam(backend)
 
             # Drawing debug line and forcing vehicle moving by given trajectory
             idx = 0
@@ -84,11 +99,11 @@ class SimulationExec:
                 # the number of node from road_pf.script must > 2
                 if len(road_pf.script) > 2:
                     if self.simulation.need_teleport:
-                        self.simulation.trigger_vehicle_teleport(player)
-                        self.simulation.render_debug_line(bng_instance, player.accelerator)
+                        self.simulation.trigger_vehicle_teleport(backend, player)
+                        self.simulation.render_debug_line(backend, player.accelerator)
                     else:
-                        self.simulation.trigger_vehicle(player)
-                        self.simulation.render_debug_line(bng_instance, road_pf)
+                        self.simulation.trigger_vehicle(backend, player)
+                        self.simulation.render_debug_line(backend, road_pf)
 
                 idx += 1
 
@@ -96,66 +111,87 @@ class SimulationExec:
             # has a distance_to_trigger property > 0
             # In addition, this variable will prevent the function keep running after 2nd car moving
             is_require_computed_distance = distance_to_trigger > -1
+            self.setup_time = time.time() - setup_start
+            backend.record_setup(is_warm, self.setup_time)
+            print(f'Setup Time ({"warm" if is_warm else "cold"}): {self.setup_time}')
             # Update the vehicle information
             sim_data_collectors.start()
             start_time = time.time()
+            start_round_trips = backend.round_trips
+            last_timer = None
+            seconds_per_step = 1 / STEPS_PER_SECOND
+            steps = self.adaptive_step.fine_steps
+            self.adaptive_step.start()
+            self.simulation.closest_distance = None
+            if self.early_exit is not None:
+                self.early_exit.start()
+
+            # Begin a scenario, until the simulated time is over
+            while self.sim_time < timeout:
+                if time.time() > start_time + wall_timeout:
+                    print("Wall time out!")
+                    break
+                # Record the vehicle state every tick of steps
+                backend.step(steps)
+                self.ticks += 1
+                # Every vehicle is polled once per tick, a vehicle missing in the simulator raises
+                polls = {p.vehicle.vid: backend.poll(p.vehicle) for p in self.simulation.players}
+                states = {vid: poll["state"] for vid, poll in polls.items()}
+                sim_data_collectors.collect(polls)
 
-            # Begin a scenario
-            while time.time() < (start_time + timeout):
-                # Record the vehicle state for every 10 steps
-                bng_instance.step(10)
-                sim_data_collectors.collect()
+                # Simulated time of the execution, counted in steps without timer sensor
+                timer = states[self.simulation.players[0].vehicle.vid]['timer']
+                if timer is None or last_timer is None:
+                    self.sim_time += steps * seconds_per_step
+                else:
+                    self.sim_time += timer - last_timer
+                    seconds_per_step = (timer - last_timer) / steps if timer > last_timer else seconds_per_step
+                last_timer = timer
+
+                # Find the position of moving car
+                for player in self.simulation.players:
+                    self.simulation.collect_vehicle_position_and_timer(backend, player, states[player.vehicle.vid])
 
                 # Compute the distance between two vehicles
+                distance = None
+                if len(self.simulation.players) > 1:
+                    distance = self.simulation.get_vehicles_distance(debug=self.simulation.debug
+                                                                     and is_require_computed_distance)
                 if is_require_computed_distance:
-                    distance_change = self.simulation.get_vehicles_distance(debug=self.simulation.debug)
                     # Trigger the 2nd vehicle
-                    if self.simulation.trigger_vehicle(player=self.simulation.players[vehicleId_to_trigger],
-                                                       distance_report=distance_change,
+                    if self.simulation.trigger_vehicle(backend,
+                                                       player=self.simulation.players[vehicleId_to_trigger],
+                                                       distance_report=distance,
                                                        debug=self.simulation.debug):
                         is_require_computed_distance = False  # No need to compute distance anymore
 
                 for i, player in enumerate(self.simulation.players):
-                    # Find the position of moving car
-                    self.simulation.collect_vehicle_position_and_timer(bng_instance, player)
                     # Collect the damage sensor information
                     vehicle = player.vehicle
-                    # Check whether the imported vehicle existed in beamNG instance or not
-                    if bool(bng_instance.poll_sensors(vehicle)) is False:
-                        raise Exception("Exception: Vehicle not found in bng_instance!")
-                    sensor = bng_instance.poll_sensors(vehicle)['damage']
+                    sensor = polls[vehicle.vid]['damage']
                     if sensor['damage'] != 0:  # Crash detected
                         # Disable AI control
-                        self.simulation.disable_vehicle_ai(vehicle)
+                        self.simulation.disable_vehicle_ai(backend, vehicle)
                         is_crash = True
 
-                    if self.simulation.need_teleport:
-                        # Calculate current speed
-                        cur_speed = 0
-                        if len(player.positions) > 2:
-                            cur_speed = cal_speed(player.get_pos_and_timer_at(-2), player.get_pos_and_timer_at(-1))
-                            speed_dict_by_vid[i].append(cur_speed)
-
-                        # Waiting to collect at least 20 number of speed
-                        if len(speed_dict_by_vid[i]) > 20:
-                            # Get average of the last 3 latest speed number
-                            avg_speed = np.mean(speed_dict_by_vid[i][-3:])
-                            min_speed = player.speed
-                            max_speed = player.speed + 0.5
-                            if min_speed < avg_speed < max_speed:
-                                try:
-                                    is_valid_to_teleport[i] = True
-                                except Exception as e:
-                                    print("Out of vehicle list due to stopping vehicle!")
+                    # Waiting for the vehicle to speed up on its accelerator, then for its last 3 speeds
+                    if self.simulation.need_teleport and self.sim_time > ACCELERATOR_WARMUP:
+                        if player.is_speed_stable(min_speed=player.speed, max_speed=player.speed + 0.5, window=3):
+                            try:
+                                is_valid_to_teleport[i] = True
+                            except Exception as e:
+                                print("Out of vehicle list due to stopping vehicle!")
 
                 # Trigger teleport when both cars are ready
+                is_teleport_tick = False
                 if all(car is True for car in is_valid_to_teleport) and not is_teleported:
-                    is_teleported = self.simulation.teleport(bng_instance, self.simulation.players)
+                    is_teleported = self.simulation.teleport(backend, self.simulation.players, states)
+                    is_teleport_tick = is_teleported
 
                 # Collect bbox coordinates
                 if is_teleported:
                     for i, player in enumerate(self.simulation.players):
-                        bbox = player.vehicle.get_bbox()
+                        bbox = backend.get_bbox(player.vehicle)
                         boundary_x = [
                             bbox['front_bottom_left'][0],
                             bbox['front_bottom_right'][0],
@@ -172,16 +208,46 @@ class SimulationExec:
                         ]
                         player.bbox.append((boundary_x, boundary_y))
 
+                # Stop stepping once the outcome is decided
+                is_accelerating = self.simulation.need_teleport and not is_teleported
+                if not is_accelerating and not is_teleport_tick:
+                    self.simulation.record_distance(distance)
+                if self.early_exit is not None:
+                    is_ready = not is_require_computed_distance and not is_accelerating and not is_teleport_tick
+                    self.exit_reason = self.early_exit.update(self.sim_time, is_crash, distance, is_ready)
+                    if self.exit_reason is not None:
+                        break
+
+                # The distance of the teleport tick was polled on the accelerators, the vehicles land in the scenario
+                if is_teleport_tick:
+                    self.adaptive_step.start()
+                    steps = self.adaptive_step.fine_steps
+                # Fine steps close to a contact, or to the distance triggering a vehicle
+                else:
+                    steps = self.adaptive_step.get_steps(distance, self.sim_time, seconds_per_step, is_accelerating,
+                                                         distance_to_trigger if is_require_computed_distance else None)
+
             # ======== END WHILE =========
+            if self.ticks > 0:
+                self.round_trips_per_tick = (backend.round_trips - start_round_trips) / self.ticks
+            if self.exit_reason is not None:
+                self.saved_sim_time = max(0, timeout - self.sim_time)
+                # The remaining simulated time, at the wall time pace of the execution
+                if self.sim_time > 0:
+                    self.saved_wall_time = self.saved_sim_time * (time.time() - start_time) / self.sim_time
+            if self.early_exit is not None:
+                self.early_exit.record(self.exit_reason, self.saved_sim_time, self.saved_wall_time)
 
             sim_data_collectors.end(success=True)
+            # The last poll gives the final damage and the last position of every vehicle
+            polls = {p.vehicle.vid: backend.poll(p.vehicle) for p in self.simulation.players}
             if not is_crash:
-                print("Timed out!")
+                print("No crash!" if self.exit_reason == EarlyExit.NO_CRASH else "Timed out!")
             else:
                 status_players = [NO_CRASH] * len(self.simulation.players)  # zeros list e.g [0, 0]
                 for i, player in enumerate(self.simulation.players):
                     vehicle = player.vehicle
-                    sensor = bng_instance.poll_sensors(vehicle)['damage']
+                    sensor = polls[vehicle.vid]['damage']
                     if sensor['damage'] != 0:
                         if not sensor['part_damage']:
                             # There is a case that a simulation reports a crash damage
@@ -199,13 +265,19 @@ class SimulationExec:
 
             # Save the last position of vehicle
             for player in self.simulation.players:
-                self.simulation.collect_vehicle_position_and_timer(bng_instance, player)
+                self.simulation.collect_vehicle_position_and_timer(backend, player, polls[player.vehicle.vid]['state'])
         except Exception as ex:
             sim_data_collectors.save()
             sim_data_collectors.end(success=False, exception=ex)
             traceback.print_exception(type(ex), ex, ex.__traceback__)
-            bng_instance.close()
+            is_failed = True
         finally:
             sim_data_collectors.save()
-            bng_instance.close()
+            backend.release(failed=is_failed)
             print("Simulation Time: ", time.time() - start_time)
+            if self.round_trips_per_tick is not None:
+                print(f'Round Trips: {self.round_trips_per_tick:.2f} per tick over {self.ticks} tick(s) '
+                      f'of {self.sim_time:.2f} simulated second(s)')
+            if self.exit_reason is not None:
+                print(f'Early Exit ({self.exit_reason}): saved {self.saved_sim_time:.2f} simulated and '
+                      f'{self.saved_wall_time:.2f} wall second(s)')
@@ -1,10 +1,19 @@
 import beamngpy
+import numpy as np
 import matplotlib.colors as colors
 from typing import List, Tuple
 from src.models import RoadProfiler, Player
 from src.models.ac3rp import CrashScenario
 from src.models.accelerator import Accelerator
-from src.libraries.common import intersect
+
+# Offsets of the accelerators from the center of the scenario, tried in order
+ACCELERATOR_OFFSETS = np.arange(0, 490, 10)
+# Minimum distance between the last points of the accelerators
+ACCELERATOR_DISTANCE = 50
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
 
 
 class SimulationFactory:
@@ -92,45 +101,55 @@ class SimulationFactory:
             data_target[report.name] = report.parts
         return data_target
 
+    @staticmethod
+    def get_valid_offsets(directions: List[np.ndarray], offsets: np.ndarray = ACCELERATOR_OFFSETS) -> np.ndarray:
+        """
+        Return the mask of the offsets the accelerators of two vehicles are valid at: their last points are further
+        than ACCELERATOR_DISTANCE apart and they do not cross. The accelerators at an offset eps are the segments
+        from orig - eps * (1, 1) and orig + eps * (1, 1) along their directions, so both checks are closed-form.
+        """
+        v0, v1 = directions
+        # Start of the second accelerator from the start of the first one
+        w = 2 * offsets[:, None] * np.ones(2)
+        distance = np.linalg.norm(w + v1 - v0, axis=1)
+
+        # Segments [0, v0] and [w, w + v1] cross when the ends of each one are not strictly on the same side of the
+        # other one, and their bounding boxes overlap, for collinear segments
+        o1, o2 = _cross(v0, w), _cross(v0, w + v1)
+        o3, o4 = _cross(v1, -w), _cross(v1, v0 - w)
+        overlap = np.ones(len(offsets), dtype=bool)
+        for axis in range(2):
+            low = np.maximum(min(0, v0[axis]), w[:, axis] + min(0, v1[axis]))
+            high = np.minimum(max(0, v0[axis]), w[:, axis] + max(0, v1[axis]))
+            overlap &= low <= high
+        crossed = (o1 * o2 <= 0) & (o3 * o4 <= 0) & overlap
+        return (distance > ACCELERATOR_DISTANCE) & ~crossed
+
     def generate_accelerator(self, debug):
-        retry, eps, valid = 1, 0, False
         orig = self.get_center_scenario()
-        while not valid:
+        directions = [Accelerator.get_direction(p.speed, p.rot[2] + 180) for p in self.players]
+        valid = np.flatnonzero(self.get_valid_offsets(directions))
+        # The accelerators are set up at the first valid offset, or the last one tried
+        eps = ACCELERATOR_OFFSETS[valid[0]] if len(valid) > 0 else ACCELERATOR_OFFSETS[-1]
+        for i, player in enumerate(self.players):
+            player.accelerator = Accelerator(side=i, eps=eps, speed=player.speed, rotation=player.rot, orig=orig)
+            player.accelerator.setup()
+
+        if len(valid) == 0:
             if debug:
-                print(f'Try {retry} time(s) with eps is {eps}!')
-            for i, player in enumerate(self.players):
-                player.accelerator = Accelerator(side=i, eps=eps, speed=player.speed, rotation=player.rot, orig=orig)
-                player.accelerator.setup()
-
-            # Collect data for checking
-            distance_between_last_points = intersect([p.accelerator.get_lst() for p in self.players], True)
-            crossed = False if len(intersect([p.accelerator.get_lst() for p in self.players])) == 0 else True
-
-            # Is it valid?
-            if distance_between_last_points > 50 and not crossed:
-                valid = True
-                if debug:
-                    print("========================")
-                    print(f'Generate accelerator successfully. Chosen eps is {eps}!')
-                    print(f'Simulation can run with an initial accelerator!')
-                    print(f'Teleport is enabled!')
-                    print("========================")
-
-            # Time to make decision?
-            if retry == 50:  # Try 50 times
-                if debug:
-                    print("========================")
-                    print(f'Failed to generate accelerator. Current eps is {eps}!')
-                    print(f'Simulation will run without an initial accelerator!')
-                    print(f'Teleport is disabled from now!')
-                    print("========================")
-                return False
-
-            # Adjust the configuration
-            eps += 10
-            retry += 1
+                print("========================")
+                print(f'Failed to generate accelerator. Current eps is {eps}!')
+                print(f'Simulation will run without an initial accelerator!')
+                print(f'Teleport is disabled from now!')
+                print("========================")
+            return False
 
         if debug:
+            print("========================")
+            print(f'Generate accelerator successfully. Chosen eps is {eps}!')
+            print(f'Simulation can run with an initial accelerator!')
+            print(f'Teleport is enabled!')
+            print("========================")
             from src.visualization.simulation_factory import VizSimFactory
             VizSimFactory(self).plot_generate_accelerator()
 
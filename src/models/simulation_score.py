@@ -2,12 +2,15 @@ import numpy as np
 import traceback
 
 from src.models import Simulation, Player, categorize_report
+from src.models.ac3rp.report import Report
 from typing import Tuple, List
 from shapely.geometry import Point
 
 MATCHING_CRASH_INDEX = 0
 MATCHING_NONCRASH_INDEX = 1
 NO_CRASH = 0
+# Expected scores by weights and police reports, they only depend on them
+EXPECTED_SCORES = {}
 
 
 class SimulationScore:
@@ -19,11 +22,14 @@ class SimulationScore:
         alpha (float): weight for number of matching crashed parts
         beta (float): weight for number of matching non-crashed parts
         simulation (models.Simulation): a running simulation of specific scenario
+        closest_approach (bool): score a run without crash by the closest approach of the vehicles instead of their
+            final distance, e.g. when an early exit may stop the run at any time.
     """
 
-    def __init__(self, simulation: Simulation, alpha: float = 0.2, beta: float = 0.1):
+    def __init__(self, simulation: Simulation, alpha: float = 0.2, beta: float = 0.1, closest_approach: bool = False):
         self.alpha = alpha
         self.beta = beta
+        self.closest_approach = closest_approach
         self.simulation = simulation
         self.expected_score = 0
         self.simulation_score = 0
@@ -39,6 +45,12 @@ class SimulationScore:
         distance = p0.distance(p1)
         return -distance
 
+    def get_distance_score(self) -> float:
+        # The final distance of the vehicles, or their closest approach when it is asked for and was recorded
+        if self.closest_approach and self.simulation.closest_distance is not None:
+            return -self.simulation.closest_distance
+        return self.distance_between_two_players(self.simulation.players)
+
     def _compute(self, data_targets: {}, data_outputs: {},
                  debug: bool = False, debug_message: str = "Method Name"):
         if debug is True:
@@ -66,10 +78,32 @@ class SimulationScore:
 
         return self.formula(self.alpha, self.beta, result)
 
+    @staticmethod
+    def get_targets(reports: List[Report]) -> {}:
+        return {report.name: report.parts for report in reports}
+
+    @staticmethod
+    def compute_expected_score(targets: {}, alpha: float = 0.2, beta: float = 0.1, debug: bool = False) -> float:
+        """
+        Return the max (expected) score of the targets, i.e. the damaged parts of the police reports, without a
+        simulation. The score is memoized by the weights and the reported parts.
+        """
+        key = (alpha, beta, tuple((vid, tuple(part["name"] for part in parts)) for vid, parts in targets.items()))
+        if key not in EXPECTED_SCORES or debug is True:
+            EXPECTED_SCORES[key] = SimulationScore(None, alpha, beta)._compute(
+                targets, targets, debug=debug, debug_message="SimulationScore.get_expected_score()")
+        return EXPECTED_SCORES[key]
+
+    @staticmethod
+    def from_reports(reports: List[Report], alpha: float = 0.2, beta: float = 0.1, debug: bool = False) -> float:
+        """
+        Return the expected score of the police reports of a CrashScenario, e.g. scenario.reports.
+        """
+        return SimulationScore.compute_expected_score(SimulationScore.get_targets(reports), alpha, beta, debug)
+
     def get_expected_score(self, debug: bool = False):
         # Calculate the max (expected) score of this scenario
-        self.expected_score = self._compute(self.simulation.targets, self.simulation.targets,
-                                            debug=debug, debug_message="SimulationScore.get_expected_score()")
+        self.expected_score = self.compute_expected_score(self.simulation.targets, self.alpha, self.beta, debug)
         return self.expected_score
 
     def calculate(self, debug: bool = False):
@@ -80,13 +114,13 @@ class SimulationScore:
                 for player in self.simulation.players:
                     print(player.vehicle.vid)
                     print(player.positions)
-            self.simulation_score = self.distance_between_two_players(self.simulation.players)
+            self.simulation_score = self.get_distance_score()
         else:
             try:
                 self.simulation_score = self._compute(self.simulation.targets, self.simulation.get_data_outputs(),
                                                       debug=debug, debug_message="SimulationScore.calculate() - CRASH")
             except Exception as ex:
                 traceback.print_exception(type(ex), ex, ex.__traceback__)
-                self.simulation_score = self.distance_between_two_players(self.simulation.players)
+                self.simulation_score = self.get_distance_score()
 
         return self.simulation_score
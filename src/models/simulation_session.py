@@ -0,0 +1,160 @@
+import time
+import traceback
+from multiprocessing import util
+from typing import List
+from beamngpy import BeamNGpy
+from src.models import Simulation, Player
+
+
+class SimulationSession:
+    """
+    The SimulationSession class declares the BeamNG connection of a process. The simulator is launched once and
+    kept alive across evaluations, only the scenario is loaded and unloaded per evaluation. A dead connection
+    is detected when the session is acquired and the simulator is launched again. In the warm scenario mode, the
+    scenario of a case stays loaded as well and the vehicles are only reset between evaluations.
+
+    Args:
+        max_evaluations (int): number of evaluations after which the simulator is restarted, never when None.
+    """
+    # One session per process, e.g. one per ParallelExecutor worker
+    _current = None
+
+    @staticmethod
+    def get() -> 'SimulationSession':
+        if SimulationSession._current is None:
+            SimulationSession._current = SimulationSession()
+            # Worker processes do not run atexit handlers, multiprocessing finalizers run in every process
+            util.Finalize(None, SimulationSession.close_current, exitpriority=10)
+        return SimulationSession._current
+
+    @staticmethod
+    def close_current():
+        if SimulationSession._current is not None:
+            SimulationSession._current.close()
+
+    def __init__(self, max_evaluations: int = None):
+        self.max_evaluations = max_evaluations
+        self.bng: BeamNGpy = None
+        self.evaluations = 0
+        self.total_evaluations = 0
+        self.launches = 0
+        self.reconnects = 0
+        self.launch_time = 0
+        # Warm scenario: key of the loaded scenario and its connected vehicles by vid
+        self.scenario_key = None
+        self.vehicles = {}
+        # Debug lines and spheres drawn in the loaded scenario, as (beamngpy method removing them, their ids)
+        self.debug_objects = []
+        # Setup time of the evaluations, by cold (made and loaded) and warm (reset) scenarios
+        self.setups = {"cold": [], "warm": []}
+
+    def is_alive(self) -> bool:
+        if self.bng is None:
+            return False
+        try:
+            self.bng.get_gamestate()
+            return True
+        except Exception:
+            return False
+
+    def acquire(self) -> BeamNGpy:
+        """
+        Return the running simulator, it is launched when the session is new, dead or worn out.
+        """
+        is_worn_out = self.max_evaluations is not None and self.evaluations >= self.max_evaluations
+        if self.bng is not None and (is_worn_out or not self.is_alive()):
+            print(f'Simulator session at {Simulation.host}:{Simulation.port} is '
+                  f'{"restarted" if is_worn_out else "dead"}, reconnecting!')
+            self.reconnects += 1
+            self.invalidate()
+
+        if self.bng is None:
+            start_time = time.time()
+            self.bng = Simulation.init_simulation()
+            self.bng.open(launch=True)
+            self.scenario_key = None
+            self.launches += 1
+            self.evaluations = 0
+            self.launch_time += time.time() - start_time
+        self.evaluations += 1
+        self.total_evaluations += 1
+        return self.bng
+
+    def is_loaded(self, key) -> bool:
+        return self.bng is not None and key is not None and self.scenario_key == key
+
+    def keep(self, key, players: List[Player]):
+        """
+        Keep the loaded scenario and its vehicles for the next evaluations of the same case.
+        """
+        self.scenario_key = key
+        self.vehicles = {player.vehicle.vid: player.vehicle for player in players}
+
+    def bind(self, players: List[Player]):
+        """
+        Replace the vehicles of the new players by the connected vehicles of the loaded scenario.
+        """
+        for player in players:
+            player.vehicle = self.vehicles[player.vehicle.vid]
+
+    def add_debug(self, remove: str, ids):
+        self.debug_objects.append((remove, ids))
+
+    def clear_debug(self):
+        # The debug lines outlive a restart of the scenario, they would pile up with every warm evaluation
+        for remove, ids in self.debug_objects:
+            getattr(self.bng, remove)(ids)
+        self.debug_objects = []
+
+    def reset(self, players: List[Player], positions: List[tuple]):
+        """
+        Restart the loaded scenario, clear its debug lines, then move the vehicles of the bound players to their
+        starting positions with their damage repaired.
+        """
+        self.bng.restart_scenario()
+        self.clear_debug()
+        for player, pos in zip(players, positions):
+            self.bng.teleport_vehicle(player.vehicle, pos, rot=player.rot, rot_quat=player.rot_quat)
+
+    def record_setup(self, is_warm: bool, setup_time: float):
+        self.setups["warm" if is_warm else "cold"].append(setup_time)
+
+    def release(self, keep_scenario: bool = False):
+        """
+        Unload the scenario of the evaluation, unless it is kept warm, and keep the simulator running for the
+        next one.
+        """
+        if self.bng is None or (keep_scenario and self.scenario_key is not None):
+            return
+        try:
+            self.scenario_key = None
+            self.debug_objects = []
+            self.bng.stop_scenario()
+        except Exception as ex:
+            traceback.print_exception(type(ex), ex, ex.__traceback__)
+            self.invalidate()
+
+    def invalidate(self):
+        """
+        Drop the simulator after a failure, the next evaluation launches a new one.
+        """
+        self.scenario_key = None
+        self.debug_objects = []
+        if self.bng is None:
+            return
+        try:
+            self.bng.close()
+        except Exception:
+            pass
+        self.bng = None
+
+    def close(self):
+        self.invalidate()
+
+    def get_stats(self) -> dict:
+        setup_times = {f'{k}_setup_time': sum(v) / len(v) if len(v) > 0 else None for k, v in self.setups.items()}
+        return {"launches": self.launches, "reconnects": self.reconnects, "evaluations": self.total_evaluations,
+                "launch_time": self.launch_time, **setup_times}
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.get_stats())
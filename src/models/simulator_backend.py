@@ -0,0 +1,87 @@
+from abc import ABC, abstractmethod
+from typing import List
+
+
+class SimulatorBackend(ABC):
+    """
+    The SimulatorBackend class declares the interface between SimulationExec and a simulator. The execution of a
+    simulation only steps the simulator, polls the state and the damage of the vehicles, sets their scripts,
+    teleports them and reads their bounding boxes, so any simulator implementing these methods can run it.
+    Vehicles are the vehicle objects of the players, identified by their vid. The requests sent to the simulator
+    are counted in round_trips.
+
+    The lifecycle methods prepare, start and release load and unload the scenario of a simulation, they do
+    nothing by default for backends without scenario.
+    """
+    round_trips: int = 0
+
+    def prepare(self, simulation, positions: List[tuple]) -> bool:
+        """
+        Set the scenario of the simulation up, with the vehicles at the given starting positions. Return True
+        when the scenario is already loaded and only its vehicles are reset.
+        """
+        return False
+
+    def start(self, simulation, positions: List[tuple], is_warm: bool = False):
+        pass
+
+    def release(self, failed: bool = False):
+        pass
+
+    def record_setup(self, is_warm: bool, setup_time: float):
+        pass
+
+    @abstractmethod
+    def step(self, steps: int):
+        pass
+
+    @abstractmethod
+    def poll_state(self, vehicle) -> dict:
+        """
+        Return the state of the vehicle: its "pos", "dir" and "vel" (x, y, z) tuples, its simulated "timer" in
+        seconds, None when unknown, and its "electrics" values.
+        """
+        pass
+
+    @abstractmethod
+    def poll_damage(self, vehicle) -> dict:
+        """
+        Return the damage of the vehicle in the format of the BeamNG damage sensor: its total "damage" and its
+        "part_damage" as {part: {"name": part name, "damage": value}}.
+        """
+        pass
+
+    def poll(self, vehicle) -> dict:
+        """
+        Return the "state" and the "damage" of the vehicle. A backend polling both at once overrides it, so that
+        an execution polls every vehicle once per tick.
+        """
+        return {"state": self.poll_state(vehicle), "damage": self.poll_damage(vehicle)}
+
+    @abstractmethod
+    def set_script(self, vehicle, script: List[dict], cling: bool = True):
+        pass
+
+    @abstractmethod
+    def stop(self, vehicle):
+        pass
+
+    @abstractmethod
+    def teleport(self, vehicle, pos: tuple):
+        pass
+
+    @abstractmethod
+    def get_bbox(self, vehicle) -> dict:
+        """
+        Return the bounding box of the vehicle as the BeamNG one, e.g. its "front_bottom_left" (x, y, z) corner.
+        """
+        pass
+
+    def attach_sensors(self, vehicle, sensors: list = None):
+        pass
+
+    def render_debug_line(self, road_pf):
+        pass
+
+    def enable_free_cam(self, pos: tuple, direction: tuple):
+        pass
@@ -0,0 +1,167 @@
+import ast
+import csv
+import json
+import multiprocessing
+import os
+import time
+from typing import List, Tuple
+from src.models import SimulationFactory, Simulation, SimulationScore
+from src.models.ac3rp import CrashScenario
+from src.models.vehicle_parts_dict import VEHICLE_PARTS_DICT
+
+# A part name of every damage code, to replay the damage of the logs written before the raw damage was
+CODE_PARTS = {}
+for _part, _code in VEHICLE_PARTS_DICT.items():
+    CODE_PARTS.setdefault(_code, _part)
+
+
+def _parse(value: str):
+    # The log cells are the Python representations of their values
+    if value is None or value == "":
+        return None
+    return ast.literal_eval(value)
+
+
+def _rescore_file(args: Tuple['Rescorer', str, str]) -> int:
+    rescorer, log_file, scenario_path = args
+    return rescorer.rescore_file(log_file, scenario_path)
+
+
+class Rescorer:
+    """
+    The Rescorer class declares the replay-and-rescore engine of recorded evaluations. Every row of an evaluation
+    log is replayed on the simulation of its case: the recorded damage, final positions, bounding boxes and crash
+    status are loaded into its players instead of simulating it again. The replayed simulation is scored with the
+    current SimulationScore, damage clustering and police report logic, and the new scores are written in new
+    columns of the log, beside the recorded ones.
+
+    Args:
+        label (str): the suffix of the new columns, sim_score_<label> and expected_score_<label>.
+        alpha (float): weight of the matching crashed parts.
+        beta (float): weight of the matching non-crashed parts.
+        processes (int): number of processes rescoring the logs of a campaign, one per CPU when None.
+    """
+
+    def __init__(self, label: str = "rescored", alpha: float = 0.2, beta: float = 0.1, processes: int = None):
+        self.label = label
+        self.alpha = alpha
+        self.beta = beta
+        self.processes = processes
+
+    @staticmethod
+    def load_simulation(scenario_path: str, case_name: str = None) -> Simulation:
+        with open(scenario_path) as file:
+            scenario = json.load(file)
+        try:
+            with open(scenario_path.replace("data", "text")) as file:
+                ac3r_data = json.load(file)
+        except Exception as e:
+            ac3r_data = None
+        crash_scenario = CrashScenario.from_json(scenario, ac3r_data)
+        return Simulation(sim_factory=SimulationFactory(crash_scenario),
+                          name=crash_scenario.name if case_name is None else case_name)
+
+    @staticmethod
+    def get_bbox_file(log_file: str, index: int) -> str:
+        # Same name as the one of the bbox plot of the evaluation, see Fitness
+        return log_file.replace("log", "bbox").replace(".csv", f'_{index}.json')
+
+    @staticmethod
+    def replay(simulation: Simulation, row: dict, bbox: dict = None) -> Simulation:
+        """
+        Load the recorded outputs of a log row, and the bounding boxes of the evaluation when given, into the
+        players of the simulation.
+        """
+        part_damage = _parse(row.get("part_damage_full"))
+        positions = _parse(row.get("final_positions"))
+        damages = {}
+        if part_damage is None:
+            # Logs without raw damage give the damage codes only
+            for vehicle in _parse(row["vehicles_damage_full"]):
+                for vid, components in vehicle.items():
+                    damages[vid] = {str(i): {"name": CODE_PARTS.get(c["name"], c["name"]), "damage": c["damage"]}
+                                    for i, c in enumerate(components)}
+        else:
+            damages = part_damage
+
+        simulation.status = int(row["crashed_happened"])
+        for player in simulation.players:
+            vid = player.vehicle.vid
+            player.damage = [damages[vid]] if len(damages.get(vid, {})) > 0 else []
+            player.positions.clear()
+            player.times.clear()
+            player.bbox.clear()
+            if positions is not None:
+                player.collect_positions(tuple(positions[vid]))
+            if bbox is not None:
+                player.bbox.extend(bbox["vehicles"].get(vid, []))
+        return simulation
+
+    def rescore(self, simulation: Simulation, row: dict) -> Tuple[float, float]:
+        simulation_score = SimulationScore(simulation, alpha=self.alpha, beta=self.beta)
+        expected_score = simulation_score.get_expected_score()
+        # The score of a run without crash only depends on the final positions, the recorded one is kept without
+        if simulation.status == 0 and len(simulation.players[0].positions) == 0:
+            return float(row["sim_score"]), expected_score
+        return simulation_score.calculate(), expected_score
+
+    def rescore_file(self, log_file: str, scenario_path: str) -> int:
+        """
+        Rescore the evaluations of a log of the case of scenario_path. Return the number of rescored rows.
+        """
+        with open(log_file, newline='') as f:
+            reader = csv.DictReader(f)
+            keys = list(reader.fieldnames)
+            rows = list(reader)
+
+        simulation = self.load_simulation(scenario_path)
+        score_key, expected_key = f'sim_score_{self.label}', f'expected_score_{self.label}'
+        for key in [score_key, expected_key]:
+            if key not in keys:
+                keys.append(key)
+        for index, row in enumerate(rows):
+            bbox = None
+            if os.path.exists(self.get_bbox_file(log_file, index)):
+                with open(self.get_bbox_file(log_file, index)) as f:
+                    bbox = json.load(f)
+            self.replay(simulation, row, bbox)
+            row[score_key], row[expected_key] = self.rescore(simulation, row)
+
+        # The log is replaced at once, so an interrupted rescoring leaves it as it was
+        with open(log_file + ".tmp", 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, keys)
+            dict_writer.writeheader()
+            dict_writer.writerows(rows)
+        os.replace(log_file + ".tmp", log_file)
+        return len(rows)
+
+    def rescore_files(self, files: List[Tuple[str, str]]) -> int:
+        """
+        Rescore the (log file, scenario path) pairs in parallel. Return the number of rescored rows.
+        """
+        start_time = time.time()
+        if self.processes == 1 or len(files) <= 1:
+            counts = [self.rescore_file(log_file, scenario_path) for log_file, scenario_path in files]
+        else:
+            with multiprocessing.Pool(self.processes) as pool:
+                counts = pool.map(_rescore_file, [(self, log_file, path) for log_file, path in files])
+        print(f'Rescored {sum(counts)} evaluation(s) of {len(files)} log(s) in {time.time() - start_time:.2f}s')
+        return sum(counts)
+
+    def rescore_campaign(self, campaign, outputs: str = "outputs") -> int:
+        """
+        Rescore the logs of every job of the campaign, the ones not run yet are skipped.
+        """
+        files = []
+        for mutator_set in campaign.mutators:
+            for scenario in campaign.scenarios:
+                for algorithm, label in campaign.algorithms.items():
+                    for repetition in range(1, campaign.repetitions + 1):
+                        sim_name = f'{mutator_set.title()}_{label}_{repetition}'
+                        log_file = f'{outputs}/{scenario["name"]}/log/{sim_name}.csv'
+                        if os.path.exists(log_file):
+                            files.append((log_file, scenario["path"]))
+        return self.rescore_files(files)
+
+    def __str__(self):
+        return str(self.__class__) + ": " + str(self.__dict__)
@@ -5,6 +5,26 @@ from test_script_factory import ScriptVisualizationTest
 from test_road_profiler import RoadProfilerTest
 from test_simulation_score import TestSimScore
 from test_k_means import TestKMeans
+from test_fitness_cache import TestFitnessCache
+from test_genotype import TestGenotype
+from test_surrogate import TestSurrogate
+from test_checkpoint import TestCheckpoint
+from test_campaign import TestCampaign
+from test_racing import TestRacing
+from test_rng import TestRng
+from test_simulation_session import TestSimulationSession
+from test_kinematic_execution import TestKinematicExec
+from test_simulator_backend import TestSimulatorBackend
+from test_early_exit import TestEarlyExit
+from test_adaptive_step import TestAdaptiveStep
+from test_ring_buffer import TestRingBuffer
+from test_simulation_data import TestSimulationData
+from test_rescore import TestRescorer
+from test_scenario_cache import TestScenarioCache
+from test_accelerator import TestAccelerator
+from test_origin_sampler import TestOriginSampler
+from test_executor import TestParallelExecutor
+from test_random_evolution import TestRandomEvolution
 
 if __name__ == "__main__":
     runner = unittest.TextTestRunner(verbosity=2)
@@ -15,4 +35,24 @@ if __name__ == "__main__":
     # suite.addTests(loader.loadTestsFromTestCase(RoadProfilerTest))
     suite.addTests(loader.loadTestsFromTestCase(TestSimScore))
     suite.addTests(loader.loadTestsFromTestCase(TestKMeans))
+    suite.addTests(loader.loadTestsFromTestCase(TestFitnessCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestGenotype))
+    suite.addTests(loader.loadTestsFromTestCase(TestSurrogate))
+    suite.addTests(loader.loadTestsFromTestCase(TestCheckpoint))
+    suite.addTests(loader.loadTestsFromTestCase(TestCampaign))
+    suite.addTests(loader.loadTestsFromTestCase(TestRacing))
+    suite.addTests(loader.loadTestsFromTestCase(TestRng))
+    suite.addTests(loader.loadTestsFromTestCase(TestSimulationSession))
+    suite.addTests(loader.loadTestsFromTestCase(TestKinematicExec))
+    suite.addTests(loader.loadTestsFromTestCase(TestSimulatorBackend))
+    suite.addTests(loader.loadTestsFromTestCase(TestEarlyExit))
+    suite.addTests(loader.loadTestsFromTestCase(TestAdaptiveStep))
+    suite.addTests(loader.loadTestsFromTestCase(TestRingBuffer))
+    suite.addTests(loader.loadTestsFromTestCase(TestSimulationData))
+    suite.addTests(loader.loadTestsFromTestCase(TestRescorer))
+    suite.addTests(loader.loadTestsFromTestCase(TestScenarioCache))
+    suite.addTests(loader.loadTestsFromTestCase(TestAccelerator))
+    suite.addTests(loader.loadTestsFromTestCase(TestOriginSampler))
+    suite.addTests(loader.loadTestsFromTestCase(TestParallelExecutor))
+    suite.addTests(loader.loadTestsFromTestCase(TestRandomEvolution))
     runner.run(suite)
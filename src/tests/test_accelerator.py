@@ -0,0 +1,56 @@
+import json
+import math
+import os
+import unittest
+import numpy as np
+from shapely.geometry import LineString
+from src.models import SimulationFactory
+from src.models.accelerator import Accelerator
+from src.models.ac3rp import CrashScenario
+from src.models.simulation_factory import ACCELERATOR_OFFSETS
+
+scenario_path = os.path.join(os.path.dirname(__file__), "../input/117021/data.json")
+with open(scenario_path) as file:
+    scenario_data = json.load(file)
+
+
+def _is_valid(directions, eps) -> bool:
+    # The check of the former placer, on the LineStrings of the accelerators
+    lines = [LineString([(-eps, -eps), (-eps + directions[0][0], -eps + directions[0][1])]),
+             LineString([(eps, eps), (eps + directions[1][0], eps + directions[1][1])])]
+    distance = lines[0].boundary.geoms[1].distance(lines[1].boundary.geoms[1])
+    return distance > 50 and lines[0].intersection(lines[1]).is_empty
+
+
+class TestAccelerator(unittest.TestCase):
+    def test_trajectory_is_a_straight_line(self):
+        trajectory = Accelerator.get_trajectory((10, 20, 0), 12, 30)
+        self.assertEqual(trajectory.shape, (400, 3))
+        step = np.around([np.sin(math.radians(30)), np.cos(math.radians(30))], decimals=5)
+        self.assertEqual(trajectory[7].tolist(), [10 + 7 * step[0], 20 + 7 * step[1], 12])
+        self.assertEqual(Accelerator.get_trajectory((10, 20, 0), 0, 30).shape, (2, 3))
+
+    def test_valid_offsets_match_line_checks(self):
+        rng = np.random.default_rng(0)
+        for _ in range(50):
+            directions = [Accelerator.get_direction(rng.choice([0, 10]), rng.uniform(0, 360)) for _ in range(2)]
+            expected = [_is_valid(directions, eps) for eps in ACCELERATOR_OFFSETS]
+            self.assertEqual(SimulationFactory.get_valid_offsets(directions).tolist(), expected)
+
+    def test_collinear_accelerators_cross(self):
+        # Both along the offsets, the second one starts on the first one
+        directions = [Accelerator.get_direction(10, 45), Accelerator.get_direction(10, 90)]
+        valid = SimulationFactory.get_valid_offsets(directions)
+        self.assertFalse(valid[:14].any())
+
+    def test_generate_accelerator_places_both_vehicles(self):
+        sim_factory = SimulationFactory(CrashScenario.from_json(scenario_data))
+        sim_factory.generate_players()
+        self.assertTrue(sim_factory.generate_accelerator(debug=False))
+        orig = sim_factory.get_center_scenario()
+        first, second = [p.accelerator.orig for p in sim_factory.players]
+        eps = int(round(second[0] - orig[0]))
+        self.assertIn(eps, ACCELERATOR_OFFSETS)
+        self.assertAlmostEqual(first[0], orig[0] - eps)
+        self.assertTrue(SimulationFactory.get_valid_offsets(
+            [Accelerator.get_direction(p.speed, p.rot[2] + 180) for p in sim_factory.players])[eps // 10])
@@ -0,0 +1,33 @@
+import unittest
+from src.models import AdaptiveStep
+
+
+class TestAdaptiveStep(unittest.TestCase):
+    def test_accelerating_vehicles_step_coarsely(self):
+        adaptive_step = AdaptiveStep(fine_steps=10, coarse_steps=60)
+        self.assertEqual(60, adaptive_step.get_steps(5, 0, is_accelerating=True))
+
+    def test_close_vehicles_step_finely(self):
+        adaptive_step = AdaptiveStep(fine_steps=10, coarse_steps=60, fine_distance=20)
+        adaptive_step.get_steps(30, 0)
+        self.assertEqual(10, adaptive_step.get_steps(19, 1))
+        # Closer than the distance to trigger a vehicle at
+        self.assertEqual(10, adaptive_step.get_steps(40, 2, fine_distance=50))
+
+    def test_far_vehicles_step_coarsely(self):
+        adaptive_step = AdaptiveStep(fine_steps=10, coarse_steps=60, fine_distance=20)
+        # Unknown closing speed on the first tick
+        self.assertEqual(10, adaptive_step.get_steps(100, 0))
+        # Diverging vehicles
+        self.assertEqual(60, adaptive_step.get_steps(110, 1))
+
+    def test_coarse_steps_stop_before_fine_distance(self):
+        adaptive_step = AdaptiveStep(fine_steps=10, coarse_steps=600, fine_distance=20)
+        adaptive_step.get_steps(110, 0)
+        # Closing at 10 m/s, 80 meters to the fine distance in 8 seconds, a tick covers half of them
+        self.assertEqual(240, adaptive_step.get_steps(100, 1, seconds_per_step=1 / 60))
+        self.assertEqual(10, adaptive_step.get_steps(21, 8.9, seconds_per_step=1 / 60))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+from unittest import mock
+from src.campaign import JobStore, Campaign, DONE, FAILED, PENDING, RUNNING
+
+src_folder = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+campaign_file = os.path.join(os.path.dirname(__file__), "../campaigns/paper.json")
+
+
+class TestCampaign(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.store = JobStore(os.path.join(self.folder.name, "jobs.db"))
+        self.campaign = Campaign.from_file(campaign_file)
+
+    def tearDown(self):
+        self.store.close()
+        self.folder.cleanup()
+
+    def test_campaign_file_is_expanded_to_jobs(self):
+        self.campaign.enqueue(self.store)
+        # 20 cases x 2 mutator sets x 2 algorithms x 10 repetitions
+        self.assertEqual(800, self.store.count(PENDING))
+        job = self.store.claim("w1")
+        self.assertEqual(("148154", "single", "RANDOM", 1),
+                         (job["case_name"], job["mutator_set"], job["algorithm"], job["repetition"]))
+
+    def test_completed_jobs_are_not_queued_again(self):
+        self.campaign.enqueue(self.store)
+        self.store.finish(self.store.claim("w1")["id"])
+        self.campaign.enqueue(self.store)
+        self.assertEqual((800, 1), (self.store.count(), self.store.count(DONE)))
+        self.assertEqual(2, self.store.claim("w1")["repetition"])
+
+    def test_failed_jobs_are_released(self):
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 1)
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 2)
+        self.store.finish(self.store.claim("w1")["id"], FAILED)
+        self.store.claim("w2")
+        self.assertIsNone(self.store.claim("w3"))
+        # The job of w2 holds its lease, only the failed one is queued again
+        self.assertEqual(1, self.store.release())
+        self.assertEqual((1, RUNNING), (self.store.claim("w3")["repetition"], self._status(2)))
+
+    def test_running_jobs_are_released_when_their_lease_expires(self):
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 1)
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 2)
+        alive, interrupted = self.store.claim("w1"), self.store.claim("w2")
+        self.store.lease = 0.05
+        time.sleep(0.1)
+        self.store.heartbeat(alive["id"])
+        self.assertEqual(1, self.store.release())
+        self.assertEqual(interrupted["id"], self.store.claim("w3")["id"])
+        self.assertEqual(RUNNING, self._status(alive["repetition"]))
+
+    def test_job_of_missing_scenario_is_failed(self):
+        campaign = Campaign(name="missing", scenarios=[{"name": "missing", "path": "missing/data.json"}],
+                            mutators={"single": []}, algorithms={"OPO": "Opo"}, repetitions=1, epochs=1,
+                            store=self.store.path)
+        # The workers import the modules of src like main.py does
+        with mock.patch.object(sys, "path", [src_folder] + sys.path):
+            campaign.run()
+        self.assertEqual((1, 0), (self.store.count(FAILED), self.store.count(DONE)))
+
+    def _status(self, repetition: int) -> str:
+        return self.store._connect().execute("SELECT status FROM jobs WHERE repetition = ?",
+                                             (repetition,)).fetchone()[0]
+
+    def test_progress_reports_eta(self):
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 1)
+        self.store.add("148154", "input/148154/data.json", "single", "OPO", 2)
+        self.store.finish(self.store.claim("w1")["id"])
+        progress = self.store.get_progress(since=0)
+        self.assertEqual((2, 1, 1), (progress["total"], progress["done"], progress["pending"]))
+        self.assertGreater(progress["eta_hours"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.models import categorize_mutator, CONST
+from src.models.ac3rp import CrashScenario, Genotype
+from src.models.mutator import Transformer
+from src.evolution import OpoEvolution, Mutator, Generator, Selector, Checkpoint
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+mutators = [categorize_mutator({
+    "type": CONST.MUTATE_SPEED_CLASS,
+    "probability": 1,
+    "params": {"mean": 0, "std": 10, "min": 10, "max": 50}
+})]
+
+
+class Crash(Exception):
+    pass
+
+
+def create_fitness(crash_at: int = None):
+    calls = []
+
+    def evaluate(repetitions, log_data_file, deap_inds, cache=None):
+        calls.append(1)
+        if len(calls) == crash_at:
+            raise Crash()
+        deap_inds[0].scores = [deap_inds[0].vehicles[0].get_speed()]
+        return deap_inds[0].scores[0],
+    return evaluate
+
+
+def run_opo(fitness, logfile, checkpoint=None):
+    rng = np.random.default_rng(0)
+    transformer = Transformer(mutators, rng)
+    opo = OpoEvolution(scenario=Genotype.from_scenario(scenario), fitness=fitness,
+                       generate=Generator.generate_random_from, generate_params=transformer,
+                       mutate=Mutator.mutate_from, mutate_params=transformer, select=Selector.by_fitness_value,
+                       epochs=6, logfile=logfile, checkpoint=checkpoint, rng=rng)
+    opo.run()
+    return opo
+
+
+class TestCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_resumed_run_is_equal_to_uninterrupted_run(self):
+        expected = run_opo(create_fitness(), io.StringIO())
+
+        checkpoint = Checkpoint(os.path.join(self.folder.name, "opo.pkl"))
+        with open(os.path.join(self.folder.name, "opo.csv"), "a") as logfile:
+            # The 4th evaluation is the 3rd epoch
+            with self.assertRaises(Crash):
+                run_opo(create_fitness(crash_at=4), logfile, checkpoint)
+            resumed = run_opo(create_fitness(), logfile, checkpoint)
+
+        self.assertEqual(expected.logbook, resumed.logbook)
+        with open(os.path.join(self.folder.name, "opo.csv")) as logfile:
+            self.assertEqual(7, len(logfile.readlines()))
+
+    def test_resume_without_snapshot_returns_none(self):
+        checkpoint = Checkpoint(os.path.join(self.folder.name, "missing.pkl"))
+        self.assertIsNone(checkpoint.resume(None, io.StringIO(), None))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from src.models import EarlyExit
+
+
+class TestEarlyExit(unittest.TestCase):
+    def test_crash_settles_before_exit(self):
+        early_exit = EarlyExit(settle_time=1.0)
+        self.assertIsNone(early_exit.update(2.0, False, 5))
+        self.assertIsNone(early_exit.update(2.5, True, 3))
+        self.assertIsNone(early_exit.update(3.4, True, 3))
+        self.assertEqual(EarlyExit.CRASH, early_exit.update(3.5, True, 3))
+
+    def test_diverging_vehicles_exit_without_crash(self):
+        early_exit = EarlyExit(diverging_time=3, min_distance=10)
+        outcomes = [early_exit.update(t, False, d) for t, d in enumerate([20, 12, 8, 9, 11, 13, 15])]
+        # Past the closest approach at 8 meters, 3 seconds diverging and 10 meters apart
+        self.assertEqual([None] * 5 + [EarlyExit.NO_CRASH] * 2, outcomes)
+
+    def test_diverging_time_does_not_depend_on_tick_length(self):
+        for tick in [0.1, 0.5, 1]:
+            early_exit = EarlyExit(diverging_time=2, min_distance=0)
+            times = [i * tick for i in range(int(10 / tick))]
+            outcomes = [early_exit.update(t, False, abs(t - 4)) for t in times]
+            # Closest approach after 4 seconds, the exit comes 2 seconds later
+            self.assertAlmostEqual(6, times[outcomes.index(EarlyExit.NO_CRASH)])
+
+    def test_distances_before_ready_are_ignored(self):
+        early_exit = EarlyExit(diverging_time=2, min_distance=0)
+        self.assertIsNone(early_exit.update(0, False, 10, is_ready=False))
+        self.assertIsNone(early_exit.update(1, False, 20, is_ready=False))
+        self.assertIsNone(early_exit.update(2, False, 30, is_ready=False))
+        self.assertIsNone(early_exit.update(3, False, 40))
+        self.assertIsNone(early_exit.update(4, False, 50))
+        self.assertEqual(EarlyExit.NO_CRASH, early_exit.update(5, False, 60))
+
+    def test_disabled_rules_never_exit(self):
+        early_exit = EarlyExit(settle_time=None, diverging_time=None)
+        self.assertIsNone(early_exit.update(0, False, 10))
+        for t in range(1, 100):
+            self.assertIsNone(early_exit.update(t, t > 50, 10 + t))
+
+    def test_start_resets_the_run(self):
+        early_exit = EarlyExit(settle_time=1.0)
+        early_exit.update(0, True, 0)
+        early_exit.record(EarlyExit.CRASH, 20, 10)
+        early_exit.start()
+        self.assertIsNone(early_exit.update(5, True, 0))
+        early_exit.record(None, 0, 0)
+        self.assertEqual({"runs": 2, EarlyExit.CRASH: 1, EarlyExit.NO_CRASH: 0, "saved_sim_time": 20,
+                          "saved_wall_time": 10}, early_exit.get_stats())
+
+
+if __name__ == '__main__':
+    unittest.main()
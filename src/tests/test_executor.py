@@ -0,0 +1,61 @@
+import ast
+import csv
+import functools
+import json
+import os
+import tempfile
+import unittest
+from src.evolution import Fitness, ParallelExecutor
+from src.models.ac3rp import CrashScenario
+from src.rescore import Rescorer
+
+scenario_path = os.path.join(os.path.dirname(__file__), "../input/148154/data.json")
+with open(scenario_path) as file:
+    scenario_data = json.load(file)
+
+
+def _read(log_file: str) -> list:
+    with open(log_file, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+def _individual(speed: float) -> list:
+    scenario = CrashScenario.from_json(scenario_data)
+    scenario.vehicles[0].speed = speed
+    return [scenario]
+
+
+class TestParallelExecutor(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory(prefix="executor_")
+        for folder in ["log", "bbox"]:
+            os.makedirs(os.path.join(self.folder.name, folder))
+        self.log_file = os.path.join(self.folder.name, "log", "Single_Random_1.csv")
+        self.fitness = functools.partial(Fitness.evaluate, 1, self.log_file, offline=True)
+        self.executor = ParallelExecutor([("127.0.0.1", 64257), ("127.0.0.1", 64258)])
+
+    def tearDown(self):
+        self.executor.shutdown()
+        self.folder.cleanup()
+
+    def test_log_is_written_in_population_order(self):
+        speeds = [10, 20, 30, 40]
+        pop = [_individual(speed) for speed in speeds]
+        fitnesses = self.executor.map(self.fitness, pop)
+        self.assertEqual(len(fitnesses), len(pop))
+        rows = _read(self.log_file)
+        self.assertEqual([ast.literal_eval(row["speeds"])[0]["v1"] for row in rows], speeds)
+        # The bbox files are numbered by the rows of their evaluations
+        for i, row in enumerate(rows):
+            self.assertTrue(os.path.exists(Rescorer.get_bbox_file(self.log_file, i)))
+            self.assertAlmostEqual(float(row["sim_score"]), pop[i][0].scores[0])
+
+    def test_discarded_evaluations_are_not_logged(self):
+        speeds = [10, 20, 30, 40]
+        pop = [_individual(speed) for speed in speeds]
+        fitnesses = self.executor.map_until(self.fitness, pop, lambda fitness: True)
+        self.assertEqual(len(fitnesses), 1)
+        # The evaluations behind the stop point may have run, but only the kept one is logged
+        rows = _read(self.log_file)
+        self.assertEqual([ast.literal_eval(row["speeds"])[0]["v1"] for row in rows], speeds[:1])
+        self.assertFalse(os.path.exists(Rescorer.get_bbox_file(self.log_file, 1)))
@@ -0,0 +1,78 @@
+import copy
+import csv
+import json
+import os
+import tempfile
+import unittest
+from src.models.ac3rp import CrashScenario
+from src.evolution import FitnessCache, Fitness
+from src.evolution.fitness_cache import fingerprint
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+outputs = {"status": 1, "vehicles_damage": {"v1": [], "v2": []}, "sim_damage": {"v1": [], "v2": []},
+           "expected_score": 1.5}
+
+
+class TestFitnessCache(unittest.TestCase):
+    def setUp(self):
+        self.folder = tempfile.TemporaryDirectory()
+        self.cache = FitnessCache(os.path.join(self.folder.name, "cache.db"), max_entries=2)
+
+    def tearDown(self):
+        self.cache.close()
+        self.folder.cleanup()
+
+    def test_fingerprint_is_equal_for_copied_scenario(self):
+        self.assertEqual(fingerprint(scenario), fingerprint(copy.deepcopy(scenario)))
+
+    def test_fingerprint_changes_with_speed(self):
+        mutated_scenario = copy.deepcopy(scenario)
+        mutated_scenario.vehicles[0].movement.set_speed(mutated_scenario.vehicles[0].get_speed() + 1)
+        self.assertNotEqual(fingerprint(scenario), fingerprint(mutated_scenario))
+
+    def test_fingerprint_changes_with_origin(self):
+        mutated_scenario = copy.deepcopy(scenario)
+        points = mutated_scenario.vehicles[0].movement.get_driving_points()
+        mutated_scenario.vehicles[0].movement.set_driving_actions([(p[0] + 1, p[1]) for p in points])
+        self.assertNotEqual(fingerprint(scenario), fingerprint(mutated_scenario))
+
+    def test_get_returns_stored_entry_and_counts_hits(self):
+        self.assertIsNone(self.cache.get(scenario))
+        self.cache.put(scenario, [1.2], outputs)
+        self.assertEqual({"scores": [1.2], "outputs": outputs}, self.cache.get(scenario))
+        stats = self.cache.get_stats()
+        self.assertEqual((1, 1), (stats["hits"], stats["misses"]))
+
+    def test_get_misses_when_repetitions_are_not_enough(self):
+        self.cache.put(scenario, [1.2], outputs)
+        self.assertIsNone(self.cache.get(scenario, repetitions=2))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        scenarios = [copy.deepcopy(scenario) for _ in range(3)]
+        for i, s in enumerate(scenarios):
+            s.vehicles[0].movement.set_speed(10 + i)
+        self.cache.put(scenarios[0], [0], outputs)
+        self.cache.put(scenarios[1], [1], outputs)
+        self.cache.get(scenarios[0])
+        self.cache.put(scenarios[2], [2], outputs)
+        self.assertEqual(2, len(self.cache))
+        self.assertIsNone(self.cache.get(scenarios[1]))
+        self.assertIsNotNone(self.cache.get(scenarios[0]))
+
+    def test_cache_hits_are_logged_without_exception(self):
+        for folder in ["log", "bbox"]:
+            os.makedirs(os.path.join(self.folder.name, folder))
+        log_file = os.path.join(self.folder.name, "log", "Single_OpO_1.csv")
+        for _ in range(2):
+            Fitness.evaluate(1, log_file, [copy.deepcopy(scenario)], cache=self.cache, offline=True)
+        with open(log_file, newline='') as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(["False", "True"], [row["cached"] for row in rows])
+        self.assertEqual(["", ""], [row["exception"] for row in rows])
+        self.assertEqual(rows[0]["sim_score"], rows[1]["sim_score"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import copy
+import json
+import os
+import pickle
+import unittest
+from src.models import CONST
+from src.models.ac3rp import CrashScenario, Genotype
+from src.models.mutator import categorize_mutator, Transformer
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+
+
+class TestGenotype(unittest.TestCase):
+    def test_materialised_scenario_is_equal_to_base(self):
+        genotype = Genotype.from_scenario(scenario)
+        materialised = genotype.to_scenario()
+        for vehicle, base_vehicle in zip(materialised.vehicles, scenario.vehicles):
+            self.assertEqual(base_vehicle.movement.get_driving_points(), vehicle.movement.get_driving_points())
+            self.assertAlmostEqual(base_vehicle.get_speed(), vehicle.get_speed())
+        self.assertIs(scenario.roads, materialised.roads)
+
+    def test_deepcopy_shares_base_scenario(self):
+        genotype = Genotype.from_scenario(scenario)
+        clone = copy.deepcopy(genotype)
+        self.assertIs(genotype.base, clone.base)
+        self.assertIsNot(genotype.genes, clone.genes)
+
+    def test_pickle_carries_genes_only(self):
+        genotype = Genotype.from_scenario(scenario)
+        genotype.genes[0][0] = 42
+        restored = pickle.loads(pickle.dumps(genotype))
+        self.assertIs(genotype.base, restored.base)
+        self.assertEqual(42, restored.vehicles[0].get_speed())
+
+    def test_transformer_mutates_genes_and_keeps_base(self):
+        transformer = Transformer([categorize_mutator(m) for m in [
+            {
+                "type": CONST.MUTATE_SPEED_CLASS,
+                "probability": 0.5,
+                "params": {"mean": 0, "std": 10, "min": 10, "max": 50}
+            },
+            {
+                "type": CONST.MUTATE_INITIAL_POINT_CLASS,
+                "probability": 0.5,
+                "params": {"mean": 0, "std": 1, "min": -10, "max": 10}
+            }
+        ]])
+        genotype = Genotype.from_scenario(scenario)
+        base_origin = scenario.vehicles[0].movement.get_driving_points()[0]
+        mutant = transformer.mutate_from(genotype, is_unit_test=True)
+
+        self.assertEqual(base_origin, scenario.vehicles[0].movement.get_driving_points()[0])
+        self.assertNotEqual(base_origin, mutant.vehicles[0].movement.get_driving_points()[0])
+        # The vehicles materialised again from the genes are the mutated ones
+        vehicle = copy.deepcopy(mutant).vehicles[0]
+        self.assertAlmostEqual(mutant.vehicles[0].movement.get_driving_points()[0][0],
+                               vehicle.movement.get_driving_points()[0][0])
+        self.assertAlmostEqual(mutant.vehicles[0].movement.get_driving_points()[0][1],
+                               vehicle.movement.get_driving_points()[0][1])
+        self.assertAlmostEqual(mutant.vehicles[0].get_speed(), vehicle.get_speed())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,72 @@
+import json
+import os
+import time
+import unittest
+import beamngpy
+from types import SimpleNamespace
+from src.models import SimulationFactory, Simulation, SimulationScore, KinematicExec, Player, RoadProfiler
+from src.models.ac3rp import CrashScenario
+from src.models.vehicle_parts_dict import VEHICLE_PARTS_DICT
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+
+
+def _simulation(trajectories, distances_to_trigger=None):
+    # Straight trajectories given by their first and last points, in (x, y, speed)
+    players = []
+    for i, (first, last) in enumerate(trajectories):
+        road_pf = RoadProfiler()
+        road_pf.compute_ai_script(trajectory=[first, [(a + b) / 2 for a, b in zip(first, last)], last])
+        players.append(Player(vehicle=beamngpy.Vehicle(f'v{i + 1}', model="etk800"), road_pf=road_pf,
+                              pos=(first[0], first[1], 0), rot=(0, 0, 0), rot_quat=None,
+                              distance_to_trigger=-1 if distances_to_trigger is None else distances_to_trigger[i],
+                              speed=first[2]))
+    return SimpleNamespace(players=players, status=0)
+
+
+def _codes(player: Player):
+    return {VEHICLE_PARTS_DICT[part["name"]] for part in player.damage[0].values()}
+
+
+class TestKinematicExec(unittest.TestCase):
+    def test_case_crashes_as_reported(self):
+        simulation = Simulation(sim_factory=SimulationFactory(CrashScenario.from_json(scenario_data)),
+                                name="148154", need_teleport=True)
+        KinematicExec(simulation).execute(timeout=30)
+        self.assertEqual(1, simulation.status)
+        self.assertAlmostEqual(SimulationScore(simulation).get_expected_score(),
+                               SimulationScore(simulation).calculate())
+
+    def test_side_impact_damages_hit_zones(self):
+        # v2 drives west into the right side of v1 driving north
+        simulation = _simulation([([0, -18.75, 10], [0, 20, 10]), ([22, 0, 10], [-20, 0, 10])])
+        KinematicExec(simulation).execute(timeout=30)
+        self.assertEqual(1, simulation.status)
+        self.assertIn("MR", _codes(simulation.players[0]))
+        self.assertTrue(_codes(simulation.players[0]).issubset({"M", "MR"}))
+        self.assertEqual({"F"}, _codes(simulation.players[1]))
+
+    def test_parallel_vehicles_do_not_crash(self):
+        simulation = _simulation([([0, 0, 10], [0, 100, 10]), ([5, 0, 10], [5, 100, 10])])
+        start_time = time.time()
+        KinematicExec(simulation, dt=0.05).execute(timeout=30)
+        # Orders of magnitude faster than the 30 seconds simulated
+        self.assertLess(time.time() - start_time, 1)
+        self.assertEqual(0, simulation.status)
+        self.assertEqual(601, len(simulation.players[0].positions))
+        self.assertEqual([], simulation.players[0].damage)
+        self.assertAlmostEqual(-5, SimulationScore.distance_between_two_players(simulation.players))
+
+    def test_vehicle_waits_for_distance_to_trigger(self):
+        simulation = _simulation([([0, 0, 10], [0, 100, 10]), ([5, 50, 10], [5, 100, 10])], [-1, 20])
+        KinematicExec(simulation).execute(timeout=10)
+        v1, v2 = simulation.players
+        start = next(i for i, p in enumerate(v2.positions) if p != v2.positions[0])
+        # v1 drives 10 m/s, it is 20 meters away from v2 after about 3 seconds
+        self.assertAlmostEqual(3.1, v1.times[start], delta=0.1)
+        self.assertLess(v1.positions[start][1], 50)
+
+
+if __name__ == '__main__':
+    unittest.main()
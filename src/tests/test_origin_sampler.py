@@ -0,0 +1,61 @@
+import json
+import math
+import os
+import unittest
+import numpy as np
+from shapely.geometry import Point
+from src.models import categorize_mutator, CONST
+from src.models.ac3rp import CrashScenario
+from src.models.mutator import OriginSampler
+
+scenario_path = os.path.join(os.path.dirname(__file__), "../input/148154/data.json")
+with open(scenario_path) as file:
+    scenario_data = json.load(file)
+
+
+class TestOriginSampler(unittest.TestCase):
+    def setUp(self):
+        self.scenario = CrashScenario.from_json(scenario_data)
+        self.vehicle = self.scenario.vehicles[0]
+        self.road = self.vehicle.road_data["road"]
+        self.center = self.vehicle.movement.get_driving_points()[0]
+
+    def test_contains_matches_the_road_polygon(self):
+        sampler = OriginSampler(self.road.road_poly)
+        rng = np.random.default_rng(0)
+        min_x, min_y, max_x, max_y = self.road.road_poly.bounds
+        points = np.column_stack([rng.uniform(min_x - 5, max_x + 5, 2000), rng.uniform(min_y - 5, max_y + 5, 2000)])
+        boundary = np.array(self.road.road_poly.exterior.coords)
+        points = np.vstack([points, boundary, boundary + rng.normal(0, 0.01, boundary.shape)])
+        expected = [self.road.road_poly.contains(Point(p)) for p in points]
+        self.assertEqual(sampler.contains(points).tolist(), expected)
+
+    def test_batched_origins_are_on_the_road_at_distance(self):
+        origins = OriginSampler.get(self.road).sample(self.center, 15, size=200, rng=np.random.default_rng(1))
+        self.assertEqual(origins.shape, (200, 2))
+        distances = np.linalg.norm(origins - np.array(self.center), axis=1)
+        self.assertTrue(np.allclose(distances, 15))
+        self.assertTrue(all(self.road.road_poly.contains(Point(p)) for p in origins))
+
+    def test_sampler_is_built_once_per_road(self):
+        self.assertIs(OriginSampler.get(self.road), OriginSampler.get(self.road))
+        other = CrashScenario.from_json(scenario_data)
+        self.assertIs(OriginSampler.get(other.vehicles[0].road_data["road"]), OriginSampler.get(self.road))
+
+    def test_no_origin_off_the_road(self):
+        sampler = OriginSampler.get(self.road)
+        min_x, min_y, max_x, max_y = self.road.road_poly.bounds
+        far = (max_x + 100, max_y + 100)
+        self.assertIsNone(sampler.sample(far, 10, rng=np.random.default_rng(2)))
+        self.assertEqual(sampler.sample(self.center, 0).tolist(), [list(self.center)])
+
+    def test_mutated_initial_point_is_on_the_road(self):
+        mutator = categorize_mutator({
+            "type": CONST.MUTATE_INITIAL_POINT_CLASS,
+            "probability": 1,
+            "params": {"mean": 0, "std": 15, "min": 10, "max": 50}
+        })
+        vehicle = mutator.mutate(self.vehicle, is_random=True, rng=np.random.default_rng(3))
+        new_origin = vehicle.movement.get_driving_points()[0]
+        self.assertTrue(self.road.road_poly.contains(Point(new_origin)))
+        self.assertGreaterEqual(math.dist(new_origin, self.center), 10 - 1e-9)
@@ -0,0 +1,70 @@
+import unittest
+from deap import base, creator
+from src.evolution import Racing, Selector
+
+creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+creator.create("Individual", list, fitness=creator.FitnessMax)
+
+
+class Scenario:
+    def __init__(self, samples):
+        self.samples = list(samples)
+        self.scores = [self.samples.pop(0)]
+
+
+def create_individual(samples):
+    ind = creator.Individual([Scenario(samples)])
+    ind.fitness.values = (ind[0].scores[0],)
+    return ind
+
+
+def evaluate(deap_inds):
+    deap_inds[0].scores = deap_inds[0].scores + [deap_inds[0].samples.pop(0)]
+    return sum(deap_inds[0].scores) / len(deap_inds[0].scores),
+
+
+class TestRacing(unittest.TestCase):
+    def setUp(self):
+        self.racing = Racing(max_repetitions=5)
+        self.racing.bind(evaluate)
+
+    def test_clearly_inferior_challenger_is_rejected_after_min_repetitions(self):
+        orig = create_individual([1.6, 1.6, 1.6, 1.6, 1.6])
+        mutant = create_individual([-5, -5, 1.6, 1.6, 1.6])
+        self.assertIs(orig, Selector.by_racing(self.racing, orig, [mutant]))
+        self.assertEqual((2, 2), (len(orig[0].scores), len(mutant[0].scores)))
+        self.assertEqual(2, self.racing.get_stats()["saved"])
+
+    def test_single_repetition_does_not_decide(self):
+        self.assertIsNone(self.racing.decide([1.6], [-5]))
+        # The first sample of the challenger was a lucky outlier, the race goes on and keeps the incumbent
+        orig = create_individual([1.3, 1.4, 1.3, 1.4, 1.3])
+        mutant = create_individual([5, 1.3, 1.4, 1.3, 1.4])
+        self.assertIs(orig, Selector.by_racing(self.racing, orig, [mutant]))
+        self.assertEqual(5, len(mutant[0].scores))
+
+    def test_margin_is_relative_to_score_scale(self):
+        # The same gap of 1 separates scores around 1, but not scores around 100
+        self.assertTrue(self.racing.decide([2, 2], [1, 1]))
+        self.assertIsNone(self.racing.decide([101, 101], [100, 100]))
+        self.assertFalse(self.racing.decide([100, 100], [120, 120]))
+
+    def test_clearly_superior_challenger_is_accepted(self):
+        orig = create_individual([1.2, 1.2, 1.2, 1.2, 1.2])
+        mutant = create_individual([1.6, 1.6, 1.6, 1.6, 1.6])
+        self.assertIs(mutant, Selector.by_racing(self.racing, orig, [mutant]))
+
+    def test_overlapping_challenger_runs_all_repetitions_and_incumbent_is_kept(self):
+        orig = create_individual([1.3, 1.4, 1.3, 1.4, 1.3])
+        mutant = create_individual([1.4, 1.3, 1.4, 1.3, 1.4])
+        self.assertIs(orig, Selector.by_racing(self.racing, orig, [mutant]))
+        self.assertEqual((5, 5), (len(orig[0].scores), len(mutant[0].scores)))
+        self.assertAlmostEqual(1.34, orig.fitness.values[0])
+
+    def test_unbound_racing_raises_exception(self):
+        with self.assertRaises(Exception):
+            Racing().select(create_individual([1]), create_individual([1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
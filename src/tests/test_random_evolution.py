@@ -0,0 +1,60 @@
+import io
+import json
+import os
+import unittest
+import numpy as np
+from src.models import categorize_mutator, CONST
+from src.models.ac3rp import CrashScenario, Genotype
+from src.models.mutator import Transformer
+from src.evolution import RandomEvolution, Generator
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+mutators = [categorize_mutator({
+    "type": CONST.MUTATE_SPEED_CLASS,
+    "probability": 1,
+    "params": {"mean": 0, "std": 10, "min": 10, "max": 50}
+})]
+
+
+class SequentialExecutor:
+    # Evaluates in order, as ParallelExecutor without the workers
+    def map(self, func, pop) -> list:
+        return [func(ind) for ind in pop]
+
+    def map_until(self, func, pop, stop) -> list:
+        fitnesses = []
+        for ind in pop:
+            fitnesses.append(func(ind))
+            if stop(fitnesses[-1]):
+                break
+        return fitnesses
+
+
+def create_fitness(scores: list):
+    def evaluate(repetitions, log_data_file, deap_inds, cache=None):
+        deap_inds[0].scores = [scores.pop(0)]
+        return deap_inds[0].scores[0],
+    return evaluate
+
+
+def keep_incumbent(null_func, orig_inds, pop_ind):
+    return orig_inds
+
+
+class TestRandomEvolution(unittest.TestCase):
+    def test_batch_ends_when_individual_exceeding_threshold_is_rejected(self):
+        rng = np.random.default_rng(0)
+        # The original, then the batch is cut after the 2nd mutant exceeding the threshold
+        rev = RandomEvolution(scenario=Genotype.from_scenario(scenario), fitness=create_fitness([1, 0.5, 2, 3]),
+                              generate=Generator.generate_random_from, generate_params=Transformer(mutators, rng),
+                              select=keep_incumbent, logfile=io.StringIO(), epochs=5, threshold=1.5,
+                              executor=SequentialExecutor(), batch=True, rng=rng)
+        rev.run()
+        self.assertEqual([0, 1, 2], rev.logbook.select("gen"))
+        self.assertEqual([1, 1, 1], rev.logbook.chapters["fitness"].select("max"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import csv
+import json
+import math
+import os
+import tempfile
+import unittest
+from src.campaign import Campaign
+from src.evolution import Fitness
+from src.models.ac3rp import CrashScenario
+from src.rescore import Rescorer
+
+scenario_path = os.path.join(os.path.dirname(__file__), "../input/148154/data.json")
+with open(scenario_path) as file:
+    scenario_data = json.load(file)
+
+
+def _read(log_file: str) -> list:
+    with open(log_file, newline='') as f:
+        return list(csv.DictReader(f))
+
+
+class TestRescorer(unittest.TestCase):
+    def setUp(self):
+        # Logs of offline evaluations, laid out as the ones of an experiment
+        self.folder = tempfile.TemporaryDirectory(prefix="rescore_")
+        for folder in ["log", "bbox"]:
+            os.makedirs(os.path.join(self.folder.name, "148154", folder))
+        self.log_file = os.path.join(self.folder.name, "148154", "log", "Single_OpO_1.csv")
+        for _ in range(2):
+            Fitness.evaluate(1, self.log_file, [CrashScenario.from_json(scenario_data)], offline=True)
+
+    def tearDown(self):
+        self.folder.cleanup()
+
+    def test_recorded_scores_are_replayed(self):
+        Rescorer(label="same").rescore_file(self.log_file, scenario_path)
+        for row in _read(self.log_file):
+            self.assertAlmostEqual(float(row["sim_score"]), float(row["sim_score_same"]))
+            self.assertAlmostEqual(float(row["expected_score"]), float(row["expected_score_same"]))
+
+    def test_new_weights_are_written_beside_recorded_scores(self):
+        rows = _read(self.log_file)
+        Rescorer(label="alpha", alpha=0.4).rescore_file(self.log_file, scenario_path)
+        rescored = _read(self.log_file)
+        self.assertEqual([r["sim_score"] for r in rows], [r["sim_score"] for r in rescored])
+        # The matching crashed parts of both vehicles weigh twice as much
+        for row in rescored:
+            self.assertAlmostEqual(float(row["sim_score"]) + 2 * 0.2, float(row["sim_score_alpha"]))
+
+    def test_logs_without_replay_data_are_rescored(self):
+        rows = _read(self.log_file)
+        rows[1].update({"part_damage_full": "", "final_positions": "", "crashed_happened": "0", "sim_score": "-3"})
+        with open(self.log_file, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, list(rows[0].keys()))
+            dict_writer.writeheader()
+            dict_writer.writerows(rows)
+        os.remove(Rescorer.get_bbox_file(self.log_file, 1))
+        Rescorer(label="old").rescore_file(self.log_file, scenario_path)
+        rescored = _read(self.log_file)
+        self.assertAlmostEqual(float(rescored[0]["sim_score"]), float(rescored[0]["sim_score_old"]))
+        # No crash and no final positions, the recorded distance is kept
+        self.assertEqual(-3, float(rescored[1]["sim_score_old"]))
+
+    def test_runs_without_crash_are_rescored_from_final_positions(self):
+        rows = _read(self.log_file)
+        rows[1].update({"crashed_happened": "0", "sim_score": "-3"})
+        with open(self.log_file, 'w', newline='') as f:
+            dict_writer = csv.DictWriter(f, list(rows[0].keys()))
+            dict_writer.writeheader()
+            dict_writer.writerows(rows)
+        Rescorer(label="distance").rescore_file(self.log_file, scenario_path)
+        (x1, y1), (x2, y2) = json.loads(rows[1]["final_positions"].replace("'", '"')).values()
+        self.assertAlmostEqual(-math.hypot(x1 - x2, y1 - y2), float(_read(self.log_file)[1]["sim_score_distance"]))
+
+    def test_campaign_logs_are_rescored_in_parallel(self):
+        campaign = Campaign(name="test", scenarios=[{"name": "148154", "path": scenario_path}],
+                            mutators={"single": [], "multiple": []}, algorithms={"OPO": "OpO"}, repetitions=2)
+        # Only the log of the first job exists
+        count = Rescorer(label="campaign", processes=2).rescore_campaign(campaign, outputs=self.folder.name)
+        self.assertEqual(2, count)
+        self.assertIn("sim_score_campaign", _read(self.log_file)[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
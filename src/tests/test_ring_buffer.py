@@ -0,0 +1,64 @@
+import unittest
+import beamngpy
+import numpy as np
+from src.libraries.libs import cal_speed
+from src.models import Player, RoadProfiler
+from src.models.ring_buffer import RingBuffer
+
+
+def _player():
+    return Player(vehicle=beamngpy.Vehicle('v1', model="etk800"), road_pf=RoadProfiler(), pos=(0, 0, 0),
+                  rot=(0, 0, 0), rot_quat=None, distance_to_trigger=-1, speed=10)
+
+
+class TestRingBuffer(unittest.TestCase):
+    def test_buffer_grows_and_reads_as_list(self):
+        buffer = RingBuffer(shape=(2,), capacity=2)
+        for i in range(5):
+            buffer.append((i, i * 2))
+        self.assertEqual(5, len(buffer))
+        self.assertEqual([(0, 0), (1, 2), (2, 4), (3, 6), (4, 8)], buffer)
+        self.assertEqual((4, 8), buffer[-1])
+        self.assertEqual([(3, 6), (4, 8)], buffer[-2:])
+        self.assertEqual((5, 2), buffer.array.shape)
+
+    def test_buffer_with_maxlen_keeps_last_rows(self):
+        buffer = RingBuffer(maxlen=3)
+        buffer.extend([1, 2, 3, 4])
+        buffer.append(5)
+        self.assertEqual([3, 4, 5], buffer.to_list())
+        self.assertEqual(3, buffer[0])
+        self.assertEqual([4, 5], buffer.last(2).tolist())
+        with self.assertRaises(IndexError):
+            buffer[3]
+
+    def test_boxes_read_as_appended(self):
+        buffer = RingBuffer(shape=(2, 5))
+        box = ([0, 1, 1, 0, 0], [0, 0, 1, 1, 0])
+        buffer.append(box)
+        self.assertEqual([box], buffer.to_list())
+
+    def test_player_speeds_match_cal_speed(self):
+        player = _player()
+        for timer, position in [(0, (0, 0)), (0.5, (5, 0)), (0.5, (6, 0)), (1.5, (6, 0.2)), (2.5, (6, 10.2))]:
+            player.collect_positions(position)
+            player.collect_timers(timer)
+        expected = [cal_speed(player.get_pos_and_timer_at(i - 1), player.get_pos_and_timer_at(i)) for i in range(1, 5)]
+        np.testing.assert_allclose(expected, player.get_speeds(window=4))
+        np.testing.assert_allclose(expected[-2:], player.get_speeds(window=2))
+
+    def test_player_speed_stabilises(self):
+        player = _player()
+        for i in range(3):
+            player.collect_positions((0, i * 10.2))
+            player.collect_timers(i)
+        # Only 2 speeds for a window of 3
+        self.assertFalse(player.is_speed_stable(10, 10.5, window=3))
+        player.collect_positions((0, 30.6))
+        player.collect_timers(3)
+        self.assertTrue(player.is_speed_stable(10, 10.5, window=3))
+        self.assertFalse(player.is_speed_stable(11, 11.5, window=3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import json
+import os
+import unittest
+import numpy as np
+from src.models import CONST
+from src.models.ac3rp import CrashScenario
+from src.models.mutator import categorize_mutator, Transformer
+from src.libraries import rng as rngs
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+mutators_data = [
+    {
+        "type": CONST.MUTATE_SPEED_CLASS,
+        "probability": 0.5,
+        "params": {"mean": 0, "std": 10, "min": 10, "max": 50}
+    },
+    {
+        "type": CONST.MUTATE_INITIAL_POINT_CLASS,
+        "probability": 0.5,
+        "params": {"mean": 0, "std": 1, "min": -10, "max": 10}
+    }
+]
+
+
+def mutate(seed: int):
+    transformer = Transformer([categorize_mutator(m) for m in mutators_data], np.random.default_rng(seed))
+    mutated_scenario = transformer.mutate_from(transformer.mutate_random_from(scenario))
+    return [(v.get_speed(), v.movement.get_driving_points()[0]) for v in mutated_scenario.vehicles]
+
+
+class TestRng(unittest.TestCase):
+    def test_same_seed_replays_mutations(self):
+        self.assertEqual(mutate(7), mutate(7))
+
+    def test_different_seeds_give_different_mutations(self):
+        self.assertNotEqual(mutate(7), mutate(8))
+
+    def test_seed_replays_default_stream(self):
+        rngs.seed(42)
+        expected = rngs.default_rng().random(3).tolist()
+        rngs.seed(42)
+        self.assertEqual(expected, rngs.default_rng().random(3).tolist())
+
+    def test_spawned_streams_are_independent(self):
+        root = np.random.SeedSequence(42)
+        first, second = [np.random.default_rng(s).random(3).tolist() for s in rngs.spawn(2, root)]
+        self.assertNotEqual(first, second)
+
+
+if __name__ == '__main__':
+    unittest.main()
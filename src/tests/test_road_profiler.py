@@ -26,6 +26,28 @@ class RoadProfilerTest(unittest.TestCase):
         self.assertEqual(sample_spheres, road_pf.spheres[0:4])
         self.assertEqual(sample_sphere_colors, road_pf.sphere_colors[0:4])
 
+    def test_compute_ai_script_skips_segments_of_length_0(self):
+        trajectory = [(0, 0, 10), (30, 40, 10), (30, 40, 0), (30, 50, 5), (30, 60, 0), (30, 70, 5)]
+        road_pf = RoadProfiler()
+        road_pf.compute_ai_script(trajectory=trajectory, delay=1.5)
+        # 50m at 10m/s, no time on the zero speed segment, the node after the skipped one takes the next time
+        self.assertEqual([n['t'] for n in road_pf.script], [1, 6, 6, 8, 8])
+        self.assertEqual([(n['x'], n['y']) for n in road_pf.script], [p[:2] for p in trajectory[:5]])
+        self.assertEqual(road_pf.radii, [0.25] * 5)
+
+    def test_get_script_offsets_times(self):
+        road_pf = RoadProfiler()
+        road_pf.compute_ai_script(trajectory=[(0, 0, 10), (0, 20, 10), (0, 40, 10)])
+        script = road_pf.get_script(offset=12.5)
+        self.assertEqual([n['t'] for n in script], [12.5, 14.5, 16.5])
+        self.assertEqual([n['t'] for n in road_pf.script], [0, 2, 4])
+
+    def test_compute_scripts_ends_past_the_second_point(self):
+        points = ScriptFactory(0, 0, 0, 12).compute_scripts(distance=5)
+        self.assertEqual([p[:2] for p in points], [(0, 0), (0, 5), (0, 10), (0, 15), (0, 20), (0, 25), (0, 30),
+                                                   (0, 35), (0, 40)])
+        self.assertEqual({p[2] for p in points}, {30})
+
     def test_init_object(self):
         road_pf = RoadProfiler()
         self.assertEqual([], road_pf.script)
@@ -0,0 +1,58 @@
+import copy
+import json
+import os
+import tempfile
+import unittest
+from src.models.ac3rp import CrashScenario, Road, ScenarioCache
+
+scenario_path = os.path.join(os.path.dirname(__file__), "../input/99817/data.json")
+with open(scenario_path) as file:
+    scenario_data = json.load(file)
+
+
+def _dump(road: Road) -> tuple:
+    return (road.road_nodes, road.road_width, road.road_poly.wkt, road.road_line_equation,
+            [(line.name, line.nodes, line.pattern) for line in [road.left_line, road.right_line] + road.middle_lines])
+
+
+class TestScenarioCache(unittest.TestCase):
+    def test_cached_roads_are_the_built_ones(self):
+        expected = [_dump(Road.from_dict(f'road_{i}', road)) for i, road in enumerate(scenario_data["roads"])]
+        cache = ScenarioCache()
+        for _ in range(2):
+            crash_scenario = CrashScenario.from_json(scenario_data, cache=cache)
+            self.assertEqual([_dump(road) for road in crash_scenario.roads], expected)
+        self.assertEqual(cache.get_stats(), {"entries": 1, "hits": 1, "misses": 1})
+
+    def test_compiled_roads_are_loaded_from_disk(self):
+        with tempfile.TemporaryDirectory(prefix="scenario_cache_") as folder:
+            first = CrashScenario.from_json(scenario_data, cache=ScenarioCache(folder))
+            self.assertEqual(len(os.listdir(folder)), 1)
+            cache = ScenarioCache(folder)
+            second = CrashScenario.from_json(scenario_data, cache=cache)
+            self.assertEqual(cache.hits, 1)
+            self.assertEqual([_dump(road) for road in second.roads], [_dump(road) for road in first.roads])
+
+    def test_scenarios_share_roads_but_not_vehicles(self):
+        cache = ScenarioCache()
+        first = CrashScenario.from_json(scenario_data, cache=cache)
+        second = CrashScenario.from_json(scenario_data, cache=cache)
+        self.assertIs(first.roads[0], second.roads[0])
+        self.assertIsNot(first.roads, second.roads)
+        self.assertIsNot(first.vehicles[0], second.vehicles[0])
+
+    def test_key_follows_the_road_content(self):
+        cache = ScenarioCache()
+        changed = copy.deepcopy(scenario_data)
+        self.assertEqual(cache.get_key(changed), cache.get_key(scenario_data))
+        changed["roads"][0]["center"]["points"][0][0] += 1
+        # The key of a mutated input follows its new content
+        self.assertNotEqual(cache.get_key(changed), cache.get_key(scenario_data))
+        changed = copy.deepcopy(scenario_data)
+        changed["vehicles"] = []
+        self.assertEqual(cache.get_key(changed), cache.get_key(scenario_data))
+
+    def test_key_does_not_depend_on_key_order(self):
+        cache = ScenarioCache()
+        reordered = {"roads": [dict(reversed(list(road.items()))) for road in scenario_data["roads"]]}
+        self.assertEqual(cache.get_key(reordered), cache.get_key(scenario_data))
@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.models.simulation_data import SimulationData, SimulationDataRecord, SimulationParams, ColumnarWriter
+
+
+def _record(i: int, damage=None):
+    return SimulationDataRecord(timer=i / 6, pos=(i, 2 * i, 0), dir=(0, 1, 0), vel=(0, 10, 0), steering=None,
+                                steering_input=None, brake=0.0, brake_input=0.0, throttle=0.5, throttle_input=0.5,
+                                wheelspeed=10.0, vel_kmh=36, damage=damage)
+
+
+def _simulation_data(path: str) -> SimulationData:
+    simulation_data = SimulationData(os.path.join(path, "sim_v1"))
+    simulation_data.set(SimulationParams(beamng_steps=50, delay_msec=1250), [])
+    simulation_data.start()
+    return simulation_data
+
+
+class TestSimulationData(unittest.TestCase):
+    def test_saved_records_are_loaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            simulation_data = _simulation_data(tmp)
+            damage = {"etk800_hood": {"name": "Hood", "damage": 0.5}}
+            records = [_record(i, None if i < 3 else damage) for i in range(5)]
+            for record in records:
+                simulation_data.append(record)
+            simulation_data.end(success=True)
+            simulation_data.save()
+            loaded = SimulationData(os.path.join(tmp, "sim_v1")).load()
+            self.assertTrue(loaded.complete())
+            self.assertEqual(5, loaded.n)
+            self.assertEqual(records, list(loaded.states))
+            self.assertEqual(records[-1], loaded.states[-1])
+            self.assertEqual((50, 1250), tuple(loaded.params))
+            self.assertTrue(loaded.info.success)
+
+    def test_records_are_written_while_collected(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            simulation_data = _simulation_data(tmp)
+            simulation_data.writer = ColumnarWriter(simulation_data.path_columns, flush_rows=2)
+            for i in range(3):
+                simulation_data.append(_record(i))
+            # Two records are flushed, the third one is buffered
+            self.assertEqual(2 * 3 * 8, os.path.getsize(simulation_data.path_columns.joinpath('pos.f64')))
+            self.assertFalse(simulation_data.complete())
+            simulation_data.save()
+            self.assertEqual(3 * 3 * 8, os.path.getsize(simulation_data.path_columns.joinpath('pos.f64')))
+
+    def test_new_writer_truncates_former_columns(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for n in [4, 2]:
+                simulation_data = _simulation_data(tmp)
+                for i in range(n):
+                    simulation_data.append(_record(i))
+                simulation_data.save()
+            # The second run of the same folder does not append to the columns of the first one
+            self.assertEqual(2 * 3 * 8, os.path.getsize(simulation_data.path_columns.joinpath('pos.f64')))
+            loaded = SimulationData(os.path.join(tmp, "sim_v1")).load()
+            self.assertEqual([_record(i) for i in range(2)], list(loaded.states))
+
+    def test_columns_are_memory_mapped_on_demand(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            simulation_data = _simulation_data(tmp)
+            simulation_data.set(simulation_data.params, [_record(i) for i in range(4)], simulation_data.info)
+            simulation_data.save()
+            states = SimulationData(os.path.join(tmp, "sim_v1")).load().states
+            pos = states.column('pos')
+            self.assertIsInstance(pos, np.memmap)
+            np.testing.assert_array_equal([[i, 2 * i, 0] for i in range(4)], pos)
+            self.assertEqual(['pos'], list(states.columns))
+            del pos, states
+
+    def test_former_json_is_loaded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            simulation_data = _simulation_data(tmp)
+            simulation_data.path_root.mkdir(parents=True)
+            with open(simulation_data.path_json, 'w') as f:
+                f.write(json.dumps({"params": {"beamng_steps": 50, "delay_msec": 1250}, "info": {"id": "a"},
+                                    "records": [_record(0)._asdict()]}))
+            loaded = SimulationData(os.path.join(tmp, "sim_v1")).load()
+            self.assertEqual([0, 0, 0], loaded.states[0].pos)
+            self.assertEqual(1, loaded.n)
+
+
+if __name__ == '__main__':
+    unittest.main()
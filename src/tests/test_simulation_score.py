@@ -1,5 +1,12 @@
+import glob
+import json
+import os
 import unittest
-from src.models import SimulationScore, categorize_report
+from src.models import SimulationFactory, Simulation, SimulationScore, categorize_report
+from src.models.ac3rp import CrashScenario
+from src.models.simulation_score import EXPECTED_SCORES
+
+input_paths = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "../input/*/data.json")))
 
 
 class TestSimScore(unittest.TestCase):
@@ -30,6 +37,30 @@ class TestSimScore(unittest.TestCase):
 
         self.assertTrue(True, True)
 
+    def test_expected_score_from_reports_matches_simulation(self):
+        for path in input_paths:
+            with open(path) as file:
+                crash_scenario = CrashScenario.from_json(json.load(file))
+            simulation = Simulation(sim_factory=SimulationFactory(crash_scenario))
+            self.assertEqual(SimulationScore.from_reports(crash_scenario.reports),
+                             SimulationScore(simulation).get_expected_score(), path)
+
+    def test_expected_score_is_memoized(self):
+        with open(input_paths[0]) as file:
+            crash_scenario = CrashScenario.from_json(json.load(file))
+        EXPECTED_SCORES.clear()
+        score = SimulationScore.from_reports(crash_scenario.reports)
+        self.assertEqual(len(EXPECTED_SCORES), 1)
+        self.assertEqual(SimulationScore.from_reports(crash_scenario.reports), score)
+        self.assertEqual(len(EXPECTED_SCORES), 1)
+
+    def test_expected_score_follows_weights_and_parts(self):
+        data_targets = {'v1': [{'name': 'FR'}], 'v2': [{'name': 'ANY'}]}
+        score = SimulationScore.compute_expected_score(data_targets)
+        self.assertGreater(SimulationScore.compute_expected_score(data_targets, alpha=0.4), score)
+        self.assertNotEqual(SimulationScore.compute_expected_score({'v1': [{'name': 'FR'}], 'v2': [{'name': 'BL'}]}),
+                            score)
+
 
 if __name__ == '__main__':
     unittest.main()
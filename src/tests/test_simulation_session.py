@@ -0,0 +1,135 @@
+import unittest
+from unittest import mock
+from src.models import Simulation, SimulationSession
+
+
+class FakeBeamNG:
+    def __init__(self):
+        self.is_alive = True
+        self.is_closed = False
+        self.stopped_scenarios = 0
+        self.restarted_scenarios = 0
+        self.teleports = []
+        self.removed_debug_lines = []
+
+    def open(self, launch=True):
+        pass
+
+    def get_gamestate(self):
+        if not self.is_alive:
+            raise ConnectionResetError()
+        return {"state": "scenario"}
+
+    def stop_scenario(self):
+        if not self.is_alive:
+            raise ConnectionResetError()
+        self.stopped_scenarios += 1
+
+    def restart_scenario(self):
+        self.restarted_scenarios += 1
+
+    def teleport_vehicle(self, vehicle, pos, rot=None, rot_quat=None):
+        self.teleports.append((vehicle, pos))
+
+    def remove_debug_line(self, line_id):
+        self.removed_debug_lines.append(line_id)
+
+    def close(self):
+        self.is_closed = True
+
+
+class FakeVehicle:
+    def __init__(self, vid):
+        self.vid = vid
+
+
+class FakePlayer:
+    def __init__(self, vid):
+        self.vehicle = FakeVehicle(vid)
+        self.rot = None
+        self.rot_quat = (0, 0, 0, 1)
+
+
+class TestSimulationSession(unittest.TestCase):
+    def setUp(self):
+        patcher = mock.patch.object(Simulation, "init_simulation", side_effect=lambda: FakeBeamNG())
+        self.init_simulation = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_simulator_is_launched_once_for_many_evaluations(self):
+        session = SimulationSession()
+        for _ in range(3):
+            bng = session.acquire()
+            session.release()
+        self.assertEqual(1, self.init_simulation.call_count)
+        self.assertEqual(3, bng.stopped_scenarios)
+        self.assertEqual({"launches": 1, "reconnects": 0, "evaluations": 3},
+                         {k: session.get_stats()[k] for k in ["launches", "reconnects", "evaluations"]})
+
+    def test_dead_simulator_is_launched_again(self):
+        session = SimulationSession()
+        bng = session.acquire()
+        bng.is_alive = False
+        self.assertIsNot(bng, session.acquire())
+        self.assertTrue(bng.is_closed)
+        self.assertEqual((2, 1), (session.launches, session.reconnects))
+
+    def test_failed_unload_drops_simulator(self):
+        session = SimulationSession()
+        session.acquire().is_alive = False
+        session.release()
+        self.assertIsNone(session.bng)
+
+    def test_simulator_is_restarted_after_max_evaluations(self):
+        session = SimulationSession(max_evaluations=2)
+        for _ in range(5):
+            session.acquire()
+            session.release()
+        self.assertEqual(3, session.launches)
+
+    def test_warm_scenario_resets_vehicles(self):
+        session = SimulationSession()
+        bng = session.acquire()
+        players = [FakePlayer("v1"), FakePlayer("v2")]
+        session.keep("case", players)
+        session.release(keep_scenario=True)
+        self.assertEqual(0, bng.stopped_scenarios)
+
+        session.acquire()
+        self.assertTrue(session.is_loaded("case"))
+        self.assertFalse(session.is_loaded("other"))
+        new_players = [FakePlayer("v1"), FakePlayer("v2")]
+        session.bind(new_players)
+        session.reset(new_players, [(1, 2, 0), (3, 4, 0)])
+        self.assertEqual([p.vehicle for p in players], [p.vehicle for p in new_players])
+        self.assertEqual(1, bng.restarted_scenarios)
+        self.assertEqual([(players[0].vehicle, (1, 2, 0)), (players[1].vehicle, (3, 4, 0))], bng.teleports)
+
+    def test_warm_reset_clears_debug_lines(self):
+        session = SimulationSession()
+        bng = session.acquire()
+        players = [FakePlayer("v1")]
+        session.keep("case", players)
+        session.add_debug("remove_debug_line", 1)
+        session.add_debug("remove_debug_line", 2)
+        session.release(keep_scenario=True)
+        session.acquire()
+        session.reset(players, [(1, 2, 0)])
+        self.assertEqual([1, 2], bng.removed_debug_lines)
+        session.reset(players, [(1, 2, 0)])
+        self.assertEqual([1, 2], bng.removed_debug_lines)
+
+    def test_warm_scenario_is_dropped_with_simulator(self):
+        session = SimulationSession()
+        bng = session.acquire()
+        session.keep("case", [FakePlayer("v1")])
+        bng.is_alive = False
+        session.acquire()
+        self.assertFalse(session.is_loaded("case"))
+        session.keep("case", [FakePlayer("v1")])
+        session.release()
+        self.assertFalse(session.is_loaded("case"))
+
+
+if __name__ == '__main__':
+    unittest.main()
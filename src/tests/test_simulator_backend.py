@@ -0,0 +1,271 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+from types import SimpleNamespace
+from src.models import SimulationFactory, Simulation, SimulationExec, SimulatorBackend, RecordingBackend, \
+    ReplayBackend, BeamNGBackend, EarlyExit, AdaptiveStep, SimulationScore
+from src.models.ac3rp import CrashScenario
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+
+
+class FakeBackend(SimulatorBackend):
+    # Vehicles drive at their (x, y) velocities in m/s, or stand still at their starting positions,
+    # and are damaged after crash_step steps, or once they are closer than crash_distance
+    def __init__(self, crash_step: int = 30, velocities: list = None, crash_distance: float = None):
+        self.crash_step = crash_step
+        self.velocities = velocities
+        self.crash_distance = crash_distance
+        self.crash_time = None
+        self.steps = 0
+        # Steps of every tick, and the steps done when the vehicles were teleported
+        self.ticks = []
+        self.teleport_steps = None
+        self.positions = {}
+        self.scripts = {}
+        self.stopped = set()
+        self.released = None
+        # Polls of every vehicle by method since the last step
+        self.polls = []
+        self.calls = {}
+
+    def prepare(self, simulation, positions) -> bool:
+        self.positions = {p.vehicle.vid: pos for p, pos in zip(simulation.players, positions)}
+        return False
+
+    def release(self, failed: bool = False):
+        self.released = not failed
+
+    def step(self, steps: int):
+        self.steps += steps
+        self.ticks.append(steps)
+        for i, vid in enumerate(self.positions):
+            if self.velocities is not None:
+                x, y, z = self.positions[vid]
+                vx, vy = self.velocities[i]
+                self.positions[vid] = (x + vx * steps / 60, y + vy * steps / 60, z)
+        if self.crash_distance is not None and self.crash_time is None:
+            (x1, y1, _), (x2, y2, _) = list(self.positions.values())[:2]
+            if ((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5 < self.crash_distance:
+                self.crash_time = self.steps / 60
+        self.polls.append({})
+
+    def _count(self, method: str, vehicle):
+        self.calls[method] = self.calls.get(method, 0) + 1
+        if len(self.polls) > 0:
+            self.polls[-1][vehicle.vid] = self.polls[-1].get(vehicle.vid, 0) + 1
+
+    def _state(self, vehicle) -> dict:
+        return {"pos": tuple(self.positions[vehicle.vid]), "dir": (0, 1, 0), "vel": (0, 0, 0),
+                "timer": self.steps / 60, "electrics": {}}
+
+    def _damage(self) -> dict:
+        if self.steps < self.crash_step and self.crash_time is None:
+            return {"damage": 0, "part_damage": {}}
+        return {"damage": 100, "part_damage": {"etk800_hood": {"name": "Hood", "damage": 0.5}}}
+
+    def poll_state(self, vehicle) -> dict:
+        self._count("poll_state", vehicle)
+        return self._state(vehicle)
+
+    def poll_damage(self, vehicle) -> dict:
+        self._count("poll_damage", vehicle)
+        return self._damage()
+
+    def poll(self, vehicle) -> dict:
+        self._count("poll", vehicle)
+        return {"state": self._state(vehicle), "damage": self._damage()}
+
+    def set_script(self, vehicle, script, cling: bool = True):
+        self.scripts[vehicle.vid] = script
+
+    def stop(self, vehicle):
+        self.stopped.add(vehicle.vid)
+
+    def teleport(self, vehicle, pos: tuple):
+        self.positions[vehicle.vid] = pos
+        self.teleport_steps = self.steps
+
+    def get_bbox(self, vehicle) -> dict:
+        x, y, z = self.positions[vehicle.vid]
+        return {"front_bottom_left": (x, y, z), "front_bottom_right": (x, y, z),
+                "rear_bottom_right": (x, y, z), "rear_bottom_left": (x, y, z)}
+
+
+def _simulation():
+    return Simulation(sim_factory=SimulationFactory(CrashScenario.from_json(scenario_data)), name="148154")
+
+
+class TestSimulatorBackend(unittest.TestCase):
+    def test_execution_runs_on_any_backend(self):
+        simulation = _simulation()
+        backend = FakeBackend()
+        SimulationExec(simulation, backend=backend).execute(timeout=1)
+        self.assertEqual(1, simulation.status)
+        self.assertTrue(backend.released)
+        for player in simulation.players:
+            self.assertEqual([(n['x'], n['y']) for n in player.road_pf.script],
+                             [(n['x'], n['y']) for n in backend.scripts[player.vehicle.vid]])
+        self.assertEqual({p.vehicle.vid for p in simulation.players}, backend.stopped)
+        for player in simulation.players:
+            self.assertEqual([{"name": "F", "damage": 0.5}], player.get_damage())
+            self.assertEqual(player.pos[:2], player.positions[-1])
+
+    def test_every_vehicle_is_polled_once_per_tick(self):
+        simulation = _simulation()
+        simulation.debug = True
+        backend = FakeBackend()
+        executor = SimulationExec(simulation, backend=backend)
+        with mock.patch("src.models.simulation_data.SimulationData.save"), \
+                mock.patch("src.models.simulation_data.SimulationData.clean"):
+            executor.execute(timeout=0.1)
+        self.assertGreater(executor.ticks, 0)
+        # Trigger, teleport, damage and recording logic share the poll of the tick
+        polls = [{p.vehicle.vid: 1 for p in simulation.players}] * executor.ticks
+        # The last tick is followed by the final poll of the execution
+        polls[-1] = {p.vehicle.vid: 2 for p in simulation.players}
+        self.assertEqual(polls, backend.polls)
+        self.assertEqual({"poll"}, set(backend.calls))
+
+    def test_beamng_poll_is_a_single_round_trip(self):
+        bng = mock.Mock()
+        bng.poll_sensors.return_value = {"timer": {"time": 1.5}, "electrics": {},
+                                         "damage": {"damage": 0, "part_damage": {}}}
+        vehicle = SimpleNamespace(vid="v1", state={"pos": (1, 2, 0), "dir": (0, 1, 0), "vel": (0, 0, 0)})
+        backend = BeamNGBackend(session=mock.Mock())
+        backend.bng = bng
+        poll = backend.poll(vehicle)
+        self.assertEqual(1, backend.round_trips)
+        self.assertEqual((1.5, (1, 2, 0), 0), (poll["state"]["timer"], poll["state"]["pos"], poll["damage"]["damage"]))
+        backend.poll_state(vehicle)
+        backend.poll_damage(vehicle)
+        self.assertEqual(3, bng.poll_sensors.call_count)
+
+    def test_beamng_sensors_are_attached_on_cold_start_only(self):
+        session = mock.Mock()
+        backend = BeamNGBackend(session=session, warm_scenario=True)
+        vehicle = mock.Mock()
+        for is_loaded in [False, True]:
+            session.is_loaded.return_value = is_loaded
+            with mock.patch("src.models.beamng_backend.Scenario"):
+                backend.prepare(_simulation(), [])
+            backend.attach_sensors(vehicle)
+        # Electrics and timer, attached once to the vehicle kept by the warm scenario
+        self.assertEqual(2, vehicle.attach_sensor.call_count)
+
+    def test_execution_ends_after_crash_settles(self):
+        simulation = _simulation()
+        early_exit = EarlyExit(settle_time=0.5)
+        executor = SimulationExec(simulation, backend=FakeBackend(crash_step=30), early_exit=early_exit,
+                                  adaptive_step=AdaptiveStep(fine_steps=10, coarse_steps=10))
+        executor.execute(timeout=5)
+        # Damaged after 0.5 simulated seconds, then settled for 0.5 more
+        self.assertEqual(6, executor.ticks)
+        self.assertEqual((EarlyExit.CRASH, 1), (executor.exit_reason, simulation.status))
+        self.assertAlmostEqual(4, executor.saved_sim_time)
+        self.assertGreater(executor.saved_wall_time, 0)
+        self.assertEqual(1, early_exit.get_stats()[EarlyExit.CRASH])
+
+    def test_execution_ends_when_vehicles_diverge(self):
+        simulation = _simulation()
+        early_exit = EarlyExit(diverging_time=0.5, min_distance=50)
+        backend = FakeBackend(crash_step=10 ** 6, velocities=[(10, 0), (-10, 0)])
+        executor = SimulationExec(simulation, backend=backend, early_exit=early_exit)
+        executor.execute(timeout=5)
+        self.assertEqual((EarlyExit.NO_CRASH, 0), (executor.exit_reason, simulation.status))
+        self.assertGreaterEqual(simulation.get_vehicles_distance(), 50)
+        self.assertLess(executor.ticks, 10)
+        self.assertEqual({"runs": 1, EarlyExit.CRASH: 0, EarlyExit.NO_CRASH: 1},
+                         {k: early_exit.get_stats()[k] for k in ["runs", EarlyExit.CRASH, EarlyExit.NO_CRASH]})
+
+    def test_no_crash_score_does_not_depend_on_early_exit(self):
+        # The vehicles pass each other 4 meters apart, then diverge until the timeout
+        scores, ticks = [], []
+        for early_exit in [None, EarlyExit(diverging_time=1, min_distance=15)]:
+            simulation = _simulation()
+            backend = FakeBackend(crash_step=10 ** 6, velocities=[(-10, 2), (10, -2)])
+            executor = SimulationExec(simulation, backend=backend, early_exit=early_exit)
+            executor.execute(timeout=10)
+            self.assertEqual(0, simulation.status)
+            scores.append(SimulationScore(simulation, closest_approach=True).calculate())
+            ticks.append(executor.ticks)
+            # The final distance is still the default score
+            self.assertAlmostEqual(-simulation.get_vehicles_distance(), SimulationScore(simulation).calculate())
+        self.assertLess(ticks[1], ticks[0])
+        self.assertEqual(scores[0], scores[1])
+
+    def test_adaptive_steps_do_not_miss_contact(self):
+        # Head-on at 20 m/s from 44 meters apart, the contact happens after about 2 simulated seconds
+        ticks, crash_times = [], []
+        for adaptive_step in [AdaptiveStep(fine_steps=10, coarse_steps=10), AdaptiveStep(fine_steps=10)]:
+            simulation = _simulation()
+            backend = FakeBackend(crash_step=10 ** 6, velocities=[(-10, 0), (10, 0)], crash_distance=5)
+            executor = SimulationExec(simulation, backend=backend, adaptive_step=adaptive_step)
+            executor.execute(timeout=5)
+            self.assertEqual(1, simulation.status)
+            self.assertAlmostEqual(5, executor.sim_time, delta=1)
+            ticks.append(executor.ticks)
+            crash_times.append(backend.crash_time)
+        self.assertLess(ticks[1], ticks[0])
+        self.assertAlmostEqual(crash_times[0], crash_times[1], delta=10 / 60)
+
+    def test_ticks_are_fine_after_teleport(self):
+        simulation = _simulation()
+        simulation.need_teleport = True
+        # The accelerators start 500 meters away, the vehicles land 44 meters apart and closing at 20 m/s
+        for player, offset in zip(simulation.players, [500, -500]):
+            player.accelerator = SimpleNamespace(orig=(player.pos[0] + offset, player.pos[1], player.pos[2]),
+                                                 script=player.road_pf.script)
+        backend = FakeBackend(crash_step=10 ** 6, velocities=[(-10, 0), (10, 0)])
+        adaptive_step = AdaptiveStep(fine_steps=10, coarse_steps=60)
+        executor = SimulationExec(simulation, backend=backend, adaptive_step=adaptive_step)
+        with mock.patch("src.models.player.Player.is_speed_stable", return_value=True):
+            executor.execute(timeout=6)
+        self.assertIsNotNone(backend.teleport_steps)
+        teleport_tick = [sum(backend.ticks[:i + 1]) for i in range(len(backend.ticks))].index(backend.teleport_steps)
+        # Coarse on the accelerators, fine right after the landing instead of the stale distance of the accelerators
+        self.assertEqual(60, backend.ticks[teleport_tick])
+        self.assertEqual(10, backend.ticks[teleport_tick + 1])
+
+    def test_replay_answers_recorded_calls(self):
+        simulation = _simulation()
+        recording = RecordingBackend(FakeBackend(crash_step=20))
+        recording.prepare(simulation, [p.pos for p in simulation.players])
+        for _ in range(2):
+            recording.step(10)
+            for player in simulation.players:
+                Simulation.collect_vehicle_position_and_timer(recording, player)
+                recording.poll_damage(player.vehicle)
+        expected = [list(p.positions) for p in simulation.players]
+
+        with tempfile.TemporaryDirectory() as tmp:
+            recording.save(os.path.join(tmp, "records.pkl"))
+            replay = ReplayBackend.load(os.path.join(tmp, "records.pkl"))
+        simulation = _simulation()
+        damages = []
+        self.assertFalse(replay.prepare(simulation, []))
+        for _ in range(2):
+            replay.step(10)
+            for player in simulation.players:
+                Simulation.collect_vehicle_position_and_timer(replay, player)
+                damages.append(replay.poll_damage(player.vehicle)["damage"])
+        self.assertTrue(replay.is_done())
+        self.assertEqual(expected, [p.positions for p in simulation.players])
+        self.assertEqual([0, 0, 100, 100], damages)
+
+    def test_replay_rejects_other_calls(self):
+        simulation = _simulation()
+        recording = RecordingBackend(FakeBackend())
+        recording.prepare(simulation, [p.pos for p in simulation.players])
+        recording.poll_damage(simulation.players[0].vehicle)
+        replay = ReplayBackend(recording.records)
+        replay.prepare(simulation, [])
+        with self.assertRaises(Exception):
+            replay.poll_damage(simulation.players[1].vehicle)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+import json
+import math
+import os
+import unittest
+import numpy as np
+from src.models.ac3rp import CrashScenario, Genotype
+from src.evolution import Surrogate
+from src.evolution.surrogate import features
+
+with open(os.path.join(os.path.dirname(__file__), "../input/148154/data.json")) as file:
+    scenario_data = json.load(file)
+scenario = CrashScenario.from_json(scenario_data)
+
+
+class Individual(list):
+    pass
+
+
+def create_individual(speed: float):
+    genotype = Genotype.from_scenario(scenario)
+    genotype.genes[0][0] = speed
+    return Individual([genotype])
+
+
+class TestSurrogate(unittest.TestCase):
+    def test_features_of_genotype_and_scenario_are_equal(self):
+        genotype = Genotype.from_scenario(scenario)
+        np.testing.assert_allclose(features(scenario), features(genotype))
+        genotype.genes[0] = [30, 4, -2]
+        np.testing.assert_allclose(features(genotype.to_scenario()), features(genotype))
+
+    def test_untrained_surrogate_keeps_first_individuals(self):
+        surrogate = Surrogate(min_samples=3)
+        pop = [create_individual(s) for s in [10, 20, 30]]
+        self.assertEqual(pop[:2], surrogate.screen(pop, 0, 2))
+        self.assertFalse(surrogate.is_trained())
+
+    def test_trained_surrogate_ranks_and_reports_error(self):
+        surrogate = Surrogate(min_samples=5)
+        pop = [create_individual(s) for s in np.linspace(10, 50, 20)]
+        failed = create_individual(50)
+        surrogate.update(pop + [failed], [(ind[0].genes[0][0] / 10,) for ind in pop] + [(-math.inf,)])
+        self.assertTrue(surrogate.is_trained())
+        # The failed evaluation is not part of the training data
+        self.assertEqual(20, len(surrogate.y))
+        self.assertNotIn(-math.inf, surrogate.y)
+
+        candidates = [create_individual(s) for s in [12, 48, 30]]
+        kept = surrogate.screen(candidates, 0, 1)
+        self.assertEqual([candidates[1]], kept)
+        surrogate.update(kept, [(4.8,)])
+        stats = surrogate.get_stats()
+        self.assertEqual((21, 1), (stats["samples"], stats["predictions"]))
+        self.assertLess(stats["mae"], 0.5)
+
+    def test_margin_rejects_individuals_predicted_worse_than_best(self):
+        surrogate = Surrogate(min_samples=5, margin=0.5)
+        pop = [create_individual(s) for s in np.linspace(10, 50, 20)]
+        surrogate.update(pop, [(ind[0].genes[0][0] / 10,) for ind in pop])
+        self.assertEqual([], surrogate.screen([create_individual(12)], 4, 1))
+        self.assertEqual(1, surrogate.get_stats()["rejected"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,7 +3,7 @@ import numpy as np
 import pandas as pd
 from numpy import trapz
 from src.models.ac3rp import CrashScenario
-from src.models import SimulationFactory, Simulation, SimulationScore
+from src.models import SimulationScore
 
 
 class Preprocessing:
@@ -16,9 +16,7 @@ class Preprocessing:
         with open(file_path) as file:
             scenario = json.load(file)
         crash_scenario = CrashScenario.from_json(scenario)
-        sim_factory = SimulationFactory(crash_scenario)
-        simulation = Simulation(sim_factory=sim_factory)
-        self.target = SimulationScore(simulation).get_expected_score()
+        self.target = SimulationScore.from_reports(crash_scenario.reports)
         self.case = crash_scenario.name
 
     @staticmethod
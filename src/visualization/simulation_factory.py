@@ -49,7 +49,7 @@ class VizSimFactory:
         plt.show()
         fig.savefig(f'debug/generate_accelerator_{berlin_now}.png', bbox_inches="tight")
 
-    def plot_vehicle_road_bbox(self, url: str = None, score=0, exp_score=0):
+    def plot_vehicle_road_bbox(self, url: str = None, score=0, exp_score=0, bboxes: list = None):
         berlin_now = datetime.now(pytz.timezone('Europe/Berlin')).strftime("%Y%m%d_%I%M%S")
         dist_x, dist_y = 0, 0
         fig = plt.figure()
@@ -74,9 +74,10 @@ class VizSimFactory:
             ys = [p[1] for p in trajectory_points]
             plt.plot(xs, ys, '-', label=vehicle.name, color=colors[i][0])
 
-        # Render bbox
-        for i, player in enumerate(self.sf.players):
-            for p in player.bbox:
+        # Render bbox, the ones of the players unless they are given
+        bboxes = [player.bbox for player in self.sf.players] if bboxes is None else bboxes
+        for i, bbox in enumerate(bboxes):
+            for p in bbox:
                 plt.plot(p[0], p[1], 'r-' if i == 0 else 'b-')
 
         plt.title(url.split('/')[-1].replace(".png", ''))